@@ -0,0 +1,277 @@
+import os
+import csv
+import re
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+
+import numpy as np
+from loguru import logger
+
+from chain import keccak256, keccak256_batch, RATE_BYTES
+
+# Configuration
+AIRDROP_DIR = os.getenv(
+    "AIRDROP_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "airdrops")
+)
+AIRDROP_MAX_RECIPIENTS = int(os.getenv("AIRDROP_MAX_RECIPIENTS", "2000000"))
+AIRDROP_MAX_OPEN = int(os.getenv("AIRDROP_MAX_OPEN", "16"))
+
+# Rows parsed and leaves hashed per batch
+AIRDROP_CHUNK = 65536
+
+# Token decimals used by toTokenDecimals (src/utils/merkleTree.ts)
+TOKEN_DECIMALS = 18
+MAX_UINT256 = 2 ** 256 - 1
+
+ADDRESS_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+ROOT_RE = re.compile(r"^0x[0-9a-fA-F]{64}$")
+
+# Airdrop file: 64-byte header (magic, recipient count, padding, root), the
+# recipient addresses in sorted order, each one's amount and tree node, then
+# the 2n - 1 tree nodes. Addresses are contiguous so lookups can bisect them
+# in place.
+AIRDROP_MAGIC = b"SLKDROP1"
+AIRDROP_HEADER_BYTES = 64
+ENTRY_DTYPE = np.dtype([("amount", np.uint8, (32,)), ("node", ">u8")])
+
+class AirdropError(Exception):
+    """An airdrop recipient list that cannot be turned into a tree"""
+
+def parse_amount(value: str) -> int:
+    """Human-readable token amount to base units, like toTokenDecimals"""
+    try:
+        units = Decimal(value.strip()) * 10 ** TOKEN_DECIMALS
+    except InvalidOperation:
+        raise AirdropError(f"Invalid amount: {value!r}")
+    if units != units.to_integral_value() or not 0 <= units <= MAX_UINT256:
+        raise AirdropError(f"Invalid amount: {value!r}")
+    return int(units)
+
+def read_recipients(path: str) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Stream an `address,amount` CSV as ((N, 20) addresses, (N, 32) amounts) batches
+
+    A header row is skipped if present. Amounts are human-readable token
+    amounts, encoded as big-endian uint256 base units.
+    """
+    with open(path, newline="") as f:
+        rows = csv.reader(f)
+        addresses: List[bytes] = []
+        amounts: List[bytes] = []
+        for line, row in enumerate(rows, start=1):
+            if not row or not "".join(row).strip():
+                continue
+            if len(row) < 2:
+                raise AirdropError(f"Line {line}: expected address,amount")
+            address = row[0].strip()
+            if not ADDRESS_RE.match(address):
+                if line == 1:
+                    continue
+                raise AirdropError(f"Line {line}: invalid address {address!r}")
+            try:
+                amount = parse_amount(row[1])
+            except AirdropError as e:
+                raise AirdropError(f"Line {line}: {e}")
+
+            addresses.append(bytes.fromhex(address[2:]))
+            amounts.append(amount.to_bytes(32, "big"))
+            if len(addresses) == AIRDROP_CHUNK:
+                yield _batch(addresses, amounts)
+                addresses, amounts = [], []
+        if addresses:
+            yield _batch(addresses, amounts)
+
+def _batch(addresses: List[bytes], amounts: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    return (np.frombuffer(b"".join(addresses), np.uint8).reshape(-1, 20),
+            np.frombuffer(b"".join(amounts), np.uint8).reshape(-1, 32))
+
+def leaf_hashes(addresses: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+    """StandardMerkleTree leaves: keccak256(keccak256(abi.encode(address, uint256)))"""
+    encoded = np.zeros((len(addresses), RATE_BYTES), np.uint8)
+    encoded[:, 12:32] = addresses
+    encoded[:, 32:64] = amounts
+    inner = np.zeros((len(addresses), RATE_BYTES), np.uint8)
+    inner[:, :32] = keccak256_batch(encoded, 64)
+    return keccak256_batch(inner, 32)
+
+def hash_pairs(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """keccak256 of each pair of nodes, smaller one first"""
+    differs = left != right
+    first = differs.argmax(axis=1)
+    rows = np.arange(len(left))
+    swap = (left[rows, first] > right[rows, first])[:, None]
+    pairs = np.zeros((len(left), RATE_BYTES), np.uint8)
+    pairs[:, :32] = np.where(swap, right, left)
+    pairs[:, 32:64] = np.where(swap, left, right)
+    return keccak256_batch(pairs, 64)
+
+def hash_pair(a: bytes, b: bytes) -> bytes:
+    return keccak256(a + b if a <= b else b + a)
+
+def build_tree(leaves: np.ndarray, tree: np.ndarray) -> np.ndarray:
+    """
+    Fill `tree` ((2n - 1, 32)) the way StandardMerkleTree lays it out
+
+    Leaves are sorted by hash and stored back to front at the end of the
+    array; node i has children 2i + 1 and 2i + 2. Parents are hashed in
+    batches of consecutive nodes whose children are all already known.
+
+    Returns:
+        For each input leaf, its node index in the tree
+    """
+    n = len(leaves)
+    words = leaves.view(">u8").reshape(n, 4)
+    order = np.lexsort((words[:, 3], words[:, 2], words[:, 1], words[:, 0]))
+    tree[n - 1:] = leaves[order[::-1]]
+
+    end = n - 1
+    while end > 0:
+        start = max(end // 2, end - AIRDROP_CHUNK)
+        children = np.arange(2 * start + 1, 2 * end + 1)
+        tree[start:end] = hash_pairs(np.asarray(tree[children[0::2]]), np.asarray(tree[children[1::2]]))
+        end = start
+
+    nodes = np.empty(n, np.uint64)
+    nodes[order] = np.arange(2 * n - 2, n - 2, -1, dtype=np.uint64)
+    return nodes
+
+def build_airdrop(csv_path: str, directory: str = AIRDROP_DIR) -> Dict[str, Any]:
+    """
+    Build the Merkle tree and proof store for an `address,amount` CSV
+
+    Leaves are hashed in vectorized batches as the CSV streams in. The tree
+    is written straight into a memory-mapped file named after its root.
+
+    Returns:
+        Root, recipient count and total amount in base units
+
+    Raises:
+        AirdropError: for malformed rows, duplicate addresses or an empty list
+    """
+    address_batches: List[np.ndarray] = []
+    amount_batches: List[np.ndarray] = []
+    leaf_batches: List[np.ndarray] = []
+    count = 0
+    for addresses, amounts in read_recipients(csv_path):
+        count += len(addresses)
+        if count > AIRDROP_MAX_RECIPIENTS:
+            raise AirdropError(f"Airdrops are limited to {AIRDROP_MAX_RECIPIENTS} recipients")
+        address_batches.append(addresses)
+        amount_batches.append(amounts)
+        leaf_batches.append(leaf_hashes(addresses, amounts))
+    if not count:
+        raise AirdropError("No recipients in airdrop file")
+
+    addresses = np.concatenate(address_batches).view("S20").ravel()
+    entries = np.zeros(count, ENTRY_DTYPE)
+    entries["amount"] = np.concatenate(amount_batches)
+    leaves = np.concatenate(leaf_batches)
+    del address_batches, amount_batches, leaf_batches
+
+    order = np.argsort(addresses, kind="stable")
+    addresses = addresses[order]
+    duplicates = np.flatnonzero(addresses[1:] == addresses[:-1])
+    if len(duplicates):
+        duplicate = addresses[duplicates[0]].ljust(20, b"\0")
+        raise AirdropError(f"Duplicate recipient 0x{duplicate.hex()}")
+
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f"build-{os.getpid()}-{id(entries)}.tmp")
+    try:
+        tree = np.memmap(tmp_path, dtype=np.uint8, mode="w+",
+                         offset=AIRDROP_HEADER_BYTES + addresses.nbytes + entries.nbytes,
+                         shape=(2 * count - 1, 32))
+        entries["node"] = build_tree(leaves, tree)
+        root = bytes(tree[0])
+        tree.flush()
+        del tree
+
+        with open(tmp_path, "r+b") as f:
+            f.write(AIRDROP_MAGIC + count.to_bytes(8, "big") + b"\0" * 16 + root)
+            f.write(addresses.tobytes())
+            f.write(entries[order].tobytes())
+        os.replace(tmp_path, os.path.join(directory, f"{root.hex()}.airdrop"))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    total = sum(int.from_bytes(bytes(amount), "big") for amount in entries["amount"])
+    logger.info(f"Built airdrop 0x{root.hex()} for {count} recipients")
+    return {"root": "0x" + root.hex(), "recipients": count, "totalAmount": str(total)}
+
+class AirdropStore:
+    """
+    Proof lookups against airdrop files built by `build_airdrop`
+
+    Files are memory-mapped on first use and the least recently used are
+    closed beyond `max_open`. A lookup binary-searches the sorted addresses
+    and reads one sibling node per tree level, so it costs
+    O(log n) page reads and never loads the whole tree.
+    """
+
+    def __init__(self, directory: str = AIRDROP_DIR, max_open: int = AIRDROP_MAX_OPEN):
+        self.directory = directory
+        self.max_open = max_open
+        self._open: "OrderedDict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]" = OrderedDict()
+
+    def path_for(self, root: str) -> str:
+        return os.path.join(self.directory, f"{root[2:].lower()}.airdrop")
+
+    def _load(self, root: str) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        key = root.lower()
+        airdrop = self._open.get(key)
+        if airdrop is None:
+            path = self.path_for(root)
+            try:
+                with open(path, "rb") as f:
+                    header = f.read(AIRDROP_HEADER_BYTES)
+            except OSError:
+                return None
+            if header[:8] != AIRDROP_MAGIC or header[32:].hex() != key[2:]:
+                logger.warning(f"Ignoring invalid airdrop file {path}")
+                return None
+
+            count = int.from_bytes(header[8:16], "big")
+            addresses = np.memmap(path, dtype="S20", mode="r", offset=AIRDROP_HEADER_BYTES, shape=(count,))
+            offset = AIRDROP_HEADER_BYTES + addresses.nbytes
+            entries = np.memmap(path, dtype=ENTRY_DTYPE, mode="r", offset=offset, shape=(count,))
+            tree = np.memmap(path, dtype=np.uint8, mode="r", offset=offset + entries.nbytes,
+                             shape=(2 * count - 1, 32))
+            airdrop = self._open[key] = (addresses, entries, tree)
+            while len(self._open) > self.max_open:
+                self._open.popitem(last=False)
+        self._open.move_to_end(key)
+        return airdrop
+
+    def exists(self, root: str) -> bool:
+        return self._load(root) is not None
+
+    def proof(self, root: str, address: str) -> Optional[Dict[str, Any]]:
+        """Amount and Merkle proof for `address`, or None if it is not a recipient"""
+        airdrop = self._load(root)
+        if airdrop is None:
+            return None
+        addresses, entries, tree = airdrop
+
+        key = np.array(bytes.fromhex(address[2:]), dtype="S20")
+        position = int(np.searchsorted(addresses, key))
+        if position == len(addresses) or addresses[position] != key:
+            return None
+        entry = entries[position]
+
+        proof = []
+        node = int(entry["node"])
+        while node > 0:
+            sibling = node + 1 if node % 2 else node - 1
+            proof.append("0x" + bytes(tree[sibling]).hex())
+            node = (node - 1) // 2
+
+        return {
+            "root": root.lower(),
+            "account": address.lower(),
+            "amount": str(int.from_bytes(bytes(entry["amount"]), "big")),
+            "proof": proof
+        }
+
+airdrops = AirdropStore()
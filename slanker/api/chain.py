@@ -0,0 +1,109 @@
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from Crypto.Hash import keccak
+
+def keccak256(data: bytes) -> bytes:
+    """Keccak-256 digest (the Ethereum hash, not NIST SHA3-256)"""
+    return keccak.new(data=data, digest_bits=256).digest()
+
+# Keccak-f[1600] round constants and rho rotation offsets (indexed [x][y])
+ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008
+]
+ROTATIONS = [[0, 36, 3, 41, 18], [1, 44, 10, 45, 2], [62, 6, 43, 15, 61],
+             [28, 55, 25, 21, 56], [27, 20, 39, 8, 14]]
+
+# Keccak-256 absorbs 136 bytes per block; batched messages must fit in one
+RATE_BYTES = 136
+_RC = [np.uint64(c) for c in ROUND_CONSTANTS]
+# (source lane, destination lane, rotation) for the combined rho and pi steps
+_RHO_PI = [(x + 5 * y, y + 5 * ((2 * x + 3 * y) % 5), ROTATIONS[x][y]) for x in range(5) for y in range(5)]
+_SHIFTS = {n: (np.uint64(n), np.uint64(64 - n)) for n in range(1, 64)}
+
+def _keccak_f1600(A: List[np.ndarray]) -> None:
+    """Permute a batch of states in place; lane i = x + 5y holds one uint64 per message"""
+    n = len(A[0])
+    C = [np.empty(n, np.uint64) for _ in range(5)]
+    D = [np.empty(n, np.uint64) for _ in range(5)]
+    B = [np.empty(n, np.uint64) for _ in range(25)]
+    t = np.empty(n, np.uint64)
+    xor, shl, shr, bor = np.bitwise_xor, np.left_shift, np.right_shift, np.bitwise_or
+    one, sixty_three = _SHIFTS[1]
+
+    for rc in _RC:
+        # theta
+        for x in range(5):
+            c = C[x]
+            xor(A[x], A[x + 5], out=c)
+            xor(c, A[x + 10], out=c)
+            xor(c, A[x + 15], out=c)
+            xor(c, A[x + 20], out=c)
+        for x in range(5):
+            d, right = D[x], C[(x + 1) % 5]
+            shl(right, one, out=d)
+            shr(right, sixty_three, out=t)
+            bor(d, t, out=d)
+            xor(d, C[(x - 1) % 5], out=d)
+        # rho and pi
+        for src, dst, r in _RHO_PI:
+            b = B[dst]
+            xor(A[src], D[src % 5], out=b)
+            if r:
+                left, right = _SHIFTS[r]
+                shr(b, right, out=t)
+                shl(b, left, out=b)
+                bor(b, t, out=b)
+        # chi and iota
+        for i in range(25):
+            row = i - i % 5
+            np.invert(B[(i + 1) % 5 + row], out=t)
+            np.bitwise_and(t, B[(i + 2) % 5 + row], out=t)
+            xor(B[i], t, out=A[i])
+        xor(A[0], rc, out=A[0])
+
+def keccak256_batch(messages: np.ndarray, length: int) -> np.ndarray:
+    """
+    Keccak-256 of many equal-length messages at once
+
+    Args:
+        messages: (N, 136) uint8 array with each message in its first `length` bytes
+        length: Message length in bytes (at most 135)
+
+    Returns:
+        (N, 32) uint8 array of digests
+    """
+    blocks = messages.copy()
+    blocks[:, length:] = 0
+    blocks[:, length] = 0x01
+    blocks[:, RATE_BYTES - 1] |= 0x80
+
+    lanes = blocks.view("<u8")
+    state = [np.ascontiguousarray(lanes[:, i]) for i in range(RATE_BYTES // 8)]
+    state += [np.zeros(len(blocks), np.uint64) for _ in range(25 - RATE_BYTES // 8)]
+    _keccak_f1600(state)
+    return np.stack(state[:4], axis=1).astype("<u8").view(np.uint8)
+
+# TokenCreated event of the Clanker v4 factory (src/abi/v4/Clanker.ts)
+TOKEN_CREATED_SIGNATURE = (
+    "TokenCreated(address,address,address,string,string,string,string,string,"
+    "int24,address,bytes32,address,address,address,uint256,address[])"
+)
+TOKEN_CREATED_TOPIC = "0x" + keccak256(TOKEN_CREATED_SIGNATURE.encode()).hex()
+
+def token_address_from_receipt(receipt: Dict[str, Any]) -> Optional[str]:
+    """Extract the deployed token address from a deploy transaction receipt"""
+    for log in receipt.get("logs") or []:
+        topics = log.get("topics") or []
+        # tokenAddress is the first indexed argument
+        if len(topics) >= 2 and topics[0].lower() == TOKEN_CREATED_TOPIC:
+            return "0x" + topics[1][-40:]
+    return None
+
+def receipt_succeeded(receipt: Dict[str, Any]) -> bool:
+    return int(receipt.get("status") or "0x0", 16) == 1
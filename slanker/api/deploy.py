@@ -1,30 +1,255 @@
 import os
-import json
-import asyncio
-import subprocess
-import tempfile
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+from eth_account import Account
 from loguru import logger
 from dotenv import load_dotenv
 
+from chain import keccak256, receipt_succeeded, token_address_from_receipt
+from nonce import NonceManager, is_nonce_error, is_known_transaction
+from receipts import ReceiptWatcher, RECEIPT_POLL_INTERVAL
+from rpc import RpcPool, RpcError, RpcTransportError, RPC_URLS
+from shards import ShardRouter, DeployerShard, NoDeployerAvailableError, WEI_PER_ETH
+from vanity import grinder, VANITY_ENABLED
+from worker_pool import NodeWorkerPool, WorkerError, EventCallback, run_once
+from metrics import RUNNER_SECONDS, stage_timer
+
 # Load environment variables
 load_dotenv()
 
 # Configuration
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
-RPC_URL = os.getenv("RPC_URL", "https://mainnet.base.org")
+PRIVATE_KEYS = [key.strip() for key in os.getenv("PRIVATE_KEYS", PRIVATE_KEY or "").split(",") if key.strip()]
+DEPLOYER_ROUTING = os.getenv("DEPLOYER_ROUTING", "least_loaded")
+MIN_DEPLOYER_BALANCE_ETH = float(os.getenv("MIN_DEPLOYER_BALANCE_ETH", "0.002"))
+BALANCE_REFRESH_SECONDS = float(os.getenv("BALANCE_REFRESH_SECONDS", "30"))
+DEPLOY_WORKERS = int(os.getenv("DEPLOY_WORKERS", "2"))
+DEPLOY_TIMEOUT_SECONDS = float(os.getenv("DEPLOY_TIMEOUT_SECONDS", "300"))
+TX_STUCK_SECONDS = float(os.getenv("TX_STUCK_SECONDS", "30"))
+GAS_BUMP_PERCENT = int(os.getenv("GAS_BUMP_PERCENT", "15"))
+MAX_GAS_BUMPS = int(os.getenv("MAX_GAS_BUMPS", "3"))
+MAX_NONCE_RESYNCS = int(os.getenv("MAX_NONCE_RESYNCS", "3"))
+
+if not PRIVATE_KEYS:
+    raise ValueError("PRIVATE_KEY (or PRIVATE_KEYS) environment variable is required")
+
+# Shared pool of long-lived Node.js deploy workers
+_pool: Optional[NodeWorkerPool] = None
+
+# Deployer keys are sharded here; each keeps its own nonce stream
+rpc_client = RpcPool(RPC_URLS)
+router = ShardRouter(
+    [Account.from_key(key).address for key in PRIVATE_KEYS],
+    rpc_client,
+    min_balance_wei=int(MIN_DEPLOYER_BALANCE_ETH * WEI_PER_ETH),
+    strategy=DEPLOYER_ROUTING
+)
+# Pending deploy transactions are matched against new blocks in one place
+receipt_watcher = ReceiptWatcher(rpc_client)
+
+def deployer_env() -> Dict[str, str]:
+    """Environment passed to runner processes (keys never appear in job data)"""
+    return {**os.environ, "DEPLOYER_KEYS": ",".join(PRIVATE_KEYS), "RPC_URLS": ",".join(RPC_URLS)}
+
+async def start_worker_pool() -> None:
+    """Spawn the Node.js deploy workers (called on API startup)"""
+    global _pool
+    router.start(BALANCE_REFRESH_SECONDS)
+    if VANITY_ENABLED:
+        # Tokens are administered by the deployer key that launches them
+        grinder.start([shard.address for shard in router.shards])
+    if _pool is None and DEPLOY_WORKERS > 0:
+        _pool = NodeWorkerPool(DEPLOY_WORKERS, env=deployer_env())
+        await _pool.start()
+
+async def stop_worker_pool() -> None:
+    """Stop the Node.js deploy workers and the RPC session (called on API shutdown)"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+    await router.close()
+    await receipt_watcher.close()
+    await rpc_client.close()
+    await grinder.close()
+
+async def current_fees() -> Tuple[int, int]:
+    """EIP-1559 fees for a new transaction: (maxFeePerGas, maxPriorityFeePerGas)"""
+    block, priority = await rpc_client.batch([
+        ("eth_getBlockByNumber", ["latest", False]),
+        ("eth_maxPriorityFeePerGas", [])
+    ])
+    for result in (block, priority):
+        if isinstance(result, RpcError):
+            raise result
+    priority = int(priority, 16)
+    base_fee = int(block.get("baseFeePerGas") or "0x0", 16)
+    return base_fee * 2 + priority, priority
+
+def bump_fees(previous: Tuple[int, int], current: Tuple[int, int]) -> Tuple[int, int]:
+    """Fees for a replacement transaction: at least GAS_BUMP_PERCENT above the previous ones"""
+    factor = 100 + GAS_BUMP_PERCENT
+    max_fee = max(previous[0] * factor // 100 + 1, current[0])
+    priority = max(previous[1] * factor // 100 + 1, current[1])
+    return max_fee, min(priority, max_fee)
+
+async def wait_for_receipt(tx_hashes: List[str], timeout: float) -> Optional[Dict[str, Any]]:
+    """Wait for a receipt of any of the given transactions (replacements share a nonce)"""
+    return await receipt_watcher.wait(tx_hashes, timeout)
+
+async def broadcast(raw_transaction: str, tx_hash: str) -> Dict[str, Any]:
+    """
+    Send a signed transaction to the network
+    
+    The request is never re-sent to another endpoint once it may have
+    reached one. If it is unclear whether it did, the transaction counts as
+    broadcast: its receipt is awaited, and a gas bump or resend with the same
+    nonce follows if it never shows up, so a deploy is never sent twice.
+    """
+    try:
+        await rpc_client.call("eth_sendRawTransaction", [raw_transaction], idempotent=False)
+    except RpcTransportError as e:
+        logger.warning(f"Broadcast of {tx_hash} may not have reached the node ({e}), watching for its receipt")
+    except RpcError as e:
+        if not is_known_transaction(str(e)):
+            return {"success": False, "error": str(e)}
+        # Our own transaction is already in the mempool (e.g. from an earlier attempt)
+        logger.info(f"Transaction {tx_hash} is already known to the node")
+    return {"success": True, "txHash": tx_hash}
+
+async def send_transaction(tx: Dict[str, Any], nonce: int, fees: Tuple[int, int],
+                           on_progress: Optional[EventCallback] = None) -> Dict[str, Any]:
+    """
+    Have the runner sign a prepared transaction (by tx["from"]) and broadcast it
+    
+    The signed transaction is passed to `on_progress` as a "signed" event
+    before it is broadcast, so the job journal can resend it after a crash.
+    """
+    signed = await execute_deployment_script({
+        "op": "sign",
+        "config": {
+            "tx": tx,
+            "nonce": nonce,
+            "maxFeePerGas": hex(fees[0]),
+            "maxPriorityFeePerGas": hex(fees[1])
+        }
+    })
+    if not signed["success"]:
+        return signed
+    
+    raw_transaction = signed["rawTransaction"]
+    tx_hash = "0x" + keccak256(bytes.fromhex(raw_transaction[2:])).hex()
+    if on_progress:
+        try:
+            await on_progress("signed", {"txHash": tx_hash, "nonce": nonce, "deployer": tx["from"],
+                                         "rawTransaction": raw_transaction})
+        except Exception as e:
+            # Never broadcast what could not be journaled
+            logger.error(f"Could not journal {tx_hash}: {e}")
+            return {"success": False, "error": f"Could not record transaction: {e}"}
+    return await broadcast(raw_transaction, tx_hash)
 
-if not PRIVATE_KEY:
-    raise ValueError("PRIVATE_KEY environment variable is required")
+async def submit_transaction(tx: Dict[str, Any], nonce_manager: NonceManager,
+                             on_progress: Optional[EventCallback] = None) -> Dict[str, Any]:
+    """
+    Broadcast a prepared transaction with a nonce from the sender's manager
+    and wait for it to be mined
+    
+    A transaction that is not mined within TX_STUCK_SECONDS is re-broadcast
+    with the same nonce and fees raised by GAS_BUMP_PERCENT, up to
+    MAX_GAS_BUMPS times. Stale nonces trigger a resync and a fresh nonce.
+    
+    Returns:
+        Dictionary with success status, txHash and the mined receipt or error
+    """
+    # Fees are looked up before a nonce is taken, so a failed lookup holds up no one
+    fees = await current_fees()
+    nonce = await nonce_manager.allocate()
+    tx_hashes: List[str] = []
+    resyncs = 0
+    bumps = 0
+    
+    try:
+        while True:
+            sent = await send_transaction(tx, nonce, fees, on_progress)
+            
+            if sent["success"]:
+                if on_progress:
+                    event = "replaced" if tx_hashes else "submitted"
+                    await on_progress(event, {"txHash": sent["txHash"], "nonce": nonce})
+                tx_hashes.append(sent["txHash"])
+                logger.info(f"Broadcast {sent['txHash']} with nonce {nonce}")
+            elif tx_hashes:
+                # A replacement failed; one of our earlier broadcasts may already be mined
+                logger.warning(f"Replacement for nonce {nonce} failed: {sent['error']}")
+                if is_nonce_error(sent["error"]):
+                    receipt = await wait_for_receipt(tx_hashes, RECEIPT_POLL_INTERVAL)
+                    if receipt:
+                        break
+                    await nonce_manager.resync()
+                    return {"success": False, "txHash": tx_hashes[-1],
+                            "error": f"Nonce {nonce} was used by another transaction"}
+            elif is_nonce_error(sent["error"]) and resyncs < MAX_NONCE_RESYNCS:
+                # Our nonce was already taken; it is spent, so do not release it
+                logger.warning(f"Nonce {nonce} is stale ({sent['error']}), resyncing")
+                spent, nonce = nonce, None
+                await nonce_manager.confirm(spent)
+                await nonce_manager.resync()
+                nonce = await nonce_manager.allocate()
+                resyncs += 1
+                continue
+            else:
+                released, nonce = nonce, None
+                await nonce_manager.release(released)
+                return sent
+            
+            receipt = await wait_for_receipt(tx_hashes, TX_STUCK_SECONDS)
+            if receipt:
+                break
+            
+            if bumps >= MAX_GAS_BUMPS:
+                receipt = await wait_for_receipt(tx_hashes, DEPLOY_TIMEOUT_SECONDS)
+                if receipt:
+                    break
+                await nonce_manager.resync()
+                return {"success": False, "txHash": tx_hashes[-1],
+                        "error": f"Transaction {tx_hashes[-1]} was not mined in time"}
+            
+            bumps += 1
+            try:
+                latest = await current_fees()
+            except RpcError as e:
+                # The transaction is out there; a bump over our own fees still replaces it
+                logger.warning(f"Fee lookup failed ({e}), bumping the previous fees")
+                latest = fees
+            fees = bump_fees(fees, latest)
+            logger.warning(f"Nonce {nonce} stuck, bumping fees (attempt {bumps}/{MAX_GAS_BUMPS})")
+    except BaseException:
+        # Nothing was broadcast with this nonce, so the next transaction can take it
+        if not tx_hashes and nonce is not None:
+            await nonce_manager.release(nonce)
+        raise
+    
+    await nonce_manager.confirm(nonce)
+    if on_progress:
+        await on_progress("mined", {"txHash": receipt["transactionHash"],
+                                    "blockNumber": int(receipt.get("blockNumber") or "0x0", 16)})
+    return {"success": True, "txHash": receipt["transactionHash"], "receipt": receipt}
 
-async def deploy_token_via_clanker(config: Dict[str, Any]) -> Dict[str, Any]:
+async def deploy_token_via_clanker(config: Dict[str, Any],
+                                   on_progress: Optional[EventCallback] = None) -> Dict[str, Any]:
     """
-    Deploy a token using Clanker SDK via Node.js script
+    Deploy a token using Clanker SDK via the static Node.js runner
+    
+    The runner builds and estimates the deploy transaction; this process
+    assigns its nonce and fees and tracks it until it is mined.
     
     Args:
         config: Token configuration dictionary
+        on_progress: Optional callback for progress events ("signed"
+            before each broadcast, "submitted", "replaced" after a gas
+            bump, "mined")
         
     Returns:
         Dictionary with success status and result/error
@@ -32,25 +257,15 @@ async def deploy_token_via_clanker(config: Dict[str, Any]) -> Dict[str, Any]:
     try:
         logger.info(f"Starting token deployment for: {config['name']} ({config['symbol']})")
         
-        # Create the deployment script
-        deployment_script = create_deployment_script(config)
-        
-        # Write script to temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
-            f.write(deployment_script)
-            script_path = f.name
-        
-        try:
-            # Execute the Node.js script
-            result = await execute_deployment_script(script_path)
+        async with router.acquire() as shard:
+            with stage_timer("deploy"):
+                result = await deploy_with_shard(config, shard, on_progress)
+            router.record(shard, result["success"])
             return result
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(script_path)
-            except OSError:
-                pass
                 
+    except NoDeployerAvailableError as e:
+        logger.error(str(e))
+        return {"success": False, "error": str(e)}
     except Exception as e:
         logger.error(f"Deployment error: {e}")
         return {
@@ -58,221 +273,175 @@ async def deploy_token_via_clanker(config: Dict[str, Any]) -> Dict[str, Any]:
             "error": str(e)
         }
 
-def create_deployment_script(config: Dict[str, Any]) -> str:
-    """Create the Node.js deployment script using Clanker SDK"""
+async def deploy_with_shard(config: Dict[str, Any], shard: DeployerShard,
+                            on_progress: Optional[EventCallback] = None) -> Dict[str, Any]:
+    """Deploy a token from one deployer key"""
+    job = create_deployment_script(config, shard.address)
+    vanity = None
+    if VANITY_ENABLED:
+        with stage_timer("vanity"):
+            vanity = await find_vanity_salt(job)
+    if vanity:
+        job["config"]["salt"] = vanity["salt"]
+    
+    # Build and estimate the deploy transaction
+    prepared = await execute_deployment_script(job)
+    if not prepared["success"]:
+        return prepared
+    if vanity:
+        prepared["expectedAddress"] = vanity["address"]
+    tx = {key: prepared[key] for key in ("from", "to", "data", "value", "gas")}
     
-    # Prepare social media URLs
-    social_urls = []
-    for social in config.get('socialMediaUrls', []):
-        social_urls.append({
-            "platform": social['platform'],
-            "url": social['url']
-        })
+    # Broadcast it and wait for it to be mined
+    with stage_timer("confirm"):
+        submitted = await submit_transaction(tx, shard.nonces, on_progress)
+    if not submitted["success"]:
+        return submitted
     
-    script = f"""
-import {{ Clanker }} from 'clanker-sdk';
-import {{ createPublicClient, createWalletClient, http }} from 'viem';
-import {{ privateKeyToAccount }} from 'viem/accounts';
-import {{ base }} from 'viem/chains';
+    return deployment_result(submitted["receipt"], shard.address, prepared.get("expectedAddress"))
 
-// Configuration
-const PRIVATE_KEY = "{PRIVATE_KEY}";
-const RPC_URL = "{RPC_URL}";
+def deployment_result(receipt: Dict[str, Any], deployer: str,
+                      expected_address: Optional[str] = None) -> Dict[str, Any]:
+    """Result of a deploy from its mined receipt"""
+    tx_hash = receipt["transactionHash"]
+    if not receipt_succeeded(receipt):
+        return {"success": False, "txHash": tx_hash, "error": "Deploy transaction reverted"}
+    
+    address = token_address_from_receipt(receipt) or expected_address
+    if not address:
+        return {"success": False, "txHash": tx_hash, "error": "No TokenCreated event in deploy receipt"}
+    
+    logger.info(f"Deployment successful: {address} (deployer {deployer})")
+    return {
+        "success": True,
+        "address": address,
+        "txHash": tx_hash,
+        "deployer": deployer,
+        "basescanUrl": f"https://basescan.org/token/{address}",
+        "deploymentTime": datetime.utcnow().isoformat()
+    }
 
-// Token configuration
-const tokenConfig = {{
-    name: "{config['name']}",
-    symbol: "{config['symbol']}",
-    image: "{config['image']}",
-    metadata: {{
-        description: "{config.get('description', '')}",
-        socialMediaUrls: {json.dumps(social_urls)},
-        auditUrls: []
-    }},
-    context: {{
-        interface: "Slanker",
-        platform: "Telegram Mini App",
-        messageId: "Deploy via Slanker",
-        id: "{config['symbol']}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-    }},
-    pool: {{
-        quoteToken: "0x4200000000000000000000000000000000000006", // WETH on Base
-        initialMarketCap: "{config['initialMarketCap']}"
-    }},
-    vault: {{
-        percentage: {config['vestingPercentage']},
-        durationInDays: {config['vestingDurationDays']}
-    }},
-    devBuy: {{
-        ethAmount: 0 // No initial buy
-    }},
-    rewardsConfig: {{
-        creatorReward: {config['creatorReward']},
-        creatorAdmin: null, // Will be set to account address
-        creatorRewardRecipient: null, // Will be set to account address
-        interfaceAdmin: "0x1eaf444ebDf6495C57aD52A04C61521bBf564ace",
-        interfaceRewardRecipient: "0x1eaf444ebDf6495C57aD52A04C61521bBf564ace"
-    }}
-}};
+async def resume_deployment(config: Dict[str, Any], signed: List[Dict[str, Any]],
+                            on_progress: Optional[EventCallback] = None) -> Optional[Dict[str, Any]]:
+    """
+    Finish a deploy from the transactions a stopped process signed for it
+    
+    Unless one of them is already mined, the newest (the last gas bump) is
+    broadcast again, which the node ignores if it has it, and followed to
+    its receipt like a fresh one.
+    
+    Returns:
+        The deploy result, or None if the transactions' nonce went to
+        another transaction, so the deploy should start over
+    """
+    latest = signed[-1]
+    tx_hashes = [entry["txHash"] for entry in signed]
+    logger.info(f"Resuming deploy of {config['symbol']} from {latest['txHash']} (nonce {latest['nonce']})")
+    
+    receipt = await wait_for_receipt(tx_hashes, 0)
+    if receipt is None:
+        resent = await broadcast(latest["rawTransaction"], latest["txHash"])
+        if not resent["success"]:
+            logger.warning(f"Resending {latest['txHash']} failed: {resent['error']}")
+            if is_nonce_error(resent["error"]):
+                # The nonce is used: by one of ours if it was mined meanwhile
+                receipt = await wait_for_receipt(tx_hashes, RECEIPT_POLL_INTERVAL)
+                if receipt is None:
+                    return None
+    
+    if receipt is None:
+        if on_progress:
+            await on_progress("submitted", {"txHash": latest["txHash"], "nonce": latest["nonce"]})
+        with stage_timer("confirm"):
+            receipt = await wait_for_receipt(tx_hashes, DEPLOY_TIMEOUT_SECONDS)
+        if receipt is None:
+            return {"success": False, "txHash": latest["txHash"],
+                    "error": f"Transaction {latest['txHash']} was not mined in time"}
+    
+    # Clear the stopped process's allocation from the shared nonce state
+    for shard in router.shards:
+        if shard.address.lower() == latest["deployer"].lower():
+            await shard.nonces.confirm(latest["nonce"])
+    if on_progress:
+        await on_progress("mined", {"txHash": receipt["transactionHash"],
+                                    "blockNumber": int(receipt.get("blockNumber") or "0x0", 16)})
+    return deployment_result(receipt, latest["deployer"])
 
-async function deployToken() {{
-    try {{
-        // Initialize wallet with private key
-        const account = privateKeyToAccount(PRIVATE_KEY);
-        
-        // Set creator addresses
-        tokenConfig.rewardsConfig.creatorAdmin = account.address;
-        tokenConfig.rewardsConfig.creatorRewardRecipient = account.address;
-        
-        const publicClient = createPublicClient({{
-            chain: base,
-            transport: http(RPC_URL),
-        }});
-        
-        const wallet = createWalletClient({{
-            account,
-            chain: base,
-            transport: http(RPC_URL),
-        }});
-        
-        // Initialize Clanker SDK
-        const clanker = new Clanker({{
-            wallet,
-            publicClient,
-        }});
-        
-        console.log("🚀 Deploying Token...");
-        console.log("Token Name:", tokenConfig.name);
-        console.log("Symbol:", tokenConfig.symbol);
-        console.log("Initial Market Cap:", tokenConfig.pool.initialMarketCap, "ETH");
-        console.log("Vesting:", tokenConfig.vault.percentage + "% for " + tokenConfig.vault.durationInDays + " days");
-        console.log("Creator Reward:", tokenConfig.rewardsConfig.creatorReward + "%");
-        
-        // Deploy the token
-        const tokenAddress = await clanker.deployToken(tokenConfig);
-        
-        console.log("✅ Token deployed successfully!");
-        console.log("Token Address:", tokenAddress);
-        console.log("BaseScan URL:", `https://basescan.org/token/${{tokenAddress}}`);
-        
-        // Output result as JSON for Python to parse
-        const result = {{
-            success: true,
-            address: tokenAddress,
-            basescanUrl: `https://basescan.org/token/${{tokenAddress}}`,
-            deploymentTime: new Date().toISOString()
-        }};
-        
-        console.log("SLANKER_RESULT:", JSON.stringify(result));
-        
-    }} catch (error) {{
-        console.error("❌ Deployment failed:", error.message);
-        
-        const result = {{
-            success: false,
-            error: error.message || "Unknown deployment error",
-            deploymentTime: new Date().toISOString()
-        }};
-        
-        console.log("SLANKER_RESULT:", JSON.stringify(result));
-        process.exit(1);
-    }}
-}}
+async def find_vanity_salt(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Grind a vanity salt for a prepare job locally; None deploys without one"""
+    target = await execute_deployment_script({"op": "vanityTarget", "config": job["config"]})
+    if not target["success"]:
+        logger.warning(f"Deploying without vanity address: {target['error']}")
+        return None
+    return await grinder.find(target["deployer"], target["admin"], target["initCodeHash"])
 
-deployToken().catch(error => {{
-    console.error("Fatal error:", error);
-    const result = {{
-        success: false,
-        error: error.message || "Fatal deployment error",
-        deploymentTime: new Date().toISOString()
-    }};
-    console.log("SLANKER_RESULT:", JSON.stringify(result));
-    process.exit(1);
-}});
-"""
-    
-    return script
+def create_deployment_script(config: Dict[str, Any], deployer: str) -> Dict[str, Any]:
+    """Create the prepare job passed to the runner as JSON data"""
+    return {
+        "op": "prepare",
+        "config": {
+            **config,
+            "deployer": deployer,
+            "contextId": f"{config['symbol']}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        }
+    }
 
-async def execute_deployment_script(script_path: str) -> Dict[str, Any]:
-    """Execute the Node.js deployment script and parse the result"""
+async def execute_deployment_script(job: Dict[str, Any],
+                                    on_event: Optional[EventCallback] = None,
+                                    timeout: float = DEPLOY_TIMEOUT_SECONDS) -> Dict[str, Any]:
+    """
+    Execute a runner job on a pooled worker (or a one-shot runner) and parse the result
+    
+    Failures of the runner process itself, rather than of the job, are
+    marked with "infrastructure": True.
+    """
     try:
-        logger.info("Executing deployment script...")
-        
-        # Run the script with Node.js
-        process = await asyncio.create_subprocess_exec(
-            'node', script_path,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout, stderr = await process.communicate()
-        
-        # Decode output
-        stdout_text = stdout.decode('utf-8') if stdout else ""
-        stderr_text = stderr.decode('utf-8') if stderr else ""
-        
-        logger.info(f"Script stdout: {stdout_text}")
-        if stderr_text:
-            logger.warning(f"Script stderr: {stderr_text}")
+        logger.info(f"Executing {job['op']} job...")
         
-        # Parse the result from stdout
-        result = parse_deployment_result(stdout_text)
+        with RUNNER_SECONDS.labels(job["op"]).time():
+            if DEPLOY_WORKERS > 0:
+                if _pool is None:
+                    await start_worker_pool()
+                message = await _pool.submit(job, timeout=timeout, on_event=on_event)
+            else:
+                message = await run_once(job, timeout=timeout, env=deployer_env(), on_event=on_event)
         
-        if process.returncode == 0 and result["success"]:
-            logger.info(f"Deployment successful: {result.get('address', 'Unknown address')}")
-        else:
-            logger.error(f"Deployment failed with return code {process.returncode}")
-            if not result.get("error"):
-                result["error"] = f"Script failed with return code {process.returncode}"
-                result["success"] = False
+        with stage_timer("parse"):
+            result = parse_deployment_result(message)
+        if not result["success"]:
+            logger.error(f"Runner {job['op']} job failed: {result.get('error')}")
         
         return result
         
     except FileNotFoundError:
         error_msg = "Node.js not found. Please install Node.js to deploy tokens."
         logger.error(error_msg)
-        return {"success": False, "error": error_msg}
+        return {"success": False, "error": error_msg, "infrastructure": True}
+    except WorkerError as e:
+        logger.error(str(e))
+        return {"success": False, "error": str(e), "infrastructure": True}
     except Exception as e:
-        error_msg = f"Failed to execute deployment script: {str(e)}"
+        error_msg = f"Failed to execute deployment job: {str(e)}"
         logger.error(error_msg)
-        return {"success": False, "error": error_msg}
+        return {"success": False, "error": error_msg, "infrastructure": True}
 
-def parse_deployment_result(output: str) -> Dict[str, Any]:
-    """Parse the deployment result from script output"""
-    try:
-        # Look for the result line
-        lines = output.split('\n')
-        for line in lines:
-            if line.startswith('SLANKER_RESULT:'):
-                result_json = line.replace('SLANKER_RESULT:', '').strip()
-                result = json.loads(result_json)
-                return result
-        
-        # If no result found, assume failure
-        return {
-            "success": False,
-            "error": "No deployment result found in script output"
-        }
-        
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse deployment result: {e}")
-        return {
-            "success": False,
-            "error": "Failed to parse deployment result"
-        }
-    except Exception as e:
-        logger.error(f"Error parsing deployment result: {e}")
-        return {
-            "success": False,
-            "error": str(e)
-        }
+def parse_deployment_result(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse a runner answer into a result dictionary"""
+    if message.get("ok"):
+        return {"success": True, **(message.get("result") or {})}
+    
+    return {
+        "success": False,
+        "error": message.get("error") or "Unknown deployment error"
+    }
 
 # Security function to ensure private key is cleared from memory
 def clear_sensitive_data():
     """Clear sensitive data from memory"""
-    global PRIVATE_KEY
-    if PRIVATE_KEY:
-        # Overwrite the private key in memory
-        PRIVATE_KEY = "0" * len(PRIVATE_KEY)
+    global PRIVATE_KEY, PRIVATE_KEYS
+    if PRIVATE_KEY or PRIVATE_KEYS:
+        # Overwrite the private keys in memory
         PRIVATE_KEY = None
+        PRIVATE_KEYS = ["0" * len(key) for key in PRIVATE_KEYS]
+        PRIVATE_KEYS = []
         logger.info("Sensitive data cleared from memory")
\ No newline at end of file
@@ -0,0 +1,74 @@
+import os
+import json
+import asyncio
+from typing import Dict, Any, List, AsyncIterator
+
+from loguru import logger
+
+# Configuration
+REDIS_URL = os.getenv("REDIS_URL")
+DEPLOY_EVENTS_CHANNEL = os.getenv("DEPLOY_EVENTS_CHANNEL", "slanker:deploys")
+EVENT_SUBSCRIBER_QUEUE_MAX = int(os.getenv("EVENT_SUBSCRIBER_QUEUE_MAX", "1000"))
+
+class MemoryEventBus:
+    """In-process deploy event bus; subscribers only see this process's deploys"""
+
+    def __init__(self, queue_max: int = EVENT_SUBSCRIBER_QUEUE_MAX):
+        self.queue_max = queue_max
+        self._subscribers: List[asyncio.Queue] = []
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(f"Deploy event subscriber is behind, dropping event for job {event.get('jobId')}")
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield events published from now on until the caller stops iterating"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_max)
+        self._subscribers.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.remove(queue)
+
+    async def close(self) -> None:
+        pass
+
+class RedisEventBus:
+    """Deploy events shared through Redis pub/sub, seen by every API process and the bot"""
+
+    def __init__(self, url: str, channel: str = DEPLOY_EVENTS_CHANNEL):
+        # Imported lazily so the in-memory bus works without redis installed
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url, decode_responses=True)
+        self.channel = channel
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        await self.redis.publish(self.channel, json.dumps(event))
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                try:
+                    yield json.loads(message["data"])
+                except ValueError:
+                    logger.warning(f"Ignoring malformed deploy event on {self.channel}")
+        finally:
+            await pubsub.unsubscribe(self.channel)
+            await pubsub.close()
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+def create_event_bus():
+    """Pick the event bus from the environment (Redis when REDIS_URL is set)"""
+    if REDIS_URL:
+        logger.info("Using Redis deploy event bus")
+        return RedisEventBus(REDIS_URL)
+    return MemoryEventBus()
@@ -0,0 +1,134 @@
+import os
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from loguru import logger
+
+# Configuration
+REDIS_URL = os.getenv("REDIS_URL")
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+
+# Longest Idempotency-Key header value accepted
+MAX_KEY_LENGTH = 255
+
+# Point a key at a job unless another job holds it, in one step so two API
+# processes can never both win the same key.
+#   KEYS[1] key; ARGV: job ID, job the key may be taken from ("" for none), TTL in ms
+#   returns the job ID the key points at afterwards
+CLAIM_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current and current ~= ARGV[2] then
+  return current
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[3])
+return ARGV[1]
+"""
+
+#   KEYS[1] key; ARGV: job ID the key must still point at
+DISCARD_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+def content_key(canonical: bytes, scope: str = "") -> str:
+    """Fallback idempotency key: hash of the canonical validated request (see validation.deploy_config)"""
+    return f"{scope}hash:" + hashlib.sha256(canonical).hexdigest()
+
+def header_key(value: str, scope: str = "") -> str:
+    """Idempotency key from a client-supplied Idempotency-Key header"""
+    if len(value) > MAX_KEY_LENGTH:
+        raise ValueError(f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+    return f"{scope}key:" + value
+
+def user_scope(user: Optional[Dict[str, Any]]) -> str:
+    """Key prefix keeping one Telegram user's requests from matching another's jobs"""
+    return f"tg:{user['id']}:" if user else ""
+
+class MemoryIdempotencyStore:
+    """
+    Maps idempotency keys to deploy job IDs within one process
+
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted beyond `max_entries`.
+    """
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL_SECONDS, max_entries: int = IDEMPOTENCY_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        job_id, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return job_id
+
+    async def claim(self, key: str, job_id: str, replaces: Optional[str] = None) -> str:
+        """
+        Point `key` at `job_id` unless it already points at another job
+
+        `replaces` is a job the key may be taken over from (a failed one).
+        Returns the job ID the key points at afterwards: `job_id` if the
+        claim won, else the job that got there first.
+        """
+        current = await self.get(key)
+        if current is not None and current != replaces:
+            return current
+        self._entries[key] = (job_id, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return job_id
+
+    async def discard(self, key: str, job_id: str) -> None:
+        """Drop `key` if it still points at `job_id`"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == job_id:
+            del self._entries[key]
+
+    async def close(self) -> None:
+        pass
+
+class RedisIdempotencyStore:
+    """Idempotency keys shared by every API process through Redis"""
+
+    def __init__(self, url: str, ttl: float = IDEMPOTENCY_TTL_SECONDS, prefix: str = "slanker:idem:"):
+        # Imported lazily so the in-memory store works without redis installed
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url, decode_responses=True)
+        self.ttl = int(ttl * 1000)
+        self.prefix = prefix
+        self._claim = self.redis.register_script(CLAIM_SCRIPT)
+        self._discard = self.redis.register_script(DISCARD_SCRIPT)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.redis.get(self.prefix + key)
+
+    async def claim(self, key: str, job_id: str, replaces: Optional[str] = None) -> str:
+        return await self._claim(keys=[self.prefix + key], args=[job_id, replaces or "", self.ttl])
+
+    async def discard(self, key: str, job_id: str) -> None:
+        await self._discard(keys=[self.prefix + key], args=[job_id])
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+def create_idempotency_store():
+    """Pick the idempotency store from the environment (Redis when REDIS_URL is set)"""
+    if REDIS_URL:
+        logger.info("Using Redis idempotency store")
+        return RedisIdempotencyStore(REDIS_URL)
+    return MemoryIdempotencyStore()
@@ -0,0 +1,395 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Callable, Awaitable, AsyncIterator
+
+from loguru import logger
+
+from journal import JOURNAL_HEARTBEAT_SECONDS, SIGNED
+from metrics import STAGE_SECONDS, DEPLOYS_IN_FLIGHT, DEPLOY_RESULTS, QUEUE_DEPTH
+
+# Configuration
+REDIS_URL = os.getenv("REDIS_URL")
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "86400"))
+JOB_STORE_MAX = int(os.getenv("JOB_STORE_MAX", "10000"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+
+# Job statuses, in the order a successful deploy goes through them
+QUEUED = "queued"
+SIMULATING = "simulating"
+SUBMITTED = "submitted"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+
+TERMINAL_STATUSES = {CONFIRMED, FAILED}
+
+# Error of jobs still unfinished when the process stops
+INTERRUPTED_ERROR = "Deployment interrupted by an API restart, please retry"
+
+ProgressCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+DeployRunner = Callable[[Dict[str, Any], ProgressCallback], Awaitable[Dict[str, Any]]]
+# Finishes a deploy from the transactions a previous process signed, or
+# returns None if it has to start over
+DeployResumer = Callable[[Dict[str, Any], List[Dict[str, Any]], ProgressCallback],
+                         Awaitable[Optional[Dict[str, Any]]]]
+
+class QueueFullError(Exception):
+    """Raised when the deploy queue cannot accept more jobs"""
+
+@dataclass
+class DeployJob:
+    """A deploy request and its progress"""
+    id: str
+    config: Dict[str, Any]
+    status: str = QUEUED
+    createdAt: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    updatedAt: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    txHash: Optional[str] = None
+    address: Optional[str] = None
+    basescanUrl: Optional[str] = None
+    error: Optional[str] = None
+    # Telegram chat told about the outcome, if the deploy came from the bot's web app
+    notifyChatId: Optional[int] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def public_dict(self) -> Dict[str, Any]:
+        """Job fields that are safe to return to clients"""
+        data = self.to_dict()
+        data.pop("config")
+        data.pop("notifyChatId")
+        data["jobId"] = data.pop("id")
+        return data
+
+    def event_dict(self) -> Dict[str, Any]:
+        """Job state published on the deploy event bus"""
+        data = self.public_dict()
+        data.update(name=self.config.get("name"), symbol=self.config.get("symbol"), chatId=self.notifyChatId)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DeployJob":
+        return cls(**data)
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+class MemoryJobStore:
+    """In-process job store, bounded by JOB_STORE_MAX and JOB_TTL_SECONDS"""
+
+    def __init__(self, max_jobs: int = JOB_STORE_MAX, ttl: int = JOB_TTL_SECONDS):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, job_id: str) -> Optional[DeployJob]:
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return None
+        job, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._jobs[job_id]
+            return None
+        return job
+
+    async def save(self, job: DeployJob) -> None:
+        self._jobs[job.id] = (job, time.monotonic() + self.ttl)
+        self._jobs.move_to_end(job.id)
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+
+    async def close(self) -> None:
+        pass
+
+class RedisJobStore:
+    """Job store shared through Redis (e.g. the redis service in docker-compose)"""
+
+    def __init__(self, url: str, ttl: int = JOB_TTL_SECONDS, prefix: str = "slanker:job:"):
+        # Imported lazily so the in-memory store works without redis installed
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, job_id: str) -> Optional[DeployJob]:
+        raw = await self.redis.get(self.prefix + job_id)
+        return DeployJob.from_dict(json.loads(raw)) if raw else None
+
+    async def save(self, job: DeployJob) -> None:
+        await self.redis.set(self.prefix + job.id, json.dumps(job.to_dict()), ex=self.ttl)
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+def create_job_store():
+    """Pick the job store from the environment (Redis when REDIS_URL is set)"""
+    if REDIS_URL:
+        logger.info("Using Redis job store")
+        return RedisJobStore(REDIS_URL)
+    return MemoryJobStore()
+
+class DeployQueue:
+    """
+    In-process deploy queue with bounded concurrency
+
+    Jobs are accepted immediately and run by `concurrency` consumer tasks.
+    Status changes are saved to the store and pushed to local subscribers;
+    finished jobs are also published on the event bus, if one is given.
+    On shutdown `drain` stops intake and lets accepted jobs finish.
+
+    With a journal, jobs and their signed transactions are recorded before
+    they are acknowledged or broadcast. Jobs a stopped process left open,
+    including this one's predecessor, are adopted and finished with
+    `resume`, so no deploy is lost between broadcast and receipt.
+    """
+
+    def __init__(self, store, runner: DeployRunner, concurrency: int, max_queued: int = 0, events=None,
+                 journal=None, resume: Optional[DeployResumer] = None,
+                 heartbeat_interval: float = JOURNAL_HEARTBEAT_SECONDS):
+        self.store = store
+        self.events = events
+        self.journal = journal
+        self.runner = runner
+        self.resume = resume
+        self.heartbeat_interval = heartbeat_interval
+        self.concurrency = concurrency
+        self._queue: "asyncio.Queue[DeployJob]" = asyncio.Queue(maxsize=max_queued)
+        self._consumers: List[asyncio.Task] = []
+        self._watchers: Dict[str, List[asyncio.Queue]] = {}
+        self._local: Dict[str, DeployJob] = {}
+        self._enqueued_at: Dict[str, float] = {}
+        # Transactions signed for adopted jobs by the process that queued them
+        self._signed: Dict[str, List[Dict[str, Any]]] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+        # Adopted jobs waiting for room in a full queue
+        self._puts: Set[asyncio.Task] = set()
+        self.accepting = True
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        """Start the consumer tasks, after adopting jobs left open in the journal"""
+        if self.journal is not None:
+            await self.journal.open()
+            # Resumed jobs are queued first, so their transactions are re-sent
+            # before new jobs allocate nonces
+            await self._adopt()
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+        logger.info(f"Deploy queue started with concurrency {self.concurrency}")
+
+    async def _adopt(self) -> None:
+        for entry in await self.journal.adopt():
+            job = DeployJob.from_dict(entry["job"])
+            job.status = QUEUED
+            if entry["signed"]:
+                self._signed[job.id] = entry["signed"]
+            self._local[job.id] = job
+            self._enqueued_at[job.id] = time.monotonic()
+            await self.store.save(job)
+            try:
+                self._queue.put_nowait(job)
+            except asyncio.QueueFull:
+                # Adopted jobs were accepted already: wait for room rather than drop them
+                task = asyncio.create_task(self._queue.put(job))
+                self._puts.add(task)
+                task.add_done_callback(self._puts.discard)
+            QUEUE_DEPTH.set(self.depth)
+            logger.warning(f"Resuming deploy job {job.id} left open by a stopped process "
+                           f"({len(entry['signed'])} signed transactions)")
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.journal.heartbeat()
+                if self.accepting:
+                    await self._adopt()
+            except Exception as e:
+                logger.error(f"Deploy journal heartbeat failed: {e}")
+
+    async def drain(self, timeout: float) -> None:
+        """Stop accepting jobs and wait up to `timeout` seconds for queued and running ones"""
+        self.accepting = False
+        if not self._local:
+            return
+        logger.info(f"Draining {len(self._local)} deploy jobs (up to {timeout:.0f}s)")
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            logger.info("Deploy queue drained")
+        except asyncio.TimeoutError:
+            logger.warning(f"{len(self._local)} deploy jobs still unfinished after {timeout:.0f}s")
+
+    async def close(self) -> None:
+        """
+        Stop the consumer tasks; jobs they did not finish are left to the
+        journal for the next process, or marked failed without one
+        """
+        self.accepting = False
+        unfinished = list(self._local.values())
+        tasks = self._consumers + list(self._puts) + ([self._heartbeat] if self._heartbeat else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.journal is not None:
+            left = sum(not job.finished for job in unfinished)
+            if left:
+                logger.warning(f"{left} unfinished deploy jobs will be resumed from the journal")
+            await self.journal.close()
+        else:
+            for job in unfinished:
+                if not job.finished:
+                    try:
+                        await self._update(job, FAILED, error=INTERRUPTED_ERROR)
+                    except Exception as e:
+                        logger.error(f"Could not mark interrupted job {job.id} failed: {e}")
+        await self.store.close()
+        if self.events is not None:
+            await self.events.close()
+
+    async def submit(self, config: Dict[str, Any], notify_chat_id: Optional[int] = None,
+                     job_id: Optional[str] = None) -> DeployJob:
+        """Queue a validated deploy config and return its job"""
+        if not self.accepting:
+            raise QueueFullError("The API is restarting, please retry shortly")
+        job = DeployJob(id=job_id or new_job_id(), config=config, notifyChatId=notify_chat_id)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError("Deploy queue is full, please retry shortly")
+        QUEUE_DEPTH.set(self.depth)
+        self._local[job.id] = job
+        self._enqueued_at[job.id] = time.monotonic()
+        if self.journal is not None:
+            await self.journal.record(job.id, QUEUED, job.to_dict())
+        await self.store.save(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[DeployJob]:
+        return self._local.get(job_id) or await self.store.get(job_id)
+
+    async def _update(self, job: DeployJob, status: str, **fields) -> None:
+        job.status = status
+        job.updatedAt = datetime.utcnow().isoformat()
+        for key, value in fields.items():
+            setattr(job, key, value)
+        if self.journal is not None and status in TERMINAL_STATUSES:
+            await self.journal.record(job.id, status, {"txHash": job.txHash, "address": job.address,
+                                                       "error": job.error})
+        await self.store.save(job)
+        if status in TERMINAL_STATUSES:
+            DEPLOY_RESULTS.labels(status).inc()
+            await self._publish(job)
+
+        for watcher in self._watchers.get(job.id, []):
+            watcher.put_nowait(job.public_dict())
+
+    async def _publish(self, job: DeployJob) -> None:
+        if self.events is None:
+            return
+        try:
+            await self.events.publish(job.event_dict())
+        except Exception as e:
+            # The job itself is saved; only the push notification is lost
+            logger.error(f"Could not publish deploy event for job {job.id}: {e}")
+
+    async def _consume(self) -> None:
+        while True:
+            job = await self._queue.get()
+            QUEUE_DEPTH.set(self.depth)
+            enqueued_at = self._enqueued_at.pop(job.id, None)
+            if enqueued_at is not None:
+                STAGE_SECONDS.labels("queue_wait").observe(time.monotonic() - enqueued_at)
+            try:
+                with DEPLOYS_IN_FLIGHT.track_inprogress():
+                    await self._run(job)
+            except Exception as e:
+                logger.error(f"Deploy job {job.id} crashed: {e}")
+                try:
+                    await self._update(job, FAILED, error="Internal server error during deployment")
+                except Exception as e:
+                    # e.g. the job store is down; this consumer must keep running regardless
+                    logger.error(f"Could not mark deploy job {job.id} failed: {e}")
+            finally:
+                self._local.pop(job.id, None)
+                self._queue.task_done()
+
+    async def _run(self, job: DeployJob) -> None:
+        async def progress(event: str, data: Dict[str, Any]) -> None:
+            # Journaled before broadcast, so a crash can never lose a sent transaction
+            if event == SIGNED and self.journal is not None:
+                await self.journal.record(job.id, SIGNED, data)
+            # A replacement or the mined transaction may carry a new hash
+            if event in (SUBMITTED, "replaced", "mined"):
+                await self._update(job, SUBMITTED, txHash=data.get("txHash"))
+
+        result = None
+        signed = self._signed.pop(job.id, None)
+        if signed and self.resume is not None:
+            await self._update(job, SUBMITTED, txHash=signed[-1]["txHash"])
+            result = await self.resume(job.config, signed, progress)
+        if result is None:
+            await self._update(job, SIMULATING)
+            result = await self.runner(job.config, progress)
+
+        if result.get("success"):
+            await self._update(
+                job, CONFIRMED,
+                address=result.get("address"),
+                txHash=result.get("txHash") or job.txHash,
+                basescanUrl=f"https://basescan.org/token/{result.get('address')}"
+            )
+        else:
+            await self._update(job, FAILED, error=result.get("error") or "Deployment failed")
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the job's public state now and after every status change
+
+        Jobs running in this process are followed through their status
+        updates; jobs owned by another process are polled from the store.
+        """
+        job = await self.get(job_id)
+        if job is None:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        local = job.id in self._local
+        if local:
+            self._watchers.setdefault(job_id, []).append(queue)
+
+        try:
+            last = job.public_dict()
+            yield last
+            while last["status"] not in TERMINAL_STATUSES:
+                if local:
+                    current = await queue.get()
+                else:
+                    await asyncio.sleep(JOB_POLL_INTERVAL)
+                    stored = await self.store.get(job_id)
+                    if stored is None:
+                        return
+                    current = stored.public_dict()
+                if current["status"] != last["status"]:
+                    yield current
+                last = current
+        finally:
+            if local:
+                watchers = self._watchers.get(job_id, [])
+                if queue in watchers:
+                    watchers.remove(queue)
+                if not watchers:
+                    self._watchers.pop(job_id, None)
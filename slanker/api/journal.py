@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from loguru import logger
+
+from metrics import STAGE_SECONDS
+
+# Configuration
+JOURNAL_ENABLED = os.getenv("JOURNAL_ENABLED", "true").lower() == "true"
+JOURNAL_PATH = os.getenv(
+    "JOURNAL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "journal", "deploys.db")
+)
+# "full" fsyncs every commit (survives power loss), "normal" only survives process crashes
+JOURNAL_SYNC = os.getenv("JOURNAL_SYNC", "full").lower()
+JOURNAL_HEARTBEAT_SECONDS = float(os.getenv("JOURNAL_HEARTBEAT_SECONDS", "5"))
+# A process silent for this long is presumed dead and its jobs are adopted
+JOURNAL_OWNER_TIMEOUT_SECONDS = float(os.getenv("JOURNAL_OWNER_TIMEOUT_SECONDS", "30"))
+JOURNAL_RETENTION_SECONDS = int(os.getenv("JOURNAL_RETENTION_SECONDS", "86400"))
+
+if JOURNAL_SYNC not in ("full", "normal"):
+    raise ValueError("JOURNAL_SYNC must be 'full' or 'normal'")
+
+# Journal records of a deploy job; a job is open from QUEUED until a terminal record
+QUEUED = "queued"
+SIGNED = "signed"
+ADOPTED = "adopted"
+TERMINAL_RECORDS = {"confirmed", "failed"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    status TEXT NOT NULL,
+    data TEXT,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_job ON events (job_id, seq);
+CREATE INDEX IF NOT EXISTS events_at ON events (at);
+CREATE TABLE IF NOT EXISTS open_jobs (
+    job_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS owners (
+    owner TEXT PRIMARY KEY,
+    heartbeat REAL NOT NULL
+);
+"""
+
+Record = Tuple[str, str, Optional[Dict[str, Any]]]
+
+class DeployJournal:
+    """
+    Append-only SQLite journal (WAL mode) of deploy job state changes
+
+    Every job gets a `queued` record carrying the whole job, a `signed`
+    record with the raw transaction before each broadcast, and a terminal
+    record. Records are group-committed: `record` returns once its batch is
+    committed, and whatever arrives while a commit is in progress goes into
+    the next one, so concurrent jobs share fsyncs without any added delay.
+
+    Open jobs belong to the process that wrote them, which keeps a heartbeat
+    in the journal. `adopt` hands the open jobs of processes that stopped
+    (cleanly, silent for `owner_timeout`, or gone from this host) to the
+    caller, one process at a time, together with the transactions they
+    signed, so an API restart or a sibling worker resumes them.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH, sync: str = JOURNAL_SYNC,
+                 owner_timeout: float = JOURNAL_OWNER_TIMEOUT_SECONDS, retention: int = JOURNAL_RETENTION_SECONDS):
+        self.path = path
+        self.sync = sync
+        self.owner_timeout = owner_timeout
+        self.retention = retention
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # SQLite calls block, so they run on one thread that owns the connection
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+        self._db: Optional[sqlite3.Connection] = None
+        self._pending: List[Tuple[Record, asyncio.Future]] = []
+        self._flushing = False
+        self.records = 0
+        self.commits = 0
+
+    async def _call(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(f"PRAGMA synchronous={self.sync.upper()}")
+        db.execute("PRAGMA busy_timeout=10000")
+        db.executescript(SCHEMA)
+        db.execute("INSERT OR REPLACE INTO owners VALUES (?, ?)", (self.owner, time.time()))
+        self._db = db
+
+    async def open(self) -> None:
+        """Create the journal if needed and register this process as an owner"""
+        await self._call(self._open)
+        logger.info(f"Deploy journal at {self.path} (synchronous={self.sync})")
+
+    def _write(self, records: List[Record]) -> None:
+        now = time.time()
+        db = self._db
+        db.execute("BEGIN")
+        try:
+            db.executemany(
+                "INSERT INTO events (job_id, owner, status, data, at) VALUES (?, ?, ?, ?, ?)",
+                [(job_id, self.owner, status, json.dumps(data) if data else None, now)
+                 for job_id, status, data in records]
+            )
+            for job_id, status, _ in records:
+                if status == QUEUED:
+                    db.execute("INSERT OR REPLACE INTO open_jobs VALUES (?, ?)", (job_id, self.owner))
+                elif status in TERMINAL_RECORDS:
+                    db.execute("DELETE FROM open_jobs WHERE job_id = ?", (job_id,))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    async def record(self, job_id: str, status: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Append a record and return once it is committed"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((job_id, status, data), future))
+        if not self._flushing:
+            self._flushing = True
+            asyncio.create_task(self._flush())
+        await future
+
+    async def _flush(self) -> None:
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                started = time.monotonic()
+                try:
+                    await self._call(self._write, [record for record, _ in batch])
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                STAGE_SECONDS.labels("journal").observe(time.monotonic() - started)
+                self.records += len(batch)
+                self.commits += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+        finally:
+            self._flushing = False
+
+    def _heartbeat(self) -> None:
+        now = time.time()
+        self._db.execute("INSERT OR REPLACE INTO owners VALUES (?, ?)", (self.owner, now))
+        # Finished jobs are only kept for inspection
+        self._db.execute(
+            "DELETE FROM events WHERE at < ? AND job_id NOT IN (SELECT job_id FROM open_jobs)",
+            (now - self.retention,)
+        )
+        self._db.execute("DELETE FROM owners WHERE heartbeat < ?", (now - self.retention,))
+
+    async def heartbeat(self) -> None:
+        """Tell other processes this one is alive, and prune old finished jobs"""
+        await self._call(self._heartbeat)
+
+    def _exited(self, owner: str) -> bool:
+        """Whether an owner on this host is a process that is gone (e.g. restarted in place)"""
+        host, pid, _ = owner.rsplit(":", 2)
+        if host != socket.gethostname() or owner == self.owner:
+            return False
+        # A restarted container often gets the previous process's pid
+        if int(pid) == os.getpid():
+            return True
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    def _adopt(self) -> List[Dict[str, Any]]:
+        db = self._db
+        now = time.time()
+        # IMMEDIATE takes the write lock up front, so two processes never adopt the same job
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            live = {owner for owner, in db.execute(
+                "SELECT owner FROM owners WHERE heartbeat >= ?", (now - self.owner_timeout,)
+            ) if not self._exited(owner)}
+            orphans = [(job_id, owner) for job_id, owner in db.execute("SELECT job_id, owner FROM open_jobs")
+                       if owner != self.owner and owner not in live]
+            for job_id, previous in orphans:
+                db.execute("UPDATE open_jobs SET owner = ? WHERE job_id = ?", (self.owner, job_id))
+                db.execute(
+                    "INSERT INTO events (job_id, owner, status, data, at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, self.owner, ADOPTED, json.dumps({"from": previous}), now)
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+        adopted = []
+        for job_id, _ in orphans:
+            job, signed = None, []
+            for status, data in db.execute(
+                "SELECT status, data FROM events WHERE job_id = ? ORDER BY seq", (job_id,)
+            ):
+                if status == QUEUED:
+                    job = json.loads(data)
+                elif status == SIGNED:
+                    signed.append(json.loads(data))
+            if job is None:
+                logger.error(f"Journal has no queued record for open job {job_id}")
+                continue
+            adopted.append({"job": job, "signed": signed})
+        return adopted
+
+    async def adopt(self) -> List[Dict[str, Any]]:
+        """
+        Take over the open jobs of processes that stopped
+
+        Returns:
+            One {"job": job dict, "signed": [signed transactions]} per job
+        """
+        return await self._call(self._adopt)
+
+    def _close(self) -> None:
+        if self._db is None:
+            return
+        # Removing the owner lets the next process adopt our open jobs right away
+        self._db.execute("DELETE FROM owners WHERE owner = ?", (self.owner,))
+        self._db.close()
+        self._db = None
+
+    async def close(self) -> None:
+        """Stop heartbeating; jobs left open are resumed by the next process"""
+        await self._call(self._close)
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "records": self.records, "commits": self.commits}
+
+def create_journal() -> Optional[DeployJournal]:
+    """The deploy journal, unless JOURNAL_ENABLED is false"""
+    return DeployJournal() if JOURNAL_ENABLED else None
@@ -1,22 +1,33 @@
 import os
+import hmac
 import asyncio
 import subprocess
 import json
 import tempfile
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import HTTPBearer
-from pydantic import BaseModel, Field, validator
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 from loguru import logger
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 
-from deploy import deploy_token_via_clanker
+from deploy import (deploy_token_via_clanker, resume_deployment, start_worker_pool, stop_worker_pool, router,
+                    rpc_client, receipt_watcher)
+from vanity import grinder
+from airdrop import airdrops, build_airdrop, AirdropError, ADDRESS_RE, ROOT_RE, AIRDROP_DIR
+from jobs import DeployQueue, DeployJob, QueueFullError, create_job_store, new_job_id, FAILED
+from events import create_event_bus
+from journal import create_journal
+from idempotency import create_idempotency_store, content_key, header_key, user_scope
+from validation import TokenDeployRequest, deploy_config
+from preflight import simulate_deploy, check_config, check_balance, PreflightError
+from ratelimit import rate_limiter, rate_limit, DEPLOY_QUOTA, READ_QUOTA
+from telegram_auth import telegram_auth
+from metrics import CONTENT_TYPE_LATEST, render, stage_timer
 
 # Load environment variables
 load_dotenv()
@@ -24,15 +35,21 @@ load_dotenv()
 # Configuration
 API_SECRET_KEY = os.getenv("API_SECRET_KEY", "your-secret-key")
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "https://web.telegram.org").split(",")
-RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "5"))
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+DEPLOY_CONCURRENCY = int(os.getenv("DEPLOY_CONCURRENCY", os.getenv("DEPLOY_WORKERS", "2")))
+DEPLOY_QUEUE_MAX = int(os.getenv("DEPLOY_QUEUE_MAX", "100"))
+BATCH_MAX_TOKENS = int(os.getenv("BATCH_MAX_TOKENS", "50"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+AIRDROP_MAX_UPLOAD_BYTES = int(os.getenv("AIRDROP_MAX_UPLOAD_MB", "256")) * 1024 * 1024
+# How long shutdown waits for accepted deploys to finish
+DEPLOY_DRAIN_SECONDS = float(os.getenv("DEPLOY_DRAIN_SECONDS", "120"))
+
+# Pause before a claimed idempotency key whose job is not saved yet counts as stale
+CLAIM_SETTLE_SECONDS = 0.05
 
 # Configure logging
 logger.add("logs/api.log", rotation="1 day", level="INFO")
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
-
 # Initialize FastAPI app
 app = FastAPI(
     title="Slanker API",
@@ -42,10 +59,6 @@ app = FastAPI(
     redoc_url="/redoc" if ENVIRONMENT == "development" else None
 )
 
-# Add rate limiting
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -58,52 +71,41 @@ app.add_middleware(
 # Security
 security = HTTPBearer(auto_error=False)
 
+# Mini App users prove who they are with Telegram-signed initData
+deploy_auth = telegram_auth()
+
+# Deploy job queue
+deploy_queue = DeployQueue(
+    store=create_job_store(),
+    runner=deploy_token_via_clanker,
+    concurrency=max(DEPLOY_CONCURRENCY, 1),
+    max_queued=DEPLOY_QUEUE_MAX,
+    events=create_event_bus(),
+    journal=create_journal(),
+    resume=resume_deployment
+)
+
+# Duplicate deploy suppression, shared by every API process with REDIS_URL
+idempotency_store = create_idempotency_store()
+
 # Pydantic models
-class SocialMediaUrl(BaseModel):
-    platform: str = Field(..., min_length=1, max_length=20)
-    url: str = Field(..., min_length=1, max_length=500)
-    
-    @validator('platform')
-    def validate_platform(cls, v):
-        allowed_platforms = ['x', 'twitter', 'telegram', 'discord', 'github', 'website', 'medium']
-        if v.lower() not in allowed_platforms:
-            raise ValueError(f"Platform must be one of: {allowed_platforms}")
-        return v.lower()
-    
-    @validator('url')
-    def validate_url(cls, v):
-        if not (v.startswith('http://') or v.startswith('https://')):
-            raise ValueError("URL must start with http:// or https://")
-        return v
-
-class TokenDeployRequest(BaseModel):
-    name: str = Field(..., min_length=1, max_length=100)
-    symbol: str = Field(..., min_length=3, max_length=5)
-    image: str = Field(..., min_length=1, max_length=500)
-    initialMarketCap: str = Field(..., regex=r'^\d+(\.\d+)?$')
-    vestingPercentage: int = Field(..., ge=0, le=30)
-    vestingDurationDays: int = Field(..., ge=1, le=365)
-    creatorReward: int = Field(..., ge=0, le=80)
-    socialMediaUrls: List[SocialMediaUrl] = Field(default=[])
-    description: Optional[str] = Field(None, max_length=500)
-    
-    @validator('symbol')
-    def validate_symbol(cls, v):
-        if not v.isalpha():
-            raise ValueError("Symbol must contain only letters")
-        return v.upper()
-    
-    @validator('image')
-    def validate_image(cls, v):
-        if not v.startswith('ipfs://'):
-            raise ValueError("Image must be an IPFS URL starting with ipfs://")
-        return v
-
-class TokenDeployResponse(BaseModel):
-    success: bool
+class BatchDeployRequest(BaseModel):
+    tokens: List[TokenDeployRequest] = Field(..., min_items=1, max_items=BATCH_MAX_TOKENS)
+
+class DeployJobResponse(BaseModel):
+    jobId: str
+    status: str
+    statusUrl: str
+    eventsUrl: str
+
+class DeployJobStatus(BaseModel):
+    jobId: str
+    status: str
+    createdAt: str
+    updatedAt: str
+    txHash: Optional[str] = None
     address: Optional[str] = None
     basescanUrl: Optional[str] = None
-    deploymentTime: str
     error: Optional[str] = None
 
 class HealthResponse(BaseModel):
@@ -113,49 +115,83 @@ class HealthResponse(BaseModel):
     version: str
 
 # Utility functions
-def sanitize_input(value: str) -> str:
-    """Sanitize input to prevent injection attacks"""
-    # Remove potentially dangerous characters
-    dangerous_chars = ['`', ';', '&', '|', '$', '(', ')', '<', '>', '"', "'"]
-    for char in dangerous_chars:
-        value = value.replace(char, '')
-    return value.strip()
-
-async def validate_request(request: TokenDeployRequest) -> Dict[str, Any]:
-    """Validate and sanitize the token deployment request"""
+async def reusable_job(job_id: Optional[str], explicit_key: bool) -> Optional[DeployJob]:
+    """The job an idempotency key points at, if it should be reused"""
+    job = await deploy_queue.get(job_id) if job_id else None
+    
+    # Content-hash matches only suppress duplicates of jobs that did not fail
+    if job and job.status == FAILED and not explicit_key:
+        return None
+    return job
+
+async def find_existing_job(key: str, explicit_key: bool) -> Optional[DeployJob]:
+    """Job an idempotency key already points at, if it should be reused"""
+    return await reusable_job(await idempotency_store.get(key), explicit_key)
+
+async def submit_deploy(config: Dict[str, Any], key: str, explicit_key: bool,
+                        notify_chat_id: Optional[int] = None) -> Tuple[DeployJob, bool]:
+    """
+    Queue a validated deploy unless its idempotency key already points at a job
+    
+    The key is claimed for the new job before it is queued, atomically across
+    API processes, so concurrent duplicates cannot both start a deploy.
+    
+    Returns:
+        (job, replayed) where replayed means an existing job was returned
+    
+    Raises:
+        QueueFullError: if the deploy queue has no room
+    """
+    job_id = new_job_id()
+    replaces = None
+    while True:
+        holder = await idempotency_store.claim(key, job_id, replaces)
+        if holder == job_id:
+            break
+        job = await reusable_job(holder, explicit_key)
+        if job is None and holder != replaces:
+            # Another process may have claimed the key and not saved its job yet
+            await asyncio.sleep(CLAIM_SETTLE_SECONDS)
+            job = await reusable_job(holder, explicit_key)
+        if job:
+            logger.info(f"Duplicate deploy request attached to job {job.id}")
+            return job, True
+        # The key points at a failed or expired job: take it over
+        replaces = holder
+    
     try:
-        # Sanitize string inputs
-        sanitized_name = sanitize_input(request.name)
-        sanitized_symbol = sanitize_input(request.symbol)
-        sanitized_description = sanitize_input(request.description or "")
-        
-        # Validate numeric inputs
-        try:
-            market_cap_float = float(request.initialMarketCap)
-            if market_cap_float <= 0:
-                raise ValueError("Initial market cap must be positive")
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid initial market cap")
-        
-        # Validate social media URLs
-        for social in request.socialMediaUrls:
-            if len(social.url) > 500:
-                raise HTTPException(status_code=400, detail="Social media URL too long")
-        
-        return {
-            "name": sanitized_name,
-            "symbol": sanitized_symbol,
-            "image": request.image,
-            "description": sanitized_description,
-            "initialMarketCap": request.initialMarketCap,
-            "vestingPercentage": request.vestingPercentage,
-            "vestingDurationDays": request.vestingDurationDays,
-            "creatorReward": request.creatorReward,
-            "socialMediaUrls": [{"platform": s.platform, "url": s.url} for s in request.socialMediaUrls]
-        }
-    except Exception as e:
-        logger.error(f"Request validation error: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
+        job = await deploy_queue.submit(config, notify_chat_id, job_id)
+    except QueueFullError:
+        await idempotency_store.discard(key, job_id)
+        raise
+    logger.info(f"Queued deploy job {job.id} for {config['symbol']}")
+    return job, False
+
+def is_operator(credentials: Optional[HTTPAuthorizationCredentials]) -> bool:
+    """Whether the request carries API_SECRET_KEY as a bearer token"""
+    return credentials is not None and hmac.compare_digest(credentials.credentials, API_SECRET_KEY)
+
+def require_operator(credentials: Optional[HTTPAuthorizationCredentials]) -> None:
+    """Operator-only endpoints take API_SECRET_KEY as a bearer token"""
+    if not is_operator(credentials):
+        raise HTTPException(status_code=401, detail="Invalid or missing API key",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+# Lifecycle
+@app.on_event("startup")
+async def on_startup():
+    """Spawn the deploy workers so requests never pay Node.js startup, and resume journaled deploys"""
+    await start_worker_pool()
+    await deploy_queue.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Let accepted deploys finish, then stop the deploy queue and workers"""
+    await deploy_queue.drain(DEPLOY_DRAIN_SECONDS)
+    await deploy_queue.close()
+    await stop_worker_pool()
+    await rate_limiter.close()
+    await idempotency_store.close()
 
 # Routes
 @app.get("/health", response_model=HealthResponse)
@@ -168,49 +204,250 @@ async def health_check():
         version="1.0.0"
     )
 
-@app.post("/deploy", response_model=TokenDeployResponse)
-@limiter.limit(f"{RATE_LIMIT_PER_MINUTE}/minute")
+@app.post("/deploy", response_model=DeployJobResponse, status_code=202,
+          dependencies=[Depends(deploy_auth), Depends(rate_limit(DEPLOY_QUOTA))])
 async def deploy_token(
-    request: Request,
-    deploy_request: TokenDeployRequest
+    response: Response,
+    deploy_request: TokenDeployRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    telegram_user: Optional[Dict[str, Any]] = Depends(deploy_auth),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ):
-    """Deploy a token via Clanker SDK"""
-    deployment_time = datetime.utcnow().isoformat()
+    """
+    Queue a token deployment via Clanker SDK and return its job ID
+    
+    Repeats with the same Idempotency-Key header (or, without one, the same
+    validated request) attach to the existing job instead of deploying again.
+    New requests are simulated first and rejected with 422 if the deploy
+    would fail. The bot messages the requesting Telegram user once the
+    deploy is confirmed or fails, so the client need not wait for it.
+    `notifyChatId` is only honoured from the operator (API_SECRET_KEY).
+    """
+    logger.info(f"Token deployment request: {deploy_request.name} ({deploy_request.symbol})")
+    
+    # The request was validated and normalized while parsing
+    with stage_timer("validate"):
+        validated_data, canonical = deploy_config(deploy_request)
     
     try:
-        logger.info(f"Token deployment request: {deploy_request.name} ({deploy_request.symbol})")
+        scope = user_scope(telegram_user)
+        key = header_key(idempotency_key, scope) if idempotency_key else content_key(canonical, scope)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Fail fast on deploys the chain would reject; duplicates skip this
+    if not await find_existing_job(key, bool(idempotency_key)):
+        try:
+            with stage_timer("preflight"):
+                await simulate_deploy(validated_data)
+        except PreflightError as e:
+            logger.info(f"Deploy request rejected by preflight: {e}")
+            raise HTTPException(status_code=422, detail=str(e))
+    
+    try:
+        # Verified users are only ever notified in their own chat; naming a chat
+        # takes the operator key, or any client could have the bot message anyone
+        notify_chat_id = None
+        if telegram_user:
+            notify_chat_id = telegram_user["id"]
+        elif deploy_request.notifyChatId and is_operator(credentials):
+            notify_chat_id = deploy_request.notifyChatId
+        elif deploy_request.notifyChatId:
+            logger.info("Ignoring notifyChatId from a request without initData or the API key")
+        job, replayed = await submit_deploy(validated_data, key, bool(idempotency_key), notify_chat_id)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    
+    return DeployJobResponse(
+        jobId=job.id,
+        status=job.status,
+        statusUrl=f"/deploy/{job.id}",
+        eventsUrl=f"/deploy/{job.id}/events"
+    )
+
+@app.post("/deploy/batch", dependencies=[Depends(rate_limit(DEPLOY_QUOTA))])
+async def deploy_batch(
+    batch: BatchDeployRequest,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Queue many token deployments and stream each one's outcome as NDJSON
+    
+    Every token is validated up front and the whole batch is rejected with
+    the errors of all invalid tokens. Tokens then go through the deploy queue
+    at most BATCH_CONCURRENCY at a time, sharing its workers, RPC session and
+    per-deployer nonce sequences. One line is streamed per token as it
+    reaches `confirmed` or `failed`, in completion order, tagged with its
+    index in the request. With an Idempotency-Key header, token i uses the
+    key "<key>:<i>", so a retried batch attaches to the original jobs.
+    """
+    require_operator(credentials)
+    logger.info(f"Batch deployment request: {len(batch.tokens)} tokens")
+    
+    configs: List[Dict[str, Any]] = []
+    keys: List[str] = []
+    errors: List[Dict[str, Any]] = []
+    for index, token in enumerate(batch.tokens):
+        try:
+            with stage_timer("validate"):
+                config, canonical = deploy_config(token)
+            check_config(config)
+            keys.append(header_key(f"{idempotency_key}:{index}") if idempotency_key else content_key(canonical))
+            configs.append(config)
+        except (PreflightError, ValueError) as e:
+            errors.append({"index": index, "error": str(e)})
+    if errors:
+        raise HTTPException(status_code=422, detail={"errors": errors})
+    
+    try:
+        await check_balance()
+    except PreflightError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    async def results():
+        slots = asyncio.Semaphore(max(BATCH_CONCURRENCY, 1))
+        finished: asyncio.Queue = asyncio.Queue()
         
-        # Validate and sanitize request
-        validated_data = await validate_request(deploy_request)
+        async def run(index: int, config: Dict[str, Any], key: str) -> None:
+            async with slots:
+                try:
+                    job, replayed = await submit_deploy(config, key, bool(idempotency_key))
+                    state = job.public_dict()
+                    async for state in deploy_queue.watch(job.id):
+                        pass
+                    await finished.put({"index": index, **state, "replayed": replayed})
+                except QueueFullError as e:
+                    await finished.put({"index": index, "status": FAILED, "error": str(e)})
+                except Exception as e:
+                    logger.error(f"Batch token {index} failed: {e}")
+                    await finished.put({"index": index, "status": FAILED, "error": "Internal server error"})
         
-        # Deploy token using Clanker SDK
-        result = await deploy_token_via_clanker(validated_data)
+        tasks = [asyncio.create_task(run(i, config, key)) for i, (config, key) in enumerate(zip(configs, keys))]
+        try:
+            for _ in tasks:
+                yield json.dumps(await finished.get()) + "\n"
+        finally:
+            # A disconnected client stops tokens that were not queued yet
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson",
+                             headers={"X-Accel-Buffering": "no"})
+
+@app.post("/airdrop", status_code=201, dependencies=[Depends(rate_limit(DEPLOY_QUOTA))])
+async def create_airdrop(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+):
+    """
+    Build an airdrop Merkle tree from an `address,amount` CSV request body
+    
+    The body is streamed to disk and the tree built off the event loop.
+    Returns the root to pass as the token's airdrop merkleRoot; claimants
+    then fetch proofs from /airdrop/{root}/proof/{address}.
+    """
+    require_operator(credentials)
+    
+    os.makedirs(AIRDROP_DIR, exist_ok=True)
+    upload = tempfile.NamedTemporaryFile(dir=AIRDROP_DIR, suffix=".csv", delete=False)
+    try:
+        with upload:
+            size = 0
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > AIRDROP_MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail="Airdrop file too large")
+                upload.write(chunk)
         
-        if result["success"]:
-            logger.info(f"Token deployed successfully: {result['address']}")
-            return TokenDeployResponse(
-                success=True,
-                address=result["address"],
-                basescanUrl=f"https://basescan.org/token/{result['address']}",
-                deploymentTime=deployment_time
-            )
-        else:
-            logger.error(f"Token deployment failed: {result['error']}")
-            return TokenDeployResponse(
-                success=False,
-                deploymentTime=deployment_time,
-                error=result["error"]
-            )
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error during deployment: {e}")
-        return TokenDeployResponse(
-            success=False,
-            deploymentTime=deployment_time,
-            error="Internal server error during deployment"
-        )
+        loop = asyncio.get_running_loop()
+        airdrop = await loop.run_in_executor(None, build_airdrop, upload.name)
+    except AirdropError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    finally:
+        os.remove(upload.name)
+    
+    airdrop["proofUrl"] = f"/airdrop/{airdrop['root']}/proof/{{address}}"
+    return airdrop
+
+@app.get("/airdrop/{root}/proof/{address}", dependencies=[Depends(rate_limit(READ_QUOTA))])
+async def get_airdrop_proof(root: str, address: str):
+    """Claim amount (in base units) and Merkle proof for one airdrop recipient"""
+    if not ROOT_RE.match(root) or not ADDRESS_RE.match(address):
+        raise HTTPException(status_code=400, detail="Invalid airdrop root or address")
+    if not airdrops.exists(root):
+        raise HTTPException(status_code=404, detail="Airdrop not found")
+    
+    proof = airdrops.proof(root, address)
+    if proof is None:
+        raise HTTPException(status_code=404, detail="Address is not an airdrop recipient")
+    return proof
+
+@app.get("/deploy/{job_id}", response_model=DeployJobStatus,
+         dependencies=[Depends(rate_limit(READ_QUOTA))])
+async def get_deploy_job(job_id: str):
+    """Get the current status of a deploy job"""
+    job = await deploy_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Deploy job not found")
+    return DeployJobStatus(**job.public_dict())
+
+@app.get("/deploy/{job_id}/events", dependencies=[Depends(rate_limit(READ_QUOTA))])
+async def stream_deploy_job(job_id: str):
+    """Stream deploy job status changes as server-sent events"""
+    if await deploy_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Deploy job not found")
+    
+    async def events():
+        async for state in deploy_queue.watch(job_id):
+            yield f"event: status\ndata: {json.dumps(state)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/events/deploys")
+async def stream_deploy_events(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
+    """
+    Stream finished deploys as server-sent events (operator only)
+    
+    Used by the bot to notify users when it does not share Redis with the API.
+    """
+    require_operator(credentials)
+    
+    async def events():
+        async for event in deploy_queue.events.subscribe():
+            yield f"event: deploy\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/deployers", dependencies=[Depends(rate_limit(READ_QUOTA))])
+async def deployer_stats():
+    """Per-key deployer shard stats (rotation state, balance, queue depth) and salt grinding"""
+    return {
+        "routing": router.strategy,
+        "queueDepth": deploy_queue.depth,
+        "deployers": router.stats(),
+        "vanity": grinder.stats()
+    }
+
+@app.get("/rpc", dependencies=[Depends(rate_limit(READ_QUOTA))])
+async def rpc_stats():
+    """Per-endpoint RPC health (latency, error rate, availability) and receipt tracking"""
+    return {"endpoints": rpc_client.stats(), "receipts": receipt_watcher.stats()}
+
+@app.get("/metrics")
+async def metrics():
+    """Deploy pipeline metrics in the Prometheus text format"""
+    return Response(content=render(), media_type=CONTENT_TYPE_LATEST)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,57 @@
+import os
+
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import multiprocess
+
+# Set by server.py when several API workers run; each writes its samples there
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Deploy stages span about 1 ms (validation) to minutes (confirmation)
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+RPC_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+STAGE_SECONDS = Histogram(
+    "slanker_deploy_stage_seconds",
+    "Time spent in each deploy pipeline stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+RUNNER_SECONDS = Histogram(
+    "slanker_runner_job_seconds",
+    "Node.js runner job round trip by op",
+    ["op"],
+    buckets=STAGE_BUCKETS
+)
+RPC_SECONDS = Histogram(
+    "slanker_rpc_request_seconds",
+    "JSON-RPC HTTP round trip by method (batches are labelled 'batch')",
+    ["method"],
+    buckets=RPC_BUCKETS
+)
+
+# Summed over the live workers in multi-process mode
+DEPLOYS_IN_FLIGHT = Gauge("slanker_deploys_in_flight", "Deploy jobs currently running",
+                          multiprocess_mode="livesum")
+QUEUE_DEPTH = Gauge("slanker_deploy_queue_depth", "Deploy jobs waiting for a consumer",
+                    multiprocess_mode="livesum")
+DEPLOY_RESULTS = Counter("slanker_deploys_total", "Finished deploy jobs", ["result"])
+RUNNER_SPAWNS = Counter("slanker_runner_spawns_total", "Node.js runner processes started", ["kind"])
+RPC_ERRORS = Counter(
+    "slanker_rpc_errors_total",
+    "JSON-RPC failures: failed endpoint attempts ('transport'), requests no endpoint "
+    "answered ('unavailable') and error responses ('rpc')",
+    ["kind"]
+)
+RATE_LIMITED = Counter("slanker_rate_limited_total", "Requests rejected by the rate limiter", ["quota"])
+
+def stage_timer(stage: str):
+    """Context manager observing a block's duration for `stage`"""
+    return STAGE_SECONDS.labels(stage).time()
+
+def render() -> bytes:
+    """Current values of every metric in the Prometheus text format, across all workers"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
@@ -0,0 +1,232 @@
+import os
+import time
+import asyncio
+from typing import Set, Optional
+
+from loguru import logger
+
+from rpc import RpcPool, RpcError
+
+# Configuration
+REDIS_URL = os.getenv("REDIS_URL")
+# Allocations older than this are presumed abandoned by a process that died
+NONCE_LEASE_SECONDS = float(os.getenv("NONCE_LEASE_SECONDS", "900"))
+
+# Node error messages meaning the nonce we used is no longer available
+NONCE_TOO_LOW_ERRORS = ("nonce too low", "lower than the current nonce", "nonce has already been used")
+
+# Node error messages meaning the node already holds this exact transaction
+KNOWN_TRANSACTION_ERRORS = ("already known", "known transaction", "already imported")
+
+def is_nonce_error(error: str) -> bool:
+    """Whether a send failure means our view of the nonce is stale"""
+    message = error.lower()
+    return any(fragment in message for fragment in NONCE_TOO_LOW_ERRORS)
+
+def is_known_transaction(error: str) -> bool:
+    """Whether a send failure means the transaction is already in the mempool, i.e. it was broadcast"""
+    message = error.lower()
+    return any(fragment in message for fragment in KNOWN_TRANSACTION_ERRORS)
+
+# The nonce state of one deployer shared by every API process, mirroring
+# NonceManager. Keys: next nonce (string), released nonces (zset scored by
+# nonce) and in-flight nonces (zset scored by allocation time).
+
+#   ARGV: now; returns the nonce, or -1 if the next nonce is not known yet
+ALLOCATE_SCRIPT = """
+local nonce
+local released = redis.call('ZRANGE', KEYS[2], 0, 0)
+if released[1] then
+  nonce = tonumber(released[1])
+  redis.call('ZREM', KEYS[2], released[1])
+else
+  local next_nonce = redis.call('GET', KEYS[1])
+  if not next_nonce then
+    return -1
+  end
+  nonce = tonumber(next_nonce)
+  redis.call('SET', KEYS[1], nonce + 1)
+end
+redis.call('ZADD', KEYS[3], ARGV[1], nonce)
+return nonce
+"""
+
+#   ARGV: nonce
+RELEASE_SCRIPT = """
+local nonce = tonumber(ARGV[1])
+redis.call('ZREM', KEYS[3], nonce)
+local next_nonce = tonumber(redis.call('GET', KEYS[1]) or '-1')
+if nonce == next_nonce - 1 then
+  redis.call('SET', KEYS[1], nonce)
+else
+  redis.call('ZADD', KEYS[2], nonce, nonce)
+end
+return 0
+"""
+
+#   ARGV: pending transaction count, oldest live allocation time
+#   returns {previous next nonce or -1, next nonce}
+RESYNC_SCRIPT = """
+local pending = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', '(' .. ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. pending)
+local previous = tonumber(redis.call('GET', KEYS[1]) or '-1')
+if previous < 0 or pending > previous or redis.call('ZCARD', KEYS[3]) == 0 then
+  redis.call('SET', KEYS[1], pending)
+end
+return {previous, tonumber(redis.call('GET', KEYS[1]))}
+"""
+
+class NonceManager:
+    """
+    Hands out nonces for a single deployer account
+
+    Nonces are allocated in order to concurrent jobs so their transactions
+    can be pipelined. Nonces released before broadcast are reused first so
+    the sequence never has gaps, and `resync` realigns with the node's
+    pending transaction count after a dropped or replaced transaction.
+    """
+
+    def __init__(self, address: str, rpc: RpcPool):
+        self.address = address
+        self.rpc = rpc
+        self._lock = asyncio.Lock()
+        self._next: Optional[int] = None
+        self._released: Set[int] = set()
+        self._inflight: Set[int] = set()
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def _pending_count(self) -> int:
+        return int(await self.rpc.call("eth_getTransactionCount", [self.address, "pending"]), 16)
+
+    async def allocate(self) -> int:
+        """Reserve the next nonce"""
+        async with self._lock:
+            if self._next is None:
+                self._next = await self._pending_count()
+
+            if self._released:
+                nonce = min(self._released)
+                self._released.discard(nonce)
+            else:
+                nonce = self._next
+                self._next += 1
+
+            self._inflight.add(nonce)
+            return nonce
+
+    async def release(self, nonce: int) -> None:
+        """Give back a nonce whose transaction was never broadcast"""
+        async with self._lock:
+            self._inflight.discard(nonce)
+            if self._next is not None and nonce == self._next - 1:
+                self._next -= 1
+            else:
+                self._released.add(nonce)
+
+    async def confirm(self, nonce: int) -> None:
+        """Mark a nonce as used by a mined transaction"""
+        async with self._lock:
+            self._inflight.discard(nonce)
+
+    async def resync(self) -> None:
+        """Realign with the node's pending transaction count"""
+        async with self._lock:
+            try:
+                pending = await self._pending_count()
+            except RpcError as e:
+                logger.error(f"Nonce resync failed for {self.address}: {e}")
+                return
+
+            previous = self._next
+            self._released = {n for n in self._released if n >= pending}
+            if previous is None or pending > previous:
+                self._next = pending
+            elif not self._inflight:
+                # Nothing of ours is outstanding, so trust the node
+                self._next = pending
+            logger.info(f"Nonce resync for {self.address}: {previous} -> {self._next}")
+
+class RedisNonceManager:
+    """
+    NonceManager whose state lives in Redis, for API processes sharing keys
+
+    Allocation, release and resync are Lua scripts, so two processes never
+    get the same nonce. Nonces allocated by a process that died are
+    dropped from the in-flight set after NONCE_LEASE_SECONDS.
+    """
+
+    def __init__(self, address: str, rpc: RpcPool, redis_client, lease: float = NONCE_LEASE_SECONDS):
+        self.address = address
+        self.rpc = rpc
+        self.lease = lease
+        prefix = f"slanker:nonce:{address.lower()}:"
+        self._keys = [prefix + "next", prefix + "released", prefix + "inflight"]
+        self._next_key = self._keys[0]
+        self.redis = redis_client
+        self._allocate = redis_client.register_script(ALLOCATE_SCRIPT)
+        self._release = redis_client.register_script(RELEASE_SCRIPT)
+        self._resync = redis_client.register_script(RESYNC_SCRIPT)
+        self._inflight: Set[int] = set()
+
+    @property
+    def inflight(self) -> int:
+        """Nonces this process has in flight"""
+        return len(self._inflight)
+
+    async def _pending_count(self) -> int:
+        return int(await self.rpc.call("eth_getTransactionCount", [self.address, "pending"]), 16)
+
+    async def allocate(self) -> int:
+        """Reserve the next nonce"""
+        nonce = int(await self._allocate(keys=self._keys, args=[time.time()]))
+        if nonce < 0:
+            # First use by any process: start from the node's pending count
+            await self.redis.set(self._next_key, await self._pending_count(), nx=True)
+            nonce = int(await self._allocate(keys=self._keys, args=[time.time()]))
+        self._inflight.add(nonce)
+        return nonce
+
+    async def release(self, nonce: int) -> None:
+        """Give back a nonce whose transaction was never broadcast"""
+        self._inflight.discard(nonce)
+        await self._release(keys=self._keys, args=[nonce])
+
+    async def confirm(self, nonce: int) -> None:
+        """Mark a nonce as used by a mined transaction"""
+        self._inflight.discard(nonce)
+        await self.redis.zrem(self._keys[2], nonce)
+
+    async def resync(self) -> None:
+        """Realign with the node's pending transaction count"""
+        try:
+            pending = await self._pending_count()
+        except RpcError as e:
+            logger.error(f"Nonce resync failed for {self.address}: {e}")
+            return
+        previous, current = await self._resync(keys=self._keys, args=[pending, time.time() - self.lease])
+        logger.info(f"Nonce resync for {self.address}: {previous if previous >= 0 else None} -> {current}")
+
+def create_nonce_client():
+    """Redis client for nonce allocation when REDIS_URL is set, otherwise None"""
+    if not REDIS_URL:
+        return None
+
+    # Imported lazily so the in-memory managers work without redis installed
+    import redis.asyncio as redis
+
+    logger.info("Using Redis nonce allocation")
+    return redis.from_url(REDIS_URL, decode_responses=True)
+
+def create_nonce_managers(addresses, rpc: RpcPool, redis_client=None):
+    """
+    Nonce managers for deployer addresses: shared through `redis_client`
+    (see create_nonce_client), so several API processes can use the same
+    keys. The managers never close the client; its creator does.
+    """
+    if redis_client is None:
+        return [NonceManager(address, rpc) for address in addresses]
+    return [RedisNonceManager(address, rpc, redis_client) for address in addresses]
@@ -0,0 +1,112 @@
+import os
+import time
+import asyncio
+from typing import Dict, Any, Optional
+
+from loguru import logger
+
+from deploy import router, rpc_client, execute_deployment_script, create_deployment_script
+from rpc import RpcError
+from shards import WEI_PER_ETH
+
+# Configuration
+PREFLIGHT_ENABLED = os.getenv("PREFLIGHT_ENABLED", "true").lower() == "true"
+CHAIN_STATE_TTL_SECONDS = float(os.getenv("CHAIN_STATE_TTL_SECONDS", "5"))
+DEPLOY_GAS_ESTIMATE = int(os.getenv("DEPLOY_GAS_ESTIMATE", "6000000"))
+PREFLIGHT_TIMEOUT_SECONDS = float(os.getenv("PREFLIGHT_TIMEOUT_SECONDS", "10"))
+
+# Shortest vault lockup the v4 factory accepts (src/config/clankerTokenV4.ts)
+MIN_VAULT_LOCKUP_DAYS = 7
+
+class PreflightError(Exception):
+    """A deploy request that would fail on chain"""
+
+class ChainStateCache:
+    """
+    Gas price and deployer balances shared by preflight checks
+
+    Both are refreshed at most once per `ttl` seconds, so a burst of deploy
+    requests costs a single batched RPC round trip.
+    """
+
+    def __init__(self, ttl: float = CHAIN_STATE_TTL_SECONDS):
+        self.ttl = ttl
+        self.gas_price: Optional[int] = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def fresh(self) -> bool:
+        return self.gas_price is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    async def refresh(self) -> None:
+        """Refetch the gas price and every deployer's balance unless still fresh"""
+        async with self._lock:
+            if self.fresh:
+                return
+            gas_price, _ = await asyncio.gather(
+                rpc_client.call("eth_gasPrice"),
+                router.refresh_balances()
+            )
+            self.gas_price = int(gas_price, 16)
+            self._fetched_at = time.monotonic()
+
+chain_state = ChainStateCache()
+
+def check_config(config: Dict[str, Any]) -> None:
+    """Reject configs the SDK or factory would refuse, without any RPC"""
+    if config["vestingPercentage"] > 0 and config["vestingDurationDays"] < MIN_VAULT_LOCKUP_DAYS:
+        raise PreflightError(
+            f"Vesting duration must be at least {MIN_VAULT_LOCKUP_DAYS} days when vesting is enabled"
+        )
+    if float(config["initialMarketCap"]) <= 0:
+        raise PreflightError("Initial market cap must be positive")
+
+async def check_balance() -> str:
+    """Pick a deployer that can pay for a deploy at the cached gas price"""
+    try:
+        await chain_state.refresh()
+    except RpcError as e:
+        # Do not turn an RPC hiccup into a rejected deploy
+        logger.warning(f"Preflight chain state unavailable: {e}")
+
+    shards = [shard for shard in router.shards if shard.active]
+    if not shards:
+        raise PreflightError("No deployer key has enough ETH to deploy")
+    if chain_state.gas_price is None:
+        return shards[0].address
+
+    cost = DEPLOY_GAS_ESTIMATE * chain_state.gas_price
+    funded = [shard for shard in shards if shard.balance_wei is None or shard.balance_wei >= cost]
+    if not funded:
+        raise PreflightError(
+            f"Insufficient deployer balance: a deploy needs about {cost / WEI_PER_ETH:.5f} ETH"
+        )
+    return min(funded, key=lambda shard: shard.assigned).address
+
+async def simulate_deploy(config: Dict[str, Any]) -> None:
+    """
+    Fast-fail stage run before a deploy is queued
+
+    Checks the config locally, checks deployer balance against the cached
+    gas price and dry-runs the deploy with eth_call through the runner.
+
+    Raises:
+        PreflightError: with the precise reason the deploy would fail
+    """
+    if not PREFLIGHT_ENABLED:
+        return
+
+    check_config(config)
+    deployer = await check_balance()
+
+    job = create_deployment_script(config, deployer)
+    job["op"] = "simulate"
+    result = await execute_deployment_script(job, timeout=PREFLIGHT_TIMEOUT_SECONDS)
+    if result["success"]:
+        return
+    if result.get("infrastructure"):
+        # The queued job retries the runner; only reject what the chain would reject
+        logger.warning(f"Preflight simulation skipped: {result['error']}")
+        return
+    raise PreflightError(result["error"])
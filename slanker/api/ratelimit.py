@@ -0,0 +1,152 @@
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple, Optional
+
+from fastapi import HTTPException, Request
+from loguru import logger
+
+from metrics import RATE_LIMITED, stage_timer
+
+# Configuration
+REDIS_URL = os.getenv("REDIS_URL")
+RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "5"))
+RATE_LIMIT_READ_PER_MINUTE = int(os.getenv("RATE_LIMIT_READ_PER_MINUTE", "120"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Refill a bucket and take `cost` tokens in one step, using the server clock
+# so every API process sees the same time.
+#   KEYS[1] bucket hash; ARGV: capacity, refill per second, cost
+#   returns {allowed (0/1), retry after in ms}
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_ms = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  retry_ms = math.ceil((cost - tokens) / rate * 1000)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, retry_ms}
+"""
+
+@dataclass(frozen=True)
+class Quota:
+    """A token bucket: up to `capacity` requests, refilled evenly over a minute"""
+    name: str
+    capacity: int
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second"""
+        return self.capacity / 60.0
+
+# Deploys cost real gas; status and stats endpoints are cheap
+DEPLOY_QUOTA = Quota("deploy", RATE_LIMIT_PER_MINUTE)
+READ_QUOTA = Quota("read", RATE_LIMIT_READ_PER_MINUTE)
+
+class MemoryBucketStore:
+    """Token buckets for a single process, least recently used keys evicted"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, quota: Quota, cost: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (quota.capacity, now))
+        tokens = min(quota.capacity, tokens + (now - ts) * quota.rate)
+
+        allowed = tokens >= cost
+        retry_after = 0.0 if allowed else (cost - tokens) / quota.rate
+        if allowed:
+            tokens -= cost
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+class RedisBucketStore:
+    """Token buckets shared by every API process through Redis"""
+
+    def __init__(self, url: str):
+        # Imported lazily so the in-memory store works without redis installed
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url, decode_responses=True)
+        self._script = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, quota: Quota, cost: int) -> Tuple[bool, float]:
+        allowed, retry_ms = await self._script(keys=[key], args=[quota.capacity, quota.rate, cost])
+        return bool(allowed), int(retry_ms) / 1000
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter keyed by client identity
+
+    Buckets live in Redis when REDIS_URL is set, so the limit holds across
+    workers and replicas; if Redis is unreachable, checks fall back to
+    per-process buckets rather than failing requests.
+    """
+
+    def __init__(self, redis_url: Optional[str] = REDIS_URL, prefix: str = "slanker:ratelimit:"):
+        self.prefix = prefix
+        self.local = MemoryBucketStore()
+        self.shared = RedisBucketStore(redis_url) if redis_url else None
+
+    async def take(self, quota: Quota, identity: str, cost: int = 1) -> Tuple[bool, float]:
+        """Take `cost` tokens; returns (allowed, seconds until enough tokens)"""
+        key = f"{self.prefix}{quota.name}:{identity}"
+        if self.shared is not None:
+            try:
+                return await self.shared.take(key, quota, cost)
+            except Exception as e:
+                logger.warning(f"Shared rate limit store unavailable, using local buckets: {e}")
+        return await self.local.take(key, quota, cost)
+
+    async def close(self) -> None:
+        if self.shared is not None:
+            await self.shared.close()
+
+def client_identity(request: Request) -> str:
+    """Rate limit key: the verified Telegram user when known, else the client IP"""
+    user = getattr(request.state, "telegram_user", None)
+    if user and user.get("id"):
+        return f"tg:{user['id']}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+rate_limiter = RateLimiter()
+
+def rate_limit(quota: Quota, cost: int = 1):
+    """FastAPI dependency enforcing `quota` per client"""
+    async def check(request: Request) -> None:
+        with stage_timer("ratelimit"):
+            allowed, retry_after = await rate_limiter.take(quota, client_identity(request), cost)
+        if not allowed:
+            RATE_LIMITED.labels(quota.name).inc()
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded: {quota.capacity} {quota.name} requests per minute",
+                headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+            )
+    return check
@@ -0,0 +1,106 @@
+import os
+import asyncio
+from typing import Dict, Any, List, Optional, Sequence, Set
+
+from loguru import logger
+
+from rpc import RpcPool, RpcError
+
+# Configuration
+RECEIPT_POLL_INTERVAL = float(os.getenv("RECEIPT_POLL_INTERVAL", "2"))
+RECEIPT_BATCH_SIZE = int(os.getenv("RECEIPT_BATCH_SIZE", "100"))
+
+class ReceiptWatcher:
+    """
+    Tracks the receipts of every pending deploy transaction from one loop
+
+    A single task asks for the block number every `interval` seconds while
+    anything is watched. Each time the head moves, it fetches the receipts
+    of all watched transactions in batched calls of up to `batch_size`, and
+    resolves the waiters whose transaction was mined. N pending deploys cost
+    one request per interval and one batch per block, rather than N pollers.
+    """
+
+    def __init__(self, rpc: RpcPool, interval: float = RECEIPT_POLL_INTERVAL,
+                 batch_size: int = RECEIPT_BATCH_SIZE):
+        self.rpc = rpc
+        self.interval = interval
+        self.batch_size = batch_size
+        # Transaction hash -> futures of the waits that include it
+        self._waiters: Dict[str, Set[asyncio.Future]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.block: Optional[int] = None
+        self.lookups = 0
+
+    async def _fetch(self, tx_hashes: Sequence[str]) -> List[Any]:
+        """Receipts (or None) for the given transactions, in order"""
+        chunks = [tx_hashes[i:i + self.batch_size] for i in range(0, len(tx_hashes), self.batch_size)]
+        answers = await asyncio.gather(*[
+            self.rpc.batch([("eth_getTransactionReceipt", [tx_hash]) for tx_hash in chunk])
+            for chunk in chunks
+        ])
+        self.lookups += len(chunks)
+        return [None if isinstance(receipt, RpcError) else receipt for answer in answers for receipt in answer]
+
+    async def check(self, tx_hashes: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Look up the receipts of the given transactions once"""
+        try:
+            receipts = await self._fetch(list(tx_hashes))
+        except RpcError as e:
+            logger.warning(f"Receipt lookup failed: {e}")
+            return None
+        return next((receipt for receipt in receipts if receipt), None)
+
+    async def wait(self, tx_hashes: Sequence[str], timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Wait for a receipt of any of the given transactions (replacements
+        share a nonce); None if none is mined within `timeout` seconds
+        """
+        if timeout <= 0:
+            return await self.check(tx_hashes)
+
+        future = asyncio.get_running_loop().create_future()
+        for tx_hash in tx_hashes:
+            self._waiters.setdefault(tx_hash, set()).add(future)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            for tx_hash in tx_hashes:
+                waiters = self._waiters.get(tx_hash)
+                if waiters is not None:
+                    waiters.discard(future)
+                    if not waiters:
+                        del self._waiters[tx_hash]
+
+    async def _run(self) -> None:
+        while self._waiters:
+            try:
+                block = int(await self.rpc.call("eth_blockNumber"), 16)
+                if block != self.block:
+                    self.block = block
+                    await self._check_all()
+            except RpcError as e:
+                logger.warning(f"Receipt polling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _check_all(self) -> None:
+        tx_hashes = list(self._waiters)
+        for tx_hash, receipt in zip(tx_hashes, await self._fetch(tx_hashes)):
+            if not receipt:
+                continue
+            for future in self._waiters.pop(tx_hash, ()):
+                if not future.done():
+                    future.set_result(receipt)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"watching": len(self._waiters), "block": self.block, "lookups": self.lookups}
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,190 @@
+import os
+import time
+import itertools
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+from loguru import logger
+
+from metrics import RPC_SECONDS, RPC_ERRORS
+
+# Configuration
+RPC_URL = os.getenv("RPC_URL", "https://mainnet.base.org")
+RPC_URLS = [url.strip() for url in os.getenv("RPC_URLS", RPC_URL).split(",") if url.strip()]
+RPC_TIMEOUT_SECONDS = float(os.getenv("RPC_TIMEOUT_SECONDS", "10"))
+RPC_MAX_CONNECTIONS = int(os.getenv("RPC_MAX_CONNECTIONS", "32"))
+RPC_COOLDOWN_SECONDS = float(os.getenv("RPC_COOLDOWN_SECONDS", "30"))
+
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.2
+# Consecutive failures before an endpoint is cooled down
+MAX_CONSECUTIVE_FAILURES = 3
+
+class RpcError(Exception):
+    """JSON-RPC error returned by the node (or a transport failure)"""
+
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
+class RpcTransportError(RpcError):
+    """A request that may or may not have reached the node (e.g. a timeout after sending it)"""
+
+class RpcEndpoint:
+    """Health of a single RPC endpoint"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def score(self) -> float:
+        """Lower is healthier: latency penalised by recent errors"""
+        return (self.latency or 0.05) * (1 + 10 * self.error_rate)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.requests += 1
+        self.latency = latency if self.requests == 1 else (1 - EWMA_ALPHA) * self.latency + EWMA_ALPHA * latency
+        self.error_rate = (1 - EWMA_ALPHA) * self.error_rate + EWMA_ALPHA * (0.0 if ok else 1.0)
+        if ok:
+            self.consecutive_failures = 0
+            return
+
+        self.errors += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+            self.cooldown_until = time.monotonic() + RPC_COOLDOWN_SECONDS
+            logger.warning(f"RPC endpoint {self.url} cooled down for {RPC_COOLDOWN_SECONDS:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "available": self.available,
+            "latencyMs": round(self.latency * 1000, 1),
+            "errorRate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "errors": self.errors
+        }
+
+class RpcPool:
+    """
+    Async JSON-RPC client over pooled keep-alive connections to several endpoints
+
+    Each call goes to the healthiest available endpoint (lowest latency and
+    error rate) and fails over to the next one on transport errors. JSON-RPC
+    errors are returned by the node itself and are not retried. Calls that
+    are not idempotent (broadcasts) only fail over when the connection could
+    not be opened; any later failure raises RpcTransportError, since the
+    node may have acted on the request.
+    """
+
+    def __init__(self, urls: Sequence[str] = tuple(RPC_URLS), timeout: float = RPC_TIMEOUT_SECONDS):
+        if not urls:
+            raise ValueError("At least one RPC URL is required")
+        self.endpoints = [RpcEndpoint(url) for url in urls]
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ids = itertools.count(1)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=RPC_MAX_CONNECTIONS, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    def _ranked(self) -> List[RpcEndpoint]:
+        available = [endpoint for endpoint in self.endpoints if endpoint.available]
+        # With everything cooled down, still try the least bad endpoint
+        return sorted(available or self.endpoints, key=lambda endpoint: endpoint.score)
+
+    def _request(self, method: str, params: Optional[List[Any]]) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or []}
+
+    async def _post(self, payload: Any, idempotent: bool = True) -> Any:
+        """POST a request (or batch) with failover; returns the decoded body"""
+        last_error: Optional[Exception] = None
+        for endpoint in self._ranked():
+            started = time.monotonic()
+            try:
+                async with self._get_session().post(endpoint.url, json=payload) as response:
+                    response.raise_for_status()
+                    body = await response.json(content_type=None)
+            except (aiohttp.ClientError, TimeoutError, ValueError) as e:
+                endpoint.record(time.monotonic() - started, ok=False)
+                RPC_ERRORS.labels("transport").inc()
+                last_error = e
+                logger.warning(f"RPC endpoint {endpoint.url} failed: {e}")
+                if not idempotent and not isinstance(e, aiohttp.ClientConnectorError):
+                    raise RpcTransportError(f"RPC endpoint {endpoint.url} failed after the request was sent: {e}")
+                continue
+
+            endpoint.record(time.monotonic() - started, ok=True)
+            return body
+
+        RPC_ERRORS.labels("unavailable").inc()
+        raise RpcError(f"All RPC endpoints failed: {last_error}")
+
+    @staticmethod
+    def _unwrap(body: Dict[str, Any]) -> Any:
+        if body.get("error"):
+            error = body["error"]
+            RPC_ERRORS.labels("rpc").inc()
+            raise RpcError(error.get("message", "Unknown RPC error"), error.get("code"))
+        return body.get("result")
+
+    async def call(self, method: str, params: Optional[List[Any]] = None, idempotent: bool = True) -> Any:
+        """
+        Send one JSON-RPC request and return its result
+
+        Raises:
+            RpcTransportError: if a non-idempotent request may have reached the node
+        """
+        with RPC_SECONDS.labels(method).time():
+            body = await self._post(self._request(method, params), idempotent)
+        return self._unwrap(body)
+
+    async def batch(self, calls: Sequence[Tuple[str, Optional[List[Any]]]]) -> List[Any]:
+        """
+        Send several JSON-RPC requests in one HTTP round trip
+
+        Returns:
+            Results in call order; failed calls are returned as RpcError instances
+        """
+        if not calls:
+            return []
+        requests = [self._request(method, params) for method, params in calls]
+        with RPC_SECONDS.labels("batch").time():
+            body = await self._post(requests)
+        if not isinstance(body, list):
+            # Some providers answer a batch with a single error object
+            raise RpcError(f"Batch request rejected: {body.get('error') if isinstance(body, dict) else body}")
+
+        by_id = {item.get("id"): item for item in body}
+        results: List[Any] = []
+        for request in requests:
+            item = by_id.get(request["id"])
+            if item is None:
+                results.append(RpcError(f"No response for {request['method']}"))
+                continue
+            try:
+                results.append(self._unwrap(item))
+            except RpcError as e:
+                results.append(e)
+        return results
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [endpoint.stats() for endpoint in self.endpoints]
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("RPC session closed")
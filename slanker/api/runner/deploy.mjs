@@ -0,0 +1,328 @@
+// Static Slanker deploy runner.
+//
+// Shared by the long-lived worker (worker.mjs) and the one-shot mode below.
+// The token config always arrives as JSON data, never as generated source:
+//
+//   node deploy.mjs < config.json
+//
+// reads one job ({"op": "simulate" | "vanityTarget" | "prepare" | "sign",
+// "config": {...}}) from stdin, writes progress events ({"event": ...,
+// "data": {...}}) as they happen and finally the worker-style answer
+// ({"ok": ..., "result"/"error": ...}) to the result channel.
+//
+// The result channel is a pipe inherited from the API on the fd named by
+// SLANKER_RESULT_FD. It carries length-prefixed frames: a 4-byte big-endian
+// byte length followed by that many bytes of UTF-8 JSON. stdout and stderr are
+// only ever logged.
+//
+// Bump RUNNER_VERSION whenever the job or result format changes; the API
+// refuses to talk to a runner with a different version.
+
+import fs from 'node:fs';
+import { pathToFileURL } from 'node:url';
+import { getTickFromMarketCap } from 'clanker-sdk';
+import { Clanker } from 'clanker-sdk/v4';
+import {
+  createPublicClient,
+  encodeFunctionData,
+  fallback,
+  http,
+  toHex,
+  zeroAddress,
+  zeroHash,
+} from 'viem';
+import { privateKeyToAccount } from 'viem/accounts';
+import { base } from 'viem/chains';
+
+export const RUNNER_VERSION = 8;
+
+// Interface reward recipient for tokens deployed through Slanker
+const INTERFACE_ADDRESS = '0x1eaf444ebDf6495C57aD52A04C61521bBf564ace';
+
+// Hosted salt search the SDK calls for vanity deploys; the API grinds locally instead
+const VANITY_SERVICE_HOST = 'vanity-v79d.onrender.com';
+
+/**
+ * Run an SDK call with the hosted vanity service stubbed out and return the
+ * query the SDK sent it (admin, deployer and init_code_hash).
+ *
+ * @param build SDK call that looks up a vanity salt
+ * @returns URLSearchParams of the captured request
+ */
+async function captureVanityQuery(build) {
+  const realFetch = globalThis.fetch;
+  let query;
+  globalThis.fetch = async (input, init) => {
+    const url = new URL(input instanceof Request ? input.url : String(input));
+    if (url.host !== VANITY_SERVICE_HOST) return realFetch(input, init);
+    query = url.searchParams;
+    return new Response(JSON.stringify({ address: zeroAddress, salt: zeroHash }));
+  };
+
+  try {
+    await build();
+  } finally {
+    globalThis.fetch = realFetch;
+  }
+  if (!query) throw new Error('SDK did not request a vanity salt');
+  return query;
+}
+
+/**
+ * Map a validated Slanker deploy request onto a Clanker v4 token.
+ *
+ * @param config Validated request from the API
+ * @param deployer Address that administers the token and receives creator rewards
+ * @returns Clanker v4 token definition
+ */
+export function buildToken(config, deployer) {
+  const pool = getTickFromMarketCap(Number(config.initialMarketCap));
+  const creatorBps = config.creatorReward * 100;
+
+  return {
+    name: config.name,
+    symbol: config.symbol,
+    image: config.image,
+    tokenAdmin: deployer,
+    metadata: {
+      description: config.description || '',
+      socialMediaUrls: config.socialMediaUrls || [],
+      auditUrls: [],
+    },
+    context: {
+      interface: 'Slanker',
+      platform: 'Telegram Mini App',
+      messageId: 'Deploy via Slanker',
+      id: config.contextId,
+    },
+    pool: {
+      ...pool,
+      positions: [
+        {
+          tickLower: pool.tickIfToken0IsClanker,
+          tickUpper: -120000,
+          positionBps: 10_000,
+        },
+      ],
+    },
+    ...(config.vestingPercentage > 0
+      ? {
+          vault: {
+            percentage: config.vestingPercentage,
+            lockupDuration: config.vestingDurationDays * 24 * 60 * 60,
+          },
+        }
+      : {}),
+    rewards: {
+      recipients: [
+        {
+          admin: deployer,
+          recipient: deployer,
+          bps: creatorBps,
+          token: 'Both',
+        },
+        {
+          admin: INTERFACE_ADDRESS,
+          recipient: INTERFACE_ADDRESS,
+          bps: 10_000 - creatorBps,
+          token: 'Both',
+        },
+      ],
+    },
+  };
+}
+
+/**
+ * Create the SDK clients once and return the job handlers.
+ *
+ * The API owns nonces, fees, broadcasting and receipt tracking; the runner
+ * only builds and signs transactions.
+ *
+ * @param env Environment holding DEPLOYER_KEYS and RPC_URLS (both comma-separated)
+ * @returns Map of op name to async handler
+ */
+export function createRunner(env = process.env) {
+  const keys = (env.DEPLOYER_KEYS || env.PRIVATE_KEY || '')
+    .split(',')
+    .map((key) => key.trim())
+    .filter(Boolean);
+  if (!keys.length)
+    throw new Error('DEPLOYER_KEYS (or PRIVATE_KEY) environment variable is required');
+
+  const rpcUrls = (env.RPC_URLS || env.RPC_URL || 'https://mainnet.base.org')
+    .split(',')
+    .map((url) => url.trim())
+    .filter(Boolean);
+  // Keep-alive HTTP transports with JSON-RPC batching; fallback ranks them by
+  // latency and stability and routes each request to the healthiest one
+  const transport = fallback(
+    rpcUrls.map((url) => http(url, { batch: { wait: 10 } })),
+    { rank: { interval: 10_000 } }
+  );
+  const accounts = new Map(
+    keys.map((key) => {
+      const account = privateKeyToAccount(key);
+      return [account.address.toLowerCase(), account];
+    })
+  );
+  const publicClient = createPublicClient({ chain: base, transport });
+  const clanker = new Clanker({ publicClient });
+
+  function accountFor(address) {
+    const account = address ? accounts.get(address.toLowerCase()) : accounts.values().next().value;
+    if (!account) throw new Error(`No key loaded for deployer ${address}`);
+    return account;
+  }
+
+  // Dry-run the deploy with eth_call so bad configs fail before anything is queued
+  async function simulate(config) {
+    const account = accountFor(config.deployer);
+    const { error } = await clanker.deploySimulate(buildToken(config, account.address), account);
+    if (error) throw error;
+    return { deployer: account.address };
+  }
+
+  // CREATE2 inputs for the token address, so the API can grind a vanity salt
+  async function vanityTarget(config) {
+    const account = accountFor(config.deployer);
+    const query = await captureVanityQuery(() =>
+      clanker.getDeployTransaction({ ...buildToken(config, account.address), vanity: true })
+    );
+    return {
+      deployer: query.get('deployer'),
+      admin: query.get('admin'),
+      initCodeHash: query.get('init_code_hash'),
+    };
+  }
+
+  // Build the deploy transaction (with the API's vanity salt, if any) and estimate its gas
+  async function prepare(config) {
+    const account = accountFor(config.deployer);
+    const tx = await clanker.getDeployTransaction(buildToken(config, account.address));
+    if (config.salt) {
+      const [deployConfig, ...rest] = tx.args;
+      tx.args = [
+        { ...deployConfig, tokenConfig: { ...deployConfig.tokenConfig, salt: config.salt } },
+        ...rest,
+      ];
+    }
+    const data = encodeFunctionData({ abi: tx.abi, functionName: tx.functionName, args: tx.args });
+    const gas = await publicClient.estimateGas({
+      account,
+      to: tx.address,
+      data,
+      value: tx.value,
+    });
+
+    return {
+      from: account.address,
+      to: tx.address,
+      data,
+      value: toHex(tx.value || 0n),
+      gas: toHex((gas * 12n) / 10n),
+      expectedAddress: tx.expectedAddress || null,
+    };
+  }
+
+  // Sign a prepared transaction with the nonce and fees chosen by the API,
+  // which journals it before broadcasting it
+  async function sign({ tx, nonce, maxFeePerGas, maxPriorityFeePerGas }) {
+    const rawTransaction = await accountFor(tx.from).signTransaction({
+      chainId: base.id,
+      type: 'eip1559',
+      to: tx.to,
+      data: tx.data,
+      value: BigInt(tx.value),
+      gas: BigInt(tx.gas),
+      nonce,
+      maxFeePerGas: BigInt(maxFeePerGas),
+      maxPriorityFeePerGas: BigInt(maxPriorityFeePerGas),
+    });
+    return { rawTransaction };
+  }
+
+  return { simulate, vanityTarget, prepare, sign };
+}
+
+/**
+ * Turn SDK, viem and validation errors into a precise one-line message.
+ *
+ * @param error Thrown or returned error
+ * @returns Message naming the contract error where one is known
+ */
+export function describeError(error) {
+  if (!error) return 'Unknown deployment error';
+  // ClankerError carries the decoded contract error name
+  if (error.data?.rawName && error.data.rawName !== 'unknown') {
+    return `${error.message} (${error.data.rawName})`;
+  }
+  if (error.error?.shortMessage) return error.error.shortMessage;
+  return error.shortMessage || error.message || 'Unknown deployment error';
+}
+
+/**
+ * Run a single job against the handlers and wrap the outcome.
+ *
+ * @param ops Handlers from createRunner
+ * @param job Parsed job ({op, ...})
+ * @param emit Called with (event, data) for progress events
+ * @returns {ok: true, result} or {ok: false, error}
+ */
+export async function runJob(ops, job, emit = () => {}) {
+  const op = ops[job.op];
+  if (!op) return { ok: false, error: `Unknown op: ${job.op}` };
+
+  try {
+    return { ok: true, result: await op(job.config, emit) };
+  } catch (error) {
+    return { ok: false, error: describeError(error) };
+  }
+}
+
+/**
+ * Open the result channel passed down by the API.
+ *
+ * @param env Environment holding SLANKER_RESULT_FD
+ * @returns {send(message), close(callback)} writing length-prefixed JSON frames
+ */
+export function openResultChannel(env = process.env) {
+  const fd = Number(env.SLANKER_RESULT_FD);
+  if (!Number.isInteger(fd) || fd < 3) {
+    throw new Error('SLANKER_RESULT_FD must name the result pipe');
+  }
+
+  const stream = fs.createWriteStream(null, { fd });
+  return {
+    send(message) {
+      const body = Buffer.from(JSON.stringify(message), 'utf8');
+      const header = Buffer.alloc(4);
+      header.writeUInt32BE(body.length);
+      stream.write(Buffer.concat([header, body]));
+    },
+    close(callback) {
+      stream.end(callback);
+    },
+  };
+}
+
+async function readStdin() {
+  const chunks = [];
+  for await (const chunk of process.stdin) chunks.push(chunk);
+  return Buffer.concat(chunks).toString('utf8');
+}
+
+// One-shot mode: node deploy.mjs < job.json
+if (import.meta.url === pathToFileURL(process.argv[1]).href) {
+  const channel = openResultChannel();
+  const emit = (event, data) => channel.send({ event, data });
+
+  let answer;
+  try {
+    answer = await runJob(createRunner(), JSON.parse(await readStdin()), emit);
+  } catch (error) {
+    answer = { ok: false, error: error?.message || 'Fatal deployment error' };
+  }
+  channel.send({ ...answer, version: RUNNER_VERSION });
+  channel.close();
+  process.exitCode = answer.ok ? 0 : 1;
+}
@@ -0,0 +1,57 @@
+// Long-lived Slanker deploy worker.
+//
+// Spawned by the API's NodeWorkerPool. clanker-sdk and viem are imported once
+// per process, then jobs arrive as newline-delimited JSON on stdin and results
+// are written back as length-prefixed JSON frames on the result channel (see
+// openResultChannel in deploy.mjs):
+//
+//   -> {"id": "...", "op": "prepare", "config": {...}}
+//   <- {"id": "...", "event": "...", "data": {...}}
+//   <- {"id": "...", "ok": true, "result": {...}}
+//   <- {"id": "...", "ok": false, "error": "..."}
+//
+// A single {"type": "ready", "version": N} frame is written once the SDK has
+// been loaded. stdout and stderr are only used for logs.
+
+import readline from 'node:readline';
+import { createRunner, openResultChannel, RUNNER_VERSION, runJob } from './deploy.mjs';
+
+let ops;
+let channel;
+try {
+  channel = openResultChannel();
+  ops = createRunner();
+} catch (error) {
+  console.error(error.message);
+  process.exit(1);
+}
+
+async function handle(line) {
+  let job;
+  try {
+    job = JSON.parse(line);
+  } catch {
+    console.error('Ignoring malformed job line');
+    return;
+  }
+
+  const emit = (event, data) => channel.send({ id: job.id, event, data });
+  channel.send({ id: job.id, ...(await runJob(ops, job, emit)) });
+}
+
+// Jobs still running; stdin closing (API shutdown) lets them finish first
+const inflight = new Set();
+
+const rl = readline.createInterface({ input: process.stdin });
+rl.on('line', (line) => {
+  if (!line.trim()) return;
+  const job = handle(line);
+  inflight.add(job);
+  job.finally(() => inflight.delete(job));
+});
+rl.on('close', async () => {
+  await Promise.allSettled(inflight);
+  channel.close(() => process.exit(0));
+});
+
+channel.send({ type: 'ready', pid: process.pid, version: RUNNER_VERSION });
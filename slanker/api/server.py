@@ -0,0 +1,96 @@
+"""
+Production server: gunicorn managing API_WORKERS (default 1) uvicorn workers
+
+    cd api && python server.py
+
+On SIGTERM every worker stops accepting connections, gives open requests
+and event streams up to CONNECTION_DRAIN_SECONDS, then lets accepted
+deploys finish (up to DEPLOY_DRAIN_SECONDS, see main.on_shutdown) before
+stopping its Node.js runners. Workers share rate limits, jobs, idempotency
+keys and deployer nonces through REDIS_URL, which is required for more
+than one worker. `python main.py` runs a single development process.
+"""
+
+import os
+import glob
+import tempfile
+from typing import Dict, Any
+
+from dotenv import load_dotenv
+from gunicorn.app.base import BaseApplication
+from loguru import logger
+from uvicorn.workers import UvicornWorker
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+# PaaS platforms (Render, Heroku) assign the port in PORT
+API_PORT = int(os.getenv("PORT", os.getenv("API_PORT", "8000")))
+# More than one worker needs REDIS_URL for shared rate limits, jobs and nonces
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+REDIS_URL = os.getenv("REDIS_URL")
+CONNECTION_DRAIN_SECONDS = float(os.getenv("CONNECTION_DRAIN_SECONDS", "10"))
+DEPLOY_DRAIN_SECONDS = float(os.getenv("DEPLOY_DRAIN_SECONDS", "120"))
+
+# Beyond both drains: stopping the runners and closing connections
+SHUTDOWN_MARGIN_SECONDS = 15
+
+if API_WORKERS > 1 and not REDIS_URL:
+    raise ValueError("REDIS_URL is required to run more than one API worker")
+
+class DrainingUvicornWorker(UvicornWorker):
+    """Uvicorn worker that stops waiting for open connections after CONNECTION_DRAIN_SECONDS"""
+    # Without a limit, a never-ending event stream would hold off the deploy drain
+    CONFIG_KWARGS = {"loop": "auto", "http": "auto", "timeout_graceful_shutdown": CONNECTION_DRAIN_SECONDS}
+
+def prepare_metrics_dir() -> None:
+    """Give the workers an empty directory for their Prometheus samples"""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        directory = os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="slanker-metrics-")
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+
+def child_exit(server, worker) -> None:
+    """Drop a dead worker's live gauges from the metrics"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+class ApiServer(BaseApplication):
+    """gunicorn application serving main:app"""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Imported in each worker after the fork, so every worker owns its
+        # event loop, deploy queue and Node.js runners
+        from main import app
+        return app
+
+def main() -> None:
+    # Workers read it too, e.g. to split the vanity grinding processes between them
+    os.environ["API_WORKERS"] = str(API_WORKERS)
+    if API_WORKERS > 1:
+        prepare_metrics_dir()
+    logger.info(f"Starting {API_WORKERS} API workers on {API_HOST}:{API_PORT}")
+    ApiServer({
+        "bind": f"{API_HOST}:{API_PORT}",
+        "workers": API_WORKERS,
+        "worker_class": "server.DrainingUvicornWorker",
+        "graceful_timeout": int(CONNECTION_DRAIN_SECONDS + DEPLOY_DRAIN_SECONDS) + SHUTDOWN_MARGIN_SECONDS,
+        "child_exit": child_exit,
+        "accesslog": "-"
+    }).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, AsyncIterator
+
+from loguru import logger
+
+from nonce import create_nonce_client, create_nonce_managers
+from rpc import RpcPool, RpcError
+
+WEI_PER_ETH = 10 ** 18
+
+class NoDeployerAvailableError(Exception):
+    """Raised when every deployer key is out of rotation"""
+
+class DeployerShard:
+    """One deployer key: its own nonce stream, balance and load"""
+
+    def __init__(self, address: str, nonces):
+        self.address = address
+        self.nonces = nonces
+        self.balance_wei: Optional[int] = None
+        self.active = True
+        self.assigned = 0
+        self.deploys = 0
+        self.failures = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "active": self.active,
+            "balanceEth": self.balance_wei / WEI_PER_ETH if self.balance_wei is not None else None,
+            "queueDepth": self.assigned,
+            "inflightNonces": self.nonces.inflight,
+            "deploys": self.deploys,
+            "failures": self.failures
+        }
+
+class ShardRouter:
+    """
+    Routes deploy jobs across a set of deployer keys
+
+    Keys whose balance drops below `min_balance_wei` are taken out of
+    rotation by `refresh_balances` and put back once they are topped up.
+    """
+
+    STRATEGIES = ("least_loaded", "round_robin")
+
+    def __init__(self, addresses: List[str], rpc: RpcPool, min_balance_wei: int,
+                 strategy: str = "least_loaded"):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Deployer routing must be one of: {self.STRATEGIES}")
+        self.rpc = rpc
+        # Every shard's nonce manager shares this client (None without Redis); the router closes it
+        self._nonce_client = create_nonce_client()
+        self.shards = [
+            DeployerShard(address, nonces)
+            for address, nonces in zip(addresses, create_nonce_managers(addresses, rpc, self._nonce_client))
+        ]
+        self.min_balance_wei = min_balance_wei
+        self.strategy = strategy
+        self._cursor = itertools.cycle(range(len(self.shards)))
+        self._refresher: Optional[asyncio.Task] = None
+
+    def _pick(self) -> DeployerShard:
+        active = [shard for shard in self.shards if shard.active]
+        if not active:
+            raise NoDeployerAvailableError("No deployer key has enough ETH to deploy")
+
+        if self.strategy == "round_robin":
+            for _ in range(len(self.shards)):
+                shard = self.shards[next(self._cursor)]
+                if shard.active:
+                    return shard
+
+        return min(active, key=lambda shard: shard.assigned)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[DeployerShard]:
+        """Assign a deployer to a job for the duration of the block"""
+        shard = self._pick()
+        shard.assigned += 1
+        try:
+            yield shard
+        finally:
+            shard.assigned -= 1
+
+    def record(self, shard: DeployerShard, success: bool) -> None:
+        if success:
+            shard.deploys += 1
+        else:
+            shard.failures += 1
+
+    async def refresh_balances(self) -> None:
+        """Fetch every key's balance in one batch and update its rotation state"""
+        try:
+            balances = await self.rpc.batch([
+                ("eth_getBalance", [shard.address, "latest"]) for shard in self.shards
+            ])
+        except RpcError as e:
+            logger.warning(f"Balance check failed: {e}")
+            return
+
+        for shard, balance in zip(self.shards, balances):
+            if isinstance(balance, RpcError):
+                logger.warning(f"Balance check failed for {shard.address}: {balance}")
+                continue
+            shard.balance_wei = int(balance, 16)
+
+            active = shard.balance_wei >= self.min_balance_wei
+            if active != shard.active:
+                state = "back in rotation" if active else "out of rotation (low balance)"
+                logger.warning(f"Deployer {shard.address} {state}: {shard.balance_wei / WEI_PER_ETH:.5f} ETH")
+            shard.active = active
+
+    async def _refresh_loop(self, interval: float) -> None:
+        while True:
+            await self.refresh_balances()
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float) -> None:
+        """Start refreshing balances every `interval` seconds"""
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop(interval))
+
+    async def close(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+        if self._nonce_client is not None:
+            await self._nonce_client.close()
+            self._nonce_client = None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [shard.stats() for shard in self.shards]
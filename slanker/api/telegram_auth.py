@@ -0,0 +1,132 @@
+import os
+import hmac
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from fastapi import HTTPException, Request
+
+from metrics import stage_timer
+
+# Configuration
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+# Required by default whenever the API knows the bot token
+TELEGRAM_AUTH_REQUIRED = os.getenv("TELEGRAM_AUTH_REQUIRED", "true" if TELEGRAM_BOT_TOKEN else "false").lower() == "true"
+TELEGRAM_AUTH_MAX_AGE_SECONDS = int(os.getenv("TELEGRAM_AUTH_MAX_AGE_SECONDS", "86400"))
+TELEGRAM_AUTH_CACHE_SIZE = int(os.getenv("TELEGRAM_AUTH_CACHE_SIZE", "10000"))
+
+if TELEGRAM_AUTH_REQUIRED and not TELEGRAM_BOT_TOKEN:
+    raise ValueError("TELEGRAM_BOT_TOKEN is required when TELEGRAM_AUTH_REQUIRED is true")
+
+# Authorization header scheme carrying the Mini App's raw initData
+AUTH_SCHEME = "tma "
+
+class InitDataError(Exception):
+    """Raised when initData is malformed, forged or expired"""
+
+class InitDataVerifier:
+    """
+    Verifies Telegram Mini App initData signatures
+
+    The HMAC key (HMAC-SHA256 of the bot token keyed with "WebAppData") is
+    derived once. Verified initData strings are remembered, up to
+    `cache_size` of them in LRU order, until their auth_date is `max_age`
+    seconds old, so a Mini App session re-sending the same initData is
+    checked with one dict lookup. Entries are keyed by the whole string, so
+    a cache hit can only be the exact data that was verified.
+    """
+
+    def __init__(self, bot_token: Optional[str] = TELEGRAM_BOT_TOKEN,
+                 max_age: int = TELEGRAM_AUTH_MAX_AGE_SECONDS, cache_size: int = TELEGRAM_AUTH_CACHE_SIZE):
+        self._secret = hmac.new(b"WebAppData", bot_token.encode("utf-8"), hashlib.sha256).digest() if bot_token else None
+        self.max_age = max_age
+        self.cache_size = cache_size
+        self._verified: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._secret is not None
+
+    def verify(self, init_data: str) -> Dict[str, Any]:
+        """
+        The Telegram user an initData string was signed for
+
+        Raises:
+            InitDataError: if the signature does not match or the data is too old
+        """
+        now = time.time()
+        entry = self._verified.get(init_data)
+        if entry is not None:
+            user, expires_at = entry
+            if expires_at > now:
+                self._verified.move_to_end(init_data)
+                self.hits += 1
+                return user
+            del self._verified[init_data]
+
+        self.misses += 1
+        user, auth_date = self._check(init_data)
+        expires_at = auth_date + self.max_age
+        if expires_at <= now:
+            raise InitDataError("Telegram initData has expired, reopen the app")
+        self._verified[init_data] = (user, expires_at)
+        if len(self._verified) > self.cache_size:
+            self._verified.popitem(last=False)
+        return user
+
+    def _check(self, init_data: str) -> Tuple[Dict[str, Any], int]:
+        if self._secret is None:
+            raise InitDataError("Telegram initData verification is not configured")
+        try:
+            fields = dict(parse_qsl(init_data, keep_blank_values=True, strict_parsing=True))
+        except ValueError:
+            raise InitDataError("Malformed Telegram initData")
+
+        received = fields.pop("hash", "")
+        data_check = "\n".join(f"{key}={fields[key]}" for key in sorted(fields))
+        expected = hmac.new(self._secret, data_check.encode("utf-8"), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, received):
+            raise InitDataError("Invalid Telegram initData signature")
+
+        try:
+            user = json.loads(fields["user"])
+            auth_date = int(fields["auth_date"])
+        except (KeyError, ValueError):
+            raise InitDataError("Telegram initData has no user")
+        if not isinstance(user, dict) or not isinstance(user.get("id"), int):
+            raise InitDataError("Telegram initData has no user")
+        return user, auth_date
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "cached": len(self._verified), "hits": self.hits, "misses": self.misses}
+
+verifier = InitDataVerifier()
+
+def telegram_auth(required: bool = TELEGRAM_AUTH_REQUIRED):
+    """
+    FastAPI dependency setting request.state.telegram_user from the
+    `Authorization: tma <initData>` header
+
+    Must come before rate_limit so quotas are kept per user. Invalid
+    initData is always rejected; missing initData only when `required`.
+    """
+    async def check(request: Request) -> Optional[Dict[str, Any]]:
+        header = request.headers.get("authorization", "")
+        if not header.startswith(AUTH_SCHEME):
+            if required:
+                raise HTTPException(status_code=401, detail="Open the app from Telegram to deploy",
+                                    headers={"WWW-Authenticate": "tma"})
+            return None
+        try:
+            with stage_timer("auth"):
+                user = verifier.verify(header[len(AUTH_SCHEME):])
+        except InitDataError as e:
+            raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "tma"})
+        request.state.telegram_user = user
+        return user
+    return check
@@ -0,0 +1,100 @@
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+import orjson
+from pydantic import BaseModel, Field, field_validator
+
+# Stripped from free-text fields to prevent injection
+SANITIZE_TABLE = str.maketrans("", "", "`;&|$()<>\"'")
+
+ALLOWED_PLATFORMS = ['x', 'twitter', 'telegram', 'discord', 'github', 'website', 'medium']
+PLATFORM_SET = frozenset(ALLOWED_PLATFORMS)
+
+# initialMarketCap already matches \d+(\.\d+)?; any nonzero digit makes it positive
+NONZERO_DIGIT_RE = re.compile(r"[1-9]")
+
+# Fields of a request that are not part of the deploy config
+REQUEST_ONLY_FIELDS = {"notifyChatId"}
+
+def sanitize_input(value: str) -> str:
+    """Sanitize input to prevent injection attacks"""
+    return value.translate(SANITIZE_TABLE).strip()
+
+class SocialMediaUrl(BaseModel):
+    platform: str = Field(..., min_length=1, max_length=20)
+    url: str = Field(..., min_length=1, max_length=500)
+
+    @field_validator('platform')
+    @classmethod
+    def validate_platform(cls, v: str) -> str:
+        v = v.lower()
+        if v not in PLATFORM_SET:
+            raise ValueError(f"Platform must be one of: {ALLOWED_PLATFORMS}")
+        return v
+
+    @field_validator('url')
+    @classmethod
+    def validate_url(cls, v: str) -> str:
+        if not v.startswith(('http://', 'https://')):
+            raise ValueError("URL must start with http:// or https://")
+        return v
+
+class TokenDeployRequest(BaseModel):
+    """
+    A deploy request, validated and normalized in one pass
+
+    Free text is sanitized and the symbol upper-cased while the request is
+    parsed, so a parsed request is already the canonical deploy config.
+    """
+    name: str = Field(..., min_length=1, max_length=100)
+    symbol: str = Field(..., min_length=3, max_length=5)
+    image: str = Field(..., min_length=1, max_length=500)
+    initialMarketCap: str = Field(..., pattern=r'^\d+(\.\d+)?$')
+    vestingPercentage: int = Field(..., ge=0, le=30)
+    vestingDurationDays: int = Field(..., ge=1, le=365)
+    creatorReward: int = Field(..., ge=0, le=80)
+    socialMediaUrls: List[SocialMediaUrl] = Field(default=[])
+    description: Optional[str] = Field(None, max_length=500)
+    # Telegram chat the bot tells about the outcome (operator requests only)
+    notifyChatId: Optional[int] = Field(None, gt=0)
+
+    @field_validator('name')
+    @classmethod
+    def validate_name(cls, v: str) -> str:
+        return sanitize_input(v)
+
+    @field_validator('symbol')
+    @classmethod
+    def validate_symbol(cls, v: str) -> str:
+        if not v.isalpha():
+            raise ValueError("Symbol must contain only letters")
+        return v.upper()
+
+    @field_validator('image')
+    @classmethod
+    def validate_image(cls, v: str) -> str:
+        if not v.startswith('ipfs://'):
+            raise ValueError("Image must be an IPFS URL starting with ipfs://")
+        return v
+
+    @field_validator('initialMarketCap')
+    @classmethod
+    def validate_market_cap(cls, v: str) -> str:
+        if not NONZERO_DIGIT_RE.search(v):
+            raise ValueError("Initial market cap must be positive")
+        return v
+
+    @field_validator('description')
+    @classmethod
+    def validate_description(cls, v: Optional[str]) -> str:
+        return sanitize_input(v) if v else ""
+
+def deploy_config(request: TokenDeployRequest) -> Tuple[Dict[str, Any], bytes]:
+    """
+    The deploy config of a parsed request and its canonical JSON encoding
+
+    The encoding (orjson, sorted keys) is computed once and reused for the
+    idempotency key.
+    """
+    config = request.model_dump(exclude=REQUEST_ONLY_FIELDS)
+    return config, orjson.dumps(config, option=orjson.OPT_SORT_KEYS)
@@ -0,0 +1,388 @@
+import os
+import time
+import fcntl
+import asyncio
+import secrets
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Callable, Iterator
+
+import numpy as np
+from loguru import logger
+
+from chain import keccak256, keccak256_batch, RATE_BYTES
+
+# Configuration
+VANITY_ENABLED = os.getenv("VANITY_ENABLED", "true").lower() == "true"
+VANITY_SUFFIX = os.getenv("VANITY_SUFFIX", "4b07")
+VANITY_PREFIX = os.getenv("VANITY_PREFIX", "")
+# Every API worker has its own pool, so by default they split the cores between them
+VANITY_PROCESSES = int(os.getenv(
+    "VANITY_PROCESSES", str(max((os.cpu_count() or 1) // max(int(os.getenv("API_WORKERS", "1")), 1), 1))
+))
+VANITY_BATCH_SIZE = int(os.getenv("VANITY_BATCH_SIZE", "32768"))
+VANITY_TIMEOUT_SECONDS = float(os.getenv("VANITY_TIMEOUT_SECONDS", "10"))
+VANITY_INVENTORY_DIR = os.getenv(
+    "VANITY_INVENTORY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "vanity")
+)
+VANITY_INVENTORY_SIZE = int(os.getenv("VANITY_INVENTORY_SIZE", "524288"))
+
+# Salts hashed per vectorized keccak call (sized to stay in cache)
+KECCAK_CHUNK = 8192
+
+def _hex_bytes(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+def _pattern(value: str) -> str:
+    value = value.lower()
+    return value[2:] if value.startswith("0x") else value
+
+def token_salt(admin: bytes, salt: bytes) -> bytes:
+    """CREATE2 salt the v4 factory uses: keccak256(abi.encode(tokenAdmin, salt))"""
+    return keccak256(admin.rjust(32, b"\0") + salt)
+
+def create2_address(deployer: bytes, salt: bytes, init_code_hash: bytes) -> bytes:
+    """Address of a CREATE2 deployment"""
+    return keccak256(b"\xff" + deployer + salt + init_code_hash)[12:]
+
+def _match_mask(addresses: np.ndarray, prefix: str, suffix: str) -> np.ndarray:
+    """Rows of an (N, 20) address array whose hex starts with `prefix` and ends with `suffix`"""
+    mask = np.ones(len(addresses), dtype=bool)
+    whole = len(prefix) // 2
+    if whole:
+        mask &= (addresses[:, :whole] == np.frombuffer(bytes.fromhex(prefix[:whole * 2]), np.uint8)).all(axis=1)
+    if len(prefix) % 2:
+        mask &= (addresses[:, whole] >> 4) == int(prefix[-1], 16)
+
+    whole = len(suffix) // 2
+    if whole:
+        mask &= (addresses[:, 20 - whole:] == np.frombuffer(bytes.fromhex(suffix[-whole * 2:]), np.uint8)).all(axis=1)
+    if len(suffix) % 2:
+        mask &= (addresses[:, 19 - whole] & 0x0F) == int(suffix[0], 16)
+    return mask
+
+def _salts(start: int, count: int) -> np.ndarray:
+    """(count, 32) big-endian salts start .. start + count - 1 (low 64 bits must not wrap)"""
+    salts = np.zeros((count, 32), np.uint8)
+    salts[:, :24] = np.frombuffer((start >> 64).to_bytes(24, "big"), np.uint8)
+    low = start & 0xFFFFFFFFFFFFFFFF
+    salts[:, 24:] = np.arange(low, low + count, dtype=np.uint64).astype(">u8").view(np.uint8).reshape(count, 8)
+    return salts
+
+def _inner_hashes(admin: bytes, salts: np.ndarray) -> np.ndarray:
+    """keccak256(abi.encode(tokenAdmin, salt)) for each salt"""
+    inner = np.zeros((len(salts), RATE_BYTES), np.uint8)
+    inner[:, :32] = np.frombuffer(admin.rjust(32, b"\0"), np.uint8)
+    inner[:, 32:64] = salts
+    return keccak256_batch(inner, 64)
+
+def _addresses(deployer: bytes, inner_hashes: np.ndarray, init_code_hash: bytes) -> np.ndarray:
+    """CREATE2 addresses: keccak256(0xff ++ deployer ++ innerHash ++ initCodeHash)[12:]"""
+    outer = np.zeros((len(inner_hashes), RATE_BYTES), np.uint8)
+    outer[:, 0] = 0xFF
+    outer[:, 1:21] = np.frombuffer(deployer, np.uint8)
+    outer[:, 21:53] = inner_hashes
+    outer[:, 53:85] = np.frombuffer(init_code_hash, np.uint8)
+    return keccak256_batch(outer, 85)[:, 12:]
+
+def _first_match(deployer: bytes, admin: bytes, init_code_hash: bytes, salts: np.ndarray,
+                 addresses: np.ndarray, prefix: str, suffix: str) -> Optional[Tuple[str, str]]:
+    hits = np.flatnonzero(_match_mask(addresses, prefix, suffix))
+    if not len(hits):
+        return None
+
+    salt = bytes(salts[hits[0]])
+    address = create2_address(deployer, token_salt(admin, salt), init_code_hash)
+    if address != bytes(addresses[hits[0]]):
+        raise RuntimeError("Vectorized keccak disagrees with the reference implementation")
+    return "0x" + salt.hex(), "0x" + address.hex()
+
+def grind_batch(deployer: bytes, admin: bytes, init_code_hash: bytes, start: int, count: int,
+                prefix: str, suffix: str) -> Optional[Tuple[str, str]]:
+    """
+    Try salts start .. start + count - 1 (runs in a pool process)
+
+    The low 64 bits of `start` must leave room for `count` more salts.
+
+    Returns:
+        (salt, address) as 0x-prefixed hex for the first match, or None
+    """
+    for offset in range(0, count, KECCAK_CHUNK):
+        salts = _salts(start + offset, min(KECCAK_CHUNK, count - offset))
+        addresses = _addresses(deployer, _inner_hashes(admin, salts), init_code_hash)
+        match = _first_match(deployer, admin, init_code_hash, salts, addresses, prefix, suffix)
+        if match:
+            return match
+    return None
+
+# Inventory file: 64-byte header (magic, admin, padding, first salt), then
+# one 32-byte inner hash per salt in order
+INVENTORY_MAGIC = b"SLKSALT1"
+INVENTORY_HEADER_BYTES = 64
+
+def _inventory_header(admin: bytes, base: int) -> bytes:
+    return INVENTORY_MAGIC + admin + b"\0" * 4 + base.to_bytes(32, "big")
+
+# Memory-mapped inventories, opened once per pool process
+_tables: Dict[str, Tuple[int, np.ndarray]] = {}
+
+def _open_inventory(path: str) -> Tuple[int, np.ndarray]:
+    """(first salt, (N, 32) inner hashes) of an inventory file"""
+    table = _tables.get(path)
+    if table is None:
+        with open(path, "rb") as f:
+            header = f.read(INVENTORY_HEADER_BYTES)
+        hashes = np.memmap(path, dtype=np.uint8, mode="r", offset=INVENTORY_HEADER_BYTES)
+        table = _tables[path] = (int.from_bytes(header[32:64], "big"), hashes.reshape(-1, 32))
+    return table
+
+def precompute_batch(admin: bytes, start: int, count: int) -> bytes:
+    """Inner hashes for salts start .. start + count - 1 (runs in a pool process)"""
+    return b"".join(
+        _inner_hashes(admin, _salts(start + offset, min(KECCAK_CHUNK, count - offset))).tobytes()
+        for offset in range(0, count, KECCAK_CHUNK)
+    )
+
+def grind_inventory(path: str, index: int, count: int, deployer: bytes, admin: bytes,
+                    init_code_hash: bytes, prefix: str, suffix: str) -> Optional[Tuple[str, str]]:
+    """Try `count` precomputed salts from `index` of an inventory (runs in a pool process)"""
+    base, hashes = _open_inventory(path)
+    for offset in range(index, index + count, KECCAK_CHUNK):
+        n = min(KECCAK_CHUNK, index + count - offset)
+        addresses = _addresses(deployer, np.asarray(hashes[offset:offset + n]), init_code_hash)
+        match = _first_match(deployer, admin, init_code_hash, _salts(base + offset, n),
+                             addresses, prefix, suffix)
+        if match:
+            return match
+    return None
+
+class SaltInventory:
+    """
+    Precomputed keccak256(abi.encode(admin, salt)) tables, one per token admin
+
+    That half of a token's CREATE2 address depends only on the admin, not on
+    the token or the wanted suffix, so searching a table costs one hash per
+    salt instead of two. Tables are never used up: the same salts give
+    unrelated addresses for every token. They are written to `directory`
+    and memory-mapped, so a restart picks them up without recomputing, and
+    a lock file per admin lets one API worker build each table while the
+    others wait and then load it.
+    """
+
+    def __init__(self, directory: str = VANITY_INVENTORY_DIR, size: int = VANITY_INVENTORY_SIZE):
+        self.directory = directory
+        self.size = size
+        self.ready: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, admin: str) -> str:
+        return os.path.join(self.directory, f"{_pattern(admin)}.salts")
+
+    def load(self, admin: str) -> bool:
+        """Use an existing inventory file for `admin` if it is complete"""
+        path = self.path_for(admin)
+        try:
+            with open(path, "rb") as f:
+                header = f.read(INVENTORY_HEADER_BYTES)
+            complete = os.path.getsize(path) == INVENTORY_HEADER_BYTES + 32 * self.size
+        except OSError:
+            return False
+
+        if header[:8] != INVENTORY_MAGIC or header[8:28] != _hex_bytes(admin) or not complete:
+            logger.warning(f"Ignoring stale vanity inventory {path}")
+            return False
+        self.ready[_pattern(admin)] = path
+        return True
+
+    async def build(self, admin: str, executor: ProcessPoolExecutor, batch_size: int) -> None:
+        """Compute and persist the inventory for `admin` on the grinding processes"""
+        if self.load(admin):
+            return
+
+        path = self.path_for(admin)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(f"{path}.lock", "wb") as lock:
+            # Another API worker is building it: wait for it, then use its file
+            while True:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(1)
+            try:
+                if not self.load(admin):
+                    await self._write(admin, path, executor, batch_size)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    async def _write(self, admin: str, path: str, executor: ProcessPoolExecutor, batch_size: int) -> None:
+        loop = asyncio.get_running_loop()
+        admin_bytes = _hex_bytes(admin)
+        base = secrets.randbits(192) << 64
+        started = time.monotonic()
+
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, "wb") as f:
+            f.write(_inventory_header(admin_bytes, base))
+            for offset in range(0, self.size, batch_size):
+                count = min(batch_size, self.size - offset)
+                f.write(await loop.run_in_executor(executor, precompute_batch, admin_bytes, base + offset, count))
+        os.replace(partial, path)
+
+        self.ready[_pattern(admin)] = path
+        logger.info(f"Vanity inventory for {admin} ready: {self.size} salts in {time.monotonic() - started:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "admins": len(self.ready),
+            "saltsPerAdmin": self.size,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+class VanityGrinder:
+    """
+    Searches CREATE2 salts for token addresses matching a hex prefix/suffix
+
+    Salt ranges are ground in batches of `batch_size` on a pool of
+    `processes` worker processes, keeping every core busy; each batch is
+    hashed with a vectorized keccak over thousands of salts at a time.
+    Admins with a precomputed inventory are searched there first. A search
+    stops dispatching as soon as a match is found, the deadline passes or
+    the calling task is cancelled; at most one batch per process is wasted.
+    """
+
+    def __init__(self, processes: int = VANITY_PROCESSES, batch_size: int = VANITY_BATCH_SIZE,
+                 inventory: Optional[SaltInventory] = None):
+        self.processes = max(processes, 1)
+        self.batch_size = batch_size
+        self.inventory = inventory or SaltInventory()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._precompute: Optional[asyncio.Task] = None
+        self.searches = 0
+        self.found = 0
+        self.salts_tried = 0
+        self.grind_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        return self._executor
+
+    def start(self, admins: List[str]) -> None:
+        """Load or build the inventory of every admin in the background"""
+        if not VANITY_INVENTORY_SIZE or self._precompute is not None:
+            return
+
+        async def precompute() -> None:
+            for admin in admins:
+                try:
+                    await self.inventory.build(admin, self._get_executor(), self.batch_size)
+                except OSError as e:
+                    logger.error(f"Could not build vanity inventory for {admin}: {e}")
+
+        self._precompute = asyncio.create_task(precompute())
+
+    async def _search(self, batches: Iterator[Tuple[Callable, tuple, int]],
+                      deadline: float) -> Tuple[Optional[Tuple[str, str]], int]:
+        """Run (function, args, salts) batches on the pool until one matches"""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        pending: Dict[asyncio.Future, int] = {}
+        result: Optional[Tuple[str, str]] = None
+        tried = 0
+
+        try:
+            while result is None and time.monotonic() < deadline:
+                for function, args, count in itertools.islice(batches, self.processes - len(pending)):
+                    pending[loop.run_in_executor(executor, function, *args)] = count
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=max(deadline - time.monotonic(), 0),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    tried += pending.pop(future)
+                    result = result or future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+        return result, tried
+
+    def _inventory_batches(self, path: str, target: tuple, prefix: str, suffix: str):
+        # Start at a random batch so concurrent searches for one admin spread over the table
+        size = self.inventory.size
+        starts = list(range(0, size, self.batch_size))
+        first = secrets.randbelow(len(starts))
+        for index in starts[first:] + starts[:first]:
+            count = min(self.batch_size, size - index)
+            yield grind_inventory, (path, index, count, *target, prefix, suffix), count
+
+    def _grind_batches(self, target: tuple, prefix: str, suffix: str):
+        # Random high bits so concurrent searches never grind the same range
+        cursor = secrets.randbits(192) << 64
+        while True:
+            yield grind_batch, (*target, cursor, self.batch_size, prefix, suffix), self.batch_size
+            cursor += self.batch_size
+
+    async def find(self, deployer: str, admin: str, init_code_hash: str,
+                   suffix: str = VANITY_SUFFIX, prefix: str = VANITY_PREFIX,
+                   timeout: float = VANITY_TIMEOUT_SECONDS) -> Optional[Dict[str, Any]]:
+        """
+        Find a salt whose token address matches `prefix` and `suffix`
+
+        Returns:
+            {"salt", "address"} as 0x-prefixed hex, or None if the deadline passed
+        """
+        target = (_hex_bytes(deployer), _hex_bytes(admin), _hex_bytes(init_code_hash))
+        prefix, suffix = _pattern(prefix), _pattern(suffix)
+        started = time.monotonic()
+        deadline = started + timeout
+        result, tried = None, 0
+        self.searches += 1
+
+        try:
+            path = self.inventory.ready.get(_pattern(admin))
+            if path:
+                result, tried = await self._search(self._inventory_batches(path, target, prefix, suffix), deadline)
+            if result:
+                self.inventory.hits += 1
+            else:
+                self.inventory.misses += 1
+                result, ground = await self._search(self._grind_batches(target, prefix, suffix), deadline)
+                tried += ground
+        finally:
+            elapsed = time.monotonic() - started
+            self.salts_tried += tried
+            self.grind_seconds += elapsed
+
+        if result is None:
+            logger.warning(f"No vanity salt for suffix {suffix!r} after {tried} salts in {elapsed:.1f}s")
+            return None
+
+        self.found += 1
+        logger.info(f"Vanity salt found after ~{tried} salts in {elapsed * 1000:.0f}ms")
+        return {"salt": result[0], "address": result[1]}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "processes": self.processes,
+            "searches": self.searches,
+            "found": self.found,
+            "saltsPerSecond": round(self.salts_tried / self.grind_seconds) if self.grind_seconds else None,
+            "inventory": self.inventory.stats()
+        }
+
+    async def close(self) -> None:
+        if self._precompute is not None:
+            self._precompute.cancel()
+            await asyncio.gather(self._precompute, return_exceptions=True)
+            self._precompute = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+grinder = VanityGrinder()
@@ -0,0 +1,385 @@
+import os
+import struct
+import asyncio
+import itertools
+from typing import Dict, Any, List, Optional, Set, Callable, Awaitable, Tuple
+
+import orjson
+from loguru import logger
+
+from metrics import RUNNER_SPAWNS, stage_timer
+
+# Static Node.js runner scripts
+RUNNER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runner")
+WORKER_SCRIPT = os.path.join(RUNNER_DIR, "worker.mjs")
+RUNNER_SCRIPT = os.path.join(RUNNER_DIR, "deploy.mjs")
+
+# Must match RUNNER_VERSION in runner/deploy.mjs
+RUNNER_VERSION = 8
+
+# Result channel frames: 4-byte big-endian length, then UTF-8 JSON
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+# Runner stdout/stderr is only logged, and only this much of it
+LOG_LINE_MAX_BYTES = int(os.getenv("RUNNER_LOG_LINE_MAX_BYTES", "2048"))
+LOG_OUTPUT_MAX_BYTES = int(os.getenv("RUNNER_LOG_MAX_BYTES", "65536"))
+
+# A job must have at least this much of its timeout left once a worker is
+# free; a worker is only presumed stuck if it timed out with that much time
+MIN_JOB_SECONDS = 1.0
+
+def runner_env(env: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Environment for runner processes, with Node's compile cache enabled"""
+    env = dict(env or os.environ)
+    env.setdefault("NODE_COMPILE_CACHE", os.path.join(RUNNER_DIR, ".cache"))
+    return env
+
+async def spawn_runner(script: str, env: Dict[str, str]) -> Tuple[asyncio.subprocess.Process, asyncio.StreamReader]:
+    """
+    Start a runner with a dedicated result pipe
+
+    The write end is inherited by the child and named in SLANKER_RESULT_FD;
+    the returned reader yields its frames.
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "node", script,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env={**env, "SLANKER_RESULT_FD": str(write_fd)},
+            pass_fds=(write_fd,),
+            limit=LOG_LINE_MAX_BYTES,
+            # Out of the API's process group, so a Ctrl-C or group-wide signal
+            # cannot kill a deploy mid-flight; the API stops runners after draining
+            start_new_session=True
+        )
+    except BaseException:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+    RUNNER_SPAWNS.labels("worker" if script == WORKER_SCRIPT else "oneshot").inc()
+
+    reader = asyncio.StreamReader(limit=MAX_FRAME_BYTES)
+    await asyncio.get_running_loop().connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(read_fd, "rb", buffering=0)
+    )
+    return process, reader
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Read one message from a result channel; None once the runner closed it"""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    length, = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise WorkerError(f"Runner frame of {length} bytes exceeds the {MAX_FRAME_BYTES} byte limit")
+    try:
+        return orjson.loads(await reader.readexactly(length))
+    except asyncio.IncompleteReadError:
+        return None
+
+async def log_output(stream: asyncio.StreamReader, label: str,
+                     budget: Optional[int] = LOG_OUTPUT_MAX_BYTES) -> None:
+    """
+    Log a runner output stream line by line without ever holding it whole
+
+    Lines longer than LOG_LINE_MAX_BYTES are dropped and, once `budget` bytes
+    have been logged, the rest of the stream is read and discarded.
+    """
+    logged = 0
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:
+            # The stream already skipped past the oversized line
+            line = f"<line over {LOG_LINE_MAX_BYTES} bytes omitted>\n".encode()
+        if not line:
+            return
+        if budget is not None and logged >= budget:
+            continue
+
+        logged += len(line)
+        logger.info(f"[{label}] {line.decode('utf-8', 'replace').rstrip()}")
+        if budget is not None and logged >= budget:
+            logger.info(f"[{label}] <further output not logged>")
+
+# Called with (event, data) for each progress event a job emits
+EventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+class WorkerError(Exception):
+    """Raised when a worker dies or fails to answer a job"""
+
+async def _drain_messages(inbox: asyncio.Queue, on_event: Optional[EventCallback]) -> Dict[str, Any]:
+    """Forward progress events in order until the job's final answer arrives"""
+    while True:
+        message = await inbox.get()
+        if isinstance(message, Exception):
+            raise message
+        if "event" in message:
+            if on_event:
+                await on_event(message["event"], message.get("data") or {})
+            continue
+        return message
+
+class NodeWorker:
+    """A single long-lived Node.js deploy worker (JSON lines in, result frames out)"""
+
+    def __init__(self, index: int, env: Dict[str, str]):
+        self.index = index
+        self.env = env
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.pending: Dict[str, asyncio.Queue] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self._logs: List[asyncio.Task] = []
+        self._ready: Optional[asyncio.Future] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self, ready_timeout: float) -> None:
+        """Spawn the Node process and wait until the SDK is loaded"""
+        loop = asyncio.get_running_loop()
+        self._ready = loop.create_future()
+        self.process, results = await spawn_runner(WORKER_SCRIPT, self.env)
+        self._reader = asyncio.create_task(self._read_results(results))
+        self._logs = [
+            asyncio.create_task(log_output(stream, f"worker {self.index}", budget=None))
+            for stream in (self.process.stdout, self.process.stderr)
+        ]
+        with stage_timer("worker_start"):
+            await asyncio.wait_for(self._ready, timeout=ready_timeout)
+        logger.info(f"Deploy worker {self.index} ready (pid {self.process.pid})")
+
+    async def _read_results(self, results: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                try:
+                    message = await read_frame(results)
+                except (WorkerError, ValueError) as e:
+                    # A corrupt frame leaves the channel out of sync
+                    logger.error(f"Worker {self.index} sent a bad frame: {e}")
+                    self.kill()
+                    return
+                if message is None:
+                    return
+
+                if message.get("type") == "ready":
+                    if self._ready.done():
+                        continue
+                    if message.get("version") != RUNNER_VERSION:
+                        self._ready.set_exception(WorkerError(
+                            f"Deploy runner version {message.get('version')} does not match "
+                            f"expected version {RUNNER_VERSION}"
+                        ))
+                    else:
+                        self._ready.set_result(True)
+                    continue
+
+                inbox = self.pending.get(message.get("id"))
+                if inbox is not None:
+                    inbox.put_nowait(message)
+        finally:
+            self._fail_pending(WorkerError(f"Deploy worker {self.index} exited"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        if self._ready and not self._ready.done():
+            self._ready.set_exception(error)
+        for inbox in self.pending.values():
+            inbox.put_nowait(error)
+        self.pending.clear()
+
+    async def request(self, job_id: str, payload: Dict[str, Any], timeout: float,
+                      on_event: Optional[EventCallback] = None) -> Dict[str, Any]:
+        """Send one job to the worker, forward its progress events and wait for its answer"""
+        if not self.alive:
+            raise WorkerError(f"Deploy worker {self.index} is not running")
+
+        inbox: asyncio.Queue = asyncio.Queue()
+        self.pending[job_id] = inbox
+        self.process.stdin.write(orjson.dumps({"id": job_id, **payload}) + b"\n")
+        await self.process.stdin.drain()
+
+        try:
+            return await asyncio.wait_for(_drain_messages(inbox, on_event), timeout=timeout)
+        finally:
+            self.pending.pop(job_id, None)
+
+    async def stop(self, grace: float = 5.0) -> None:
+        """Close stdin and wait for the worker to exit, killing it if needed"""
+        if not self.alive:
+            return
+        try:
+            self.process.stdin.close()
+            await asyncio.wait_for(self.process.wait(), timeout=grace)
+        except (asyncio.TimeoutError, ConnectionResetError, BrokenPipeError):
+            self.kill()
+            await self.process.wait()
+
+    def kill(self) -> None:
+        if self.alive:
+            self.process.kill()
+
+class NodeWorkerPool:
+    """
+    Pool of long-lived Node.js deploy workers
+
+    Workers are spawned once at startup and each runs one job at a time.
+    A worker that crashes or times out is killed and replaced in the
+    background, and rejoins the pool once it is ready again.
+    """
+
+    def __init__(self, size: int, env: Optional[Dict[str, str]] = None, ready_timeout: float = 60.0):
+        self.size = size
+        self.env = runner_env(env)
+        self.ready_timeout = ready_timeout
+        self.workers: List[NodeWorker] = []
+        self._idle: "asyncio.Queue[NodeWorker]" = asyncio.Queue()
+        self._ids = itertools.count(1)
+        self._restarts: Set[asyncio.Task] = set()
+        self._closed = False
+
+    async def start(self) -> None:
+        """Spawn all workers"""
+        self.workers = [NodeWorker(i, self.env) for i in range(self.size)]
+        await asyncio.gather(*(w.start(self.ready_timeout) for w in self.workers))
+        for worker in self.workers:
+            self._idle.put_nowait(worker)
+        logger.info(f"Deploy worker pool started with {self.size} workers")
+
+    async def _restart(self, worker: NodeWorker) -> None:
+        worker.kill()
+        if worker.process:
+            await worker.process.wait()
+        if self._closed:
+            return
+        logger.warning(f"Restarting deploy worker {worker.index}")
+        await worker.start(self.ready_timeout)
+
+    async def _replace(self, worker: NodeWorker) -> None:
+        try:
+            await self._restart(worker)
+        except Exception as e:
+            logger.error(f"Failed to restart deploy worker {worker.index}: {e}")
+        # Even a worker that failed to start rejoins, to be retried when next picked
+        if not self._closed:
+            self._idle.put_nowait(worker)
+
+    def _recycle(self, worker: NodeWorker) -> None:
+        """Restart a worker off the request path; it becomes idle again when done"""
+        task = asyncio.create_task(self._replace(worker))
+        self._restarts.add(task)
+        task.add_done_callback(self._restarts.discard)
+
+    async def submit(self, payload: Dict[str, Any], timeout: float,
+                     on_event: Optional[EventCallback] = None) -> Dict[str, Any]:
+        """
+        Run a job on the next idle worker
+
+        `timeout` covers waiting for an idle worker as well as the job itself;
+        if less than MIN_JOB_SECONDS of it is left once one is free, the job
+        is not started.
+
+        Returns:
+            The worker's answer ({"ok": bool, "result"/"error": ...})
+
+        Raises:
+            WorkerError: if no worker became idle in time, or the job failed or timed out
+        """
+        if self._closed:
+            raise WorkerError("Deploy worker pool is shut down")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            try:
+                worker = await asyncio.wait_for(self._idle.get(), max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                raise WorkerError(f"No deploy worker became free within {timeout:g}s")
+            if worker.alive:
+                break
+            self._recycle(worker)
+
+        remaining = deadline - loop.time()
+        if remaining < MIN_JOB_SECONDS:
+            # The worker did nothing wrong; hand it straight back
+            self._idle.put_nowait(worker)
+            raise WorkerError(f"No deploy worker became free within {timeout:g}s")
+
+        healthy = True
+        try:
+            return await worker.request(str(next(self._ids)), payload, remaining, on_event)
+        except asyncio.TimeoutError:
+            healthy = False
+            raise WorkerError(f"Deploy job timed out after {timeout:.0f}s")
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            if healthy:
+                self._idle.put_nowait(worker)
+            else:
+                self._recycle(worker)
+
+    async def close(self) -> None:
+        """Stop all workers"""
+        self._closed = True
+        for task in self._restarts:
+            task.cancel()
+        await asyncio.gather(*self._restarts, return_exceptions=True)
+        await asyncio.gather(*(w.stop() for w in self.workers), return_exceptions=True)
+        logger.info("Deploy worker pool stopped")
+
+async def run_once(payload: Dict[str, Any], timeout: float, env: Optional[Dict[str, str]] = None,
+                   on_event: Optional[EventCallback] = None) -> Dict[str, Any]:
+    """
+    Run a single job in a fresh one-shot runner process
+
+    The job is written to the runner's stdin as JSON; no script is generated.
+    Progress events are forwarded as the runner emits them on its result
+    channel. Used when the worker pool is disabled (DEPLOY_WORKERS=0).
+    """
+    process, results = await spawn_runner(RUNNER_SCRIPT, runner_env(env))
+    process.stdin.write(orjson.dumps(payload))
+    process.stdin.close()
+
+    async def read_answer() -> Optional[Dict[str, Any]]:
+        while True:
+            message = await read_frame(results)
+            if message is None or "event" not in message:
+                return message
+            if on_event:
+                await on_event(message["event"], message.get("data") or {})
+
+    try:
+        message, _, _ = await asyncio.wait_for(
+            asyncio.gather(
+                read_answer(),
+                log_output(process.stdout, "runner"),
+                log_output(process.stderr, "runner")
+            ),
+            timeout=timeout
+        )
+        await process.wait()
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise WorkerError(f"Deploy job timed out after {timeout:.0f}s")
+    except (WorkerError, ValueError) as e:
+        process.kill()
+        await process.wait()
+        raise WorkerError(f"Deploy runner sent a bad frame: {e}")
+
+    if message is None:
+        raise WorkerError(f"Deploy runner exited with code {process.returncode} without an answer")
+
+    if message.get("version") != RUNNER_VERSION:
+        raise WorkerError(
+            f"Deploy runner version {message.get('version')} does not match expected version {RUNNER_VERSION}"
+        )
+    return message
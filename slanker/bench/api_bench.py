@@ -0,0 +1,442 @@
+"""
+API load benchmark
+
+Starts a chain stub (bench/chain_stub.py), the slanker API with its Node
+workers replaced by bench/fake_worker.mjs and, for the webhook target, the
+bot, all on local ports. Then drives each target at a fixed concurrency and
+reports p50/p95/p99 latency, throughput, deploys per minute and the CPU and
+RSS of the server processes (including their worker children). Results are
+written as JSON so runs can be compared between commits.
+
+    cd slanker && python bench/api_bench.py [--targets health,deploy,webhook]
+        [--requests N] [--concurrency C] [--block-time S] [--output FILE]
+        [--api-workers N --redis-url URL]
+
+Targets:
+    health   GET /health
+    deploy   POST /deploy with signed initData, then follow
+             /deploy/{id}/events until the job ends; latency is the POST,
+             end-to-end time and RPC requests per deploy are reported
+             separately
+    webhook  POST a /start update to the bot's /webhook; latency is the
+             acknowledgement, the bot's /stats after draining is included
+"""
+
+import os
+import sys
+import hmac
+import json
+import time
+import hashlib
+import socket
+import asyncio
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from urllib.parse import urlencode
+
+import aiohttp
+import psutil
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SLANKER_DIR = os.path.dirname(BENCH_DIR)
+API_DIR = os.path.join(SLANKER_DIR, "api")
+BOT_DIR = os.path.join(SLANKER_DIR, "bot")
+FAKE_WORKER = os.path.join(BENCH_DIR, "fake_worker.mjs")
+
+sys.path.insert(0, BENCH_DIR)
+
+from chain_stub import ChainStub, start_stub  # noqa: E402
+
+# Well-known test keys (anvil/hardhat accounts 0 and 1); never hold real funds
+TEST_KEYS = [
+    "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80",
+    "0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d"
+]
+BOT_TOKEN = "123456:bench"
+
+# A scenario returns None, or the perf_counter time its request was answered
+# when it then keeps waiting for the outcome (end-to-end time)
+Scenario = Callable[[aiohttp.ClientSession, int], Awaitable[Optional[float]]]
+
+def sign_init_data(user_id: int, bot_token: str = BOT_TOKEN) -> str:
+    """Mini App initData for `user_id`, signed the way Telegram signs it"""
+    fields = {
+        "auth_date": str(int(time.time())),
+        "query_id": f"bench{user_id}",
+        "user": json.dumps({"id": user_id, "first_name": "Bench", "language_code": "en"}, separators=(",", ":"))
+    }
+    secret = hmac.new(b"WebAppData", bot_token.encode("utf-8"), hashlib.sha256).digest()
+    data_check = "\n".join(f"{key}={fields[key]}" for key in sorted(fields))
+    fields["hash"] = hmac.new(secret, data_check.encode("utf-8"), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def serve_api(port: int, workers: int) -> None:
+    """Run the API with the fake Node worker (subprocess entry point)"""
+    sys.path.insert(0, API_DIR)
+    import uvicorn
+    import server
+
+    if workers > 1:
+        # Before prometheus_client is imported, as server.py runs it
+        server.prepare_metrics_dir()
+
+    import worker_pool
+
+    worker_pool.WORKER_SCRIPT = FAKE_WORKER
+    os.environ["SLANKER_RUNNER_VERSION"] = str(worker_pool.RUNNER_VERSION)
+
+    if workers > 1:
+        # The production server; its workers inherit the patched runner script
+        server.ApiServer({
+            "bind": f"127.0.0.1:{port}",
+            "workers": workers,
+            "worker_class": "server.DrainingUvicornWorker",
+            "child_exit": server.child_exit,
+            "loglevel": "warning"
+        }).run()
+        return
+
+    import main
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+def serve_bot(port: int) -> None:
+    """Run the bot's webhook server in this process (subprocess entry point)"""
+    sys.path.insert(0, BOT_DIR)
+    from aiohttp import web
+    import main
+
+    web.run_app(main.create_app(), host="127.0.0.1", port=port, print=None)
+
+def spawn_server(kind: str, port: int, workers: int, env: Dict[str, str], workdir: str) -> subprocess.Popen:
+    log = open(os.path.join(workdir, f"{kind}.log"), "wb")
+    return subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", kind, "--port", str(port),
+         "--api-workers", str(workers)],
+        env={**os.environ, **env}, cwd=workdir, stdout=log, stderr=subprocess.STDOUT
+    )
+
+async def wait_healthy(session: aiohttp.ClientSession, url: str, process: subprocess.Popen,
+                       timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            async with session.get(url) as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become healthy in {timeout:.0f}s")
+
+class ResourceSampler:
+    """Samples CPU and RSS of server processes and their children"""
+
+    def __init__(self, pids: List[int], interval: float = 0.5):
+        self.roots = [psutil.Process(pid) for pid in pids]
+        self.interval = interval
+        self.cpu: List[float] = []
+        self.rss: List[int] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def _processes(self) -> List[psutil.Process]:
+        processes = []
+        for root in self.roots:
+            try:
+                processes += [root] + root.children(recursive=True)
+            except psutil.NoSuchProcess:
+                continue
+        return processes
+
+    def _sample(self) -> None:
+        cpu, rss = 0.0, 0
+        for process in self._processes():
+            # cpu_percent compares against the previous call on the same object
+            process = self._seen.setdefault(process.pid, process)
+            try:
+                cpu += process.cpu_percent()
+                rss += process.memory_info().rss
+            except psutil.NoSuchProcess:
+                continue
+        self.cpu.append(cpu)
+        self.rss.append(rss)
+
+    async def _run(self) -> None:
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self) -> "ResourceSampler":
+        self._seen: Dict[int, psutil.Process] = {}
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._task.cancel()
+        self._sample()
+
+    def summary(self) -> Dict[str, Any]:
+        # The first sample of each process has no baseline
+        cpu = self.cpu[1:] or [0.0]
+        return {
+            "cpuPercentMean": round(sum(cpu) / len(cpu), 1),
+            "cpuPercentMax": round(max(cpu), 1),
+            "rssMbMax": round(max(self.rss or [0]) / 2 ** 20, 1)
+        }
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+def latency_summary(values: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(values),
+        **{f"p{p}Ms": round(percentile(values, p) * 1000, 2) if values else None for p in (50, 95, 99)},
+        "maxMs": round(max(values) * 1000, 2) if values else None
+    }
+
+async def run_scenario(name: str, scenario: Scenario, requests: int, concurrency: int,
+                       pids: List[int]) -> Dict[str, Any]:
+    """Run `requests` calls of `scenario`, `concurrency` at a time"""
+    latencies: List[float] = []
+    end_to_end: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = iter(range(requests))
+
+    async def client(session: aiohttp.ClientSession) -> None:
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                answered = await scenario(session, index)
+            except Exception as e:
+                key = type(e).__name__ if not isinstance(e, AssertionError) else str(e)
+                errors[key] = errors.get(key, 0) + 1
+                continue
+            finished = time.perf_counter()
+            latencies.append((answered or finished) - started)
+            if answered is not None:
+                end_to_end.append(finished - started)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        with ResourceSampler(pids) as sampler:
+            started = time.perf_counter()
+            await asyncio.gather(*(client(session) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+    result = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "requestsPerSecond": round(len(latencies) / elapsed, 1),
+        "errors": errors,
+        "latency": latency_summary(latencies),
+        "resources": sampler.summary()
+    }
+    if end_to_end:
+        result["endToEnd"] = latency_summary(end_to_end)
+        result["deploysPerMinute"] = round(len(end_to_end) / elapsed * 60, 1)
+    print(f"{name:8} {result['requestsPerSecond']:>8} req/s  p50 {result['latency']['p50Ms']} ms  "
+          f"p99 {result['latency']['p99Ms']} ms  errors {sum(errors.values())}")
+    return result
+
+def health_scenario(api_url: str) -> Scenario:
+    async def run(session: aiohttp.ClientSession, index: int) -> None:
+        async with session.get(f"{api_url}/health") as response:
+            assert response.status == 200, f"HTTP {response.status}"
+            await response.read()
+    return run
+
+def deploy_scenario(api_url: str) -> Scenario:
+    # 1000 Mini App users, each re-sending its session's initData
+    sessions = [sign_init_data(10_000 + user) for user in range(1000)]
+
+    async def run(session: aiohttp.ClientSession, index: int) -> float:
+        body = {
+            "name": f"Bench Token {index}",
+            "symbol": "BNCH",
+            "image": "ipfs://bafybeigdyrzt5sfp7udm7hu76uh7y26nf3efuylqabf3oclgtqy55fbzdi",
+            "initialMarketCap": "10",
+            "vestingPercentage": 0,
+            "vestingDurationDays": 30,
+            "creatorReward": 40
+        }
+        headers = {"Authorization": f"tma {sessions[index % len(sessions)]}"}
+        async with session.post(f"{api_url}/deploy", json=body, headers=headers) as response:
+            assert response.status == 202, f"HTTP {response.status}"
+            job = await response.json()
+        answered = time.perf_counter()
+
+        async with session.get(f"{api_url}{job['eventsUrl']}") as events:
+            status = None
+            async for line in events.content:
+                if line.startswith(b"data: "):
+                    status = json.loads(line[6:])["status"]
+            assert status == "confirmed", f"deploy {status}"
+        return answered
+    return run
+
+def webhook_scenario(bot_url: str) -> Scenario:
+    async def run(session: aiohttp.ClientSession, index: int) -> None:
+        chat = {"id": 10_000 + index % 1000, "type": "private", "first_name": "Bench"}
+        update = {
+            "update_id": index + 1,
+            "message": {
+                "message_id": index + 1,
+                "date": int(time.time()),
+                "chat": chat,
+                "from": {"id": chat["id"], "is_bot": False, "first_name": "Bench"},
+                "text": "/start",
+                "entities": [{"type": "bot_command", "offset": 0, "length": 6}]
+            }
+        }
+        async with session.post(f"{bot_url}/webhook", json=update) as response:
+            assert response.status == 200, f"HTTP {response.status}"
+            await response.read()
+    return run
+
+async def wait_drained(bot_url: str, timeout: float = 120.0) -> Dict[str, Any]:
+    """Bot update dispatcher stats once every queued update has been handled"""
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        while True:
+            async with session.get(f"{bot_url}/stats") as response:
+                stats = await response.json()
+            if not stats["updates"]["pending"] or time.perf_counter() - started > timeout:
+                return {**stats, "drainSeconds": round(time.perf_counter() - started, 3)}
+            await asyncio.sleep(0.1)
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=SLANKER_DIR,
+                                       text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def bench(args: argparse.Namespace) -> Dict[str, Any]:
+    targets = [target.strip() for target in args.targets.split(",") if target.strip()]
+    workdir = tempfile.mkdtemp(prefix="slanker-bench-")
+    stub_port, api_port, bot_port = free_port(), free_port(), free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    chain = ChainStub(args.block_time)
+    stub = await start_stub(chain, stub_port)
+
+    servers: Dict[str, subprocess.Popen] = {}
+    try:
+        servers["api"] = spawn_server("api", api_port, args.api_workers, {
+            "PRIVATE_KEYS": ",".join(TEST_KEYS[:args.deployers]),
+            "RPC_URLS": stub_url,
+            "DEPLOY_WORKERS": str(args.workers),
+            "DEPLOY_CONCURRENCY": str(args.deploy_concurrency),
+            "DEPLOY_QUEUE_MAX": str(max(args.requests, 100)),
+            "FAKE_RUNNER_DELAY_MS": str(args.runner_delay_ms),
+            "RECEIPT_POLL_INTERVAL": str(min(0.25, args.block_time / 4 or 0.05)),
+            "VANITY_ENABLED": "true" if args.vanity else "false",
+            "VANITY_INVENTORY_DIR": os.path.join(workdir, "vanity"),
+            "JOURNAL_PATH": os.path.join(workdir, "journal", "deploys.db"),
+            "RATE_LIMIT_PER_MINUTE": "100000000",
+            "RATE_LIMIT_READ_PER_MINUTE": "100000000",
+            "REDIS_URL": args.redis_url,
+            "API_WORKERS": str(args.api_workers),
+            "TELEGRAM_BOT_TOKEN": BOT_TOKEN,
+            "ENVIRONMENT": "production"
+        }, workdir)
+        if "webhook" in targets:
+            servers["bot"] = spawn_server("bot", bot_port, 1, {
+                "TELEGRAM_BOT_TOKEN": BOT_TOKEN,
+                "TELEGRAM_API_URL": stub_url,
+                "TELEGRAM_WEBHOOK_URL": ""
+            }, workdir)
+
+        api_url = f"http://127.0.0.1:{api_port}"
+        bot_url = f"http://127.0.0.1:{bot_port}"
+        async with aiohttp.ClientSession() as session:
+            await wait_healthy(session, f"{api_url}/health", servers["api"])
+            if "bot" in servers:
+                await wait_healthy(session, f"{bot_url}/health", servers["bot"])
+
+        scenarios = {
+            "health": (health_scenario(api_url), ["api"]),
+            "deploy": (deploy_scenario(api_url), ["api"]),
+            "webhook": (webhook_scenario(bot_url), ["bot"])
+        }
+        results = {}
+        for target in targets:
+            scenario, owners = scenarios[target]
+            pids = [servers[owner].pid for owner in owners]
+            rpc_before = chain.requests
+            results[target] = await run_scenario(target, scenario, args.requests, args.concurrency, pids)
+            if target == "deploy":
+                # JSON-RPC requests the API sent (batch items counted one by one)
+                results[target]["rpcRequests"] = chain.requests - rpc_before
+                print(f"{'':8} {results[target]['rpcRequests'] / args.requests:>8.1f} RPC requests per deploy")
+            if target == "webhook":
+                # Updates are acknowledged before they are handled
+                results[target]["dispatcher"] = await wait_drained(bot_url)
+    finally:
+        for server in servers.values():
+            server.terminate()
+        for server in servers.values():
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        await stub.cleanup()
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "host": {"python": platform.python_version(), "cpus": os.cpu_count(), "platform": platform.platform()},
+        "config": {key: value for key, value in vars(args).items() if key not in ("serve", "port", "output")},
+        "results": results,
+        "serverLogs": workdir
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default="health,deploy,webhook")
+    parser.add_argument("--requests", type=int, default=200, help="requests per target")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2, help="fake Node workers (DEPLOY_WORKERS)")
+    parser.add_argument("--deploy-concurrency", type=int, default=8, help="DEPLOY_CONCURRENCY")
+    parser.add_argument("--deployers", type=int, default=2, choices=range(1, len(TEST_KEYS) + 1))
+    parser.add_argument("--block-time", type=float, default=0.5, help="seconds until a transaction is mined")
+    parser.add_argument("--runner-delay-ms", type=int, default=0, help="simulated SDK time per runner job")
+    parser.add_argument("--vanity", action="store_true", help="grind vanity salts for deploys")
+    parser.add_argument("--api-workers", type=int, default=1, help="API processes (API_WORKERS, needs --redis-url)")
+    parser.add_argument("--redis-url", default="", help="REDIS_URL for the API")
+    parser.add_argument("--output", help="result file (default bench/results/api-<commit>-<time>.json)")
+    parser.add_argument("--serve", choices=("api", "bot"), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve == "api":
+        return serve_api(args.port, args.api_workers)
+    if args.serve == "bot":
+        return serve_bot(args.port)
+    if args.api_workers > 1 and not args.redis_url:
+        parser.error("--api-workers above 1 needs --redis-url")
+
+    report = asyncio.run(bench(args))
+    output = args.output or os.path.join(
+        BENCH_DIR, "results", f"api-{report['commit'] or 'unknown'}-{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
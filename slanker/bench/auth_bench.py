@@ -0,0 +1,59 @@
+"""
+Telegram initData verification benchmark
+
+Reports the per-request cost of checking a Mini App's initData: the first
+request of a session (parsing and HMAC), a repeat served from the verified
+session cache, and a forged signature, which is never cached.
+
+    cd slanker && python bench/auth_bench.py [--requests N] [--sessions N]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "api"))
+sys.path.insert(0, BENCH_DIR)
+
+from telegram_auth import InitDataVerifier, InitDataError  # noqa: E402
+from api_bench import sign_init_data, BOT_TOKEN  # noqa: E402
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--sessions", type=int, default=1000)
+    args = parser.parse_args()
+
+    sessions = [sign_init_data(user) for user in range(1, args.sessions + 1)]
+    forged = sessions[0].replace("Bench", "Mallory")
+
+    # Cache smaller than the session count: every lookup misses
+    cold = InitDataVerifier(BOT_TOKEN, cache_size=1)
+    warm = InitDataVerifier(BOT_TOKEN, cache_size=args.sessions)
+
+    def forge(init_data: str) -> None:
+        try:
+            warm.verify(init_data)
+        except InitDataError:
+            pass
+        else:
+            raise AssertionError("forged initData was accepted")
+
+    for session in sessions:
+        warm.verify(session)
+    steps = [
+        ("first request (HMAC)", cold.verify, sessions),
+        ("cached session", warm.verify, sessions),
+        ("forged signature", forge, [forged])
+    ]
+    for label, verify, inputs in steps:
+        started = time.process_time()
+        for index in range(args.requests):
+            verify(inputs[index % len(inputs)])
+        elapsed = time.process_time() - started
+        print(f"{label:<22} {args.requests / elapsed:>12,.0f} req/s per core  {1e6 * elapsed / args.requests:7.2f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Bot response building benchmark
+
+Compares building a reply's text and keyboard on every update (what the
+handlers did before bot/responses.py) with looking it up in a
+ResponseCache, in CPU time and bytes allocated per update. Also times the
+part the cache cannot skip, turning the reply into a sendMessage request
+(SendMessage model plus aiogram's form encoding), and scales the saving to
+`--rate` updates per second.
+
+    cd slanker && python bench/bot_responses_bench.py [--updates N] [--rate R]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from typing import Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bot"))
+
+from aiogram import Bot  # noqa: E402
+from aiogram.methods import SendMessage  # noqa: E402
+
+from responses import ResponseCache, build_reply, KEYBOARDS  # noqa: E402
+
+WEBAPP_URL = "https://slanker.example/app"
+NAMES = list(KEYBOARDS)
+# Placeholder token in the right format; nothing is sent
+BOT_TOKEN = "123456:" + "A" * 35
+
+def time_per_update(step: Callable[[int], object], updates: int) -> float:
+    """Seconds of CPU per call of `step`"""
+    started = time.process_time()
+    for i in range(updates):
+        step(i)
+    return (time.process_time() - started) / updates
+
+def bytes_per_update(step: Callable[[int], object], updates: int) -> float:
+    """Bytes allocated per call of `step`, freed or not"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    total = 0
+    for i in range(updates):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        step(i)
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / updates
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--updates", type=int, default=100000)
+    parser.add_argument("--rate", type=float, default=300.0, help="peak updates per second to scale to")
+    args = parser.parse_args()
+
+    cache = ResponseCache(WEBAPP_URL)
+    bot = Bot(BOT_TOKEN)
+
+    def rebuild(i: int) -> object:
+        return build_reply(NAMES[i % len(NAMES)], "en", WEBAPP_URL)
+
+    def cached(i: int) -> object:
+        return cache.get(NAMES[i % len(NAMES)], "en-US")
+
+    def encode(i: int) -> object:
+        reply = cache.get(NAMES[i % len(NAMES)], "en")
+        method = SendMessage(chat_id=i, text=reply.text, reply_markup=reply.reply_markup)
+        return bot.session.build_form_data(bot, method)
+
+    rows = [("rebuild per update", rebuild), ("cached", cached), ("sendMessage encoding", encode)]
+    results = {}
+    for label, step in rows:
+        seconds = time_per_update(step, args.updates)
+        allocated = bytes_per_update(step, min(args.updates, 20000))
+        results[label] = (seconds, allocated)
+        print(f"{label:<22} {seconds * 1e6:8.2f}us CPU  {allocated:10,.0f} bytes allocated per update")
+
+    saved_seconds = results["rebuild per update"][0] - results["cached"][0]
+    saved_bytes = results["rebuild per update"][1] - results["cached"][1]
+    print(f"at {args.rate:,.0f} updates/s the cache saves {saved_seconds * args.rate * 100:.2f}% of a core "
+          f"and {saved_bytes * args.rate / 1024:,.0f} KiB/s of allocations")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Local stand-in for a Base JSON-RPC node and the Telegram Bot API
+
+Answers the handful of JSON-RPC methods the slanker API uses (single
+requests and batches). Transactions sent with eth_sendRawTransaction are
+hashed like real ones (a resend is "already known") and mined in the next
+block, `block_time` seconds apart, with a successful receipt carrying a
+TokenCreated log. Bot API calls under /bot<token>/<method> succeed with a
+minimal result.
+
+    python bench/chain_stub.py [--port 8545] [--block-time 2]
+"""
+
+import os
+import sys
+import time
+import argparse
+from typing import Dict, Any, Optional
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from chain import TOKEN_CREATED_TOPIC, keccak256  # noqa: E402
+
+GAS_PRICE = 10 ** 7
+BASE_FEE = 5 * 10 ** 6
+BALANCE = 10 ** 20
+
+class ChainStub:
+    """JSON-RPC and Bot API handlers with in-memory chain state"""
+
+    def __init__(self, block_time: float = 2.0):
+        self.block_time = block_time
+        self.started = time.monotonic()
+        # Transaction hash -> block it was sent in
+        self.sent: Dict[str, int] = {}
+        self.requests = 0
+        self.bot_calls = 0
+
+    @property
+    def block_number(self) -> int:
+        return 1_000_000 + int((time.monotonic() - self.started) / max(self.block_time, 0.001))
+
+    def _receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        sent_in = self.sent.get(tx_hash)
+        if sent_in is None or self.block_number <= sent_in:
+            return None
+        token = "0x" + "0" * 24 + tx_hash[-40:]
+        return {
+            "transactionHash": tx_hash,
+            "status": "0x1",
+            "blockNumber": hex(sent_in + 1),
+            "logs": [{"topics": [TOKEN_CREATED_TOPIC, token], "data": "0x"}]
+        }
+
+    def _result(self, method: str, params: list) -> Any:
+        if method == "eth_gasPrice":
+            return hex(GAS_PRICE)
+        if method == "eth_maxPriorityFeePerGas":
+            return hex(GAS_PRICE - BASE_FEE)
+        if method == "eth_getBalance":
+            return hex(BALANCE)
+        if method == "eth_blockNumber":
+            return hex(self.block_number)
+        if method == "eth_getBlockByNumber":
+            return {"number": hex(self.block_number), "baseFeePerGas": hex(BASE_FEE)}
+        if method == "eth_getTransactionCount":
+            # Nonces are tracked by the API itself
+            return "0x0"
+        if method == "eth_sendRawTransaction":
+            tx_hash = "0x" + keccak256(bytes.fromhex(params[0][2:])).hex()
+            if tx_hash in self.sent:
+                raise ValueError("already known")
+            self.sent[tx_hash] = self.block_number
+            return tx_hash
+        if method == "eth_getTransactionReceipt":
+            return self._receipt(params[0])
+        raise KeyError(method)
+
+    def _answer(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.requests += 1
+        try:
+            result = self._result(request.get("method"), request.get("params") or [])
+        except KeyError as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32601, "message": f"Method not found: {e}"}}
+        except ValueError as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32000, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+    async def rpc(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response([self._answer(item) for item in body])
+        return web.json_response(self._answer(body))
+
+    async def bot_api(self, request: web.Request) -> web.Response:
+        self.bot_calls += 1
+        method = request.match_info["method"]
+        data = dict(await request.post()) if request.can_read_body else {}
+        if method.startswith("send") or method.startswith("edit"):
+            chat_id = int(data.get("chat_id") or 0)
+            result: Any = {
+                "message_id": self.bot_calls,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": data.get("text", "")
+            }
+        elif method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Slanker", "username": "slanker_bench_bot"}
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/", self.rpc)
+        app.router.add_post("/bot{token}/{method}", self.bot_api)
+        return app
+
+async def start_stub(stub: ChainStub, port: int) -> web.AppRunner:
+    """Serve `stub` on localhost:`port` until the runner is cleaned up"""
+    runner = web.AppRunner(stub.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--block-time", type=float, default=2.0)
+    args = parser.parse_args()
+    web.run_app(ChainStub(args.block_time).app(), host="127.0.0.1", port=args.port, access_log=None)
+
+if __name__ == "__main__":
+    main()
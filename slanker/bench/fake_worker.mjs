@@ -0,0 +1,68 @@
+// Stand-in for api/runner/worker.mjs used by api_bench.py.
+//
+// Speaks the same protocol (NDJSON jobs on stdin, length-prefixed JSON frames
+// on the SLANKER_RESULT_FD pipe) without loading clanker-sdk: `prepare`
+// returns a fixed transaction and `sign` returns random bytes, which the chain
+// stub turns into a mined deploy once the API broadcasts them.
+//
+// Environment:
+//   SLANKER_RUNNER_VERSION  version to report in the ready frame
+//   FAKE_RUNNER_DELAY_MS    time each job takes, standing in for SDK work
+
+import crypto from 'node:crypto';
+import fs from 'node:fs';
+import readline from 'node:readline';
+
+const VERSION = Number(process.env.SLANKER_RUNNER_VERSION);
+const DELAY_MS = Number(process.env.FAKE_RUNNER_DELAY_MS || 0);
+
+// Clanker v4 factory on Base
+const FACTORY = '0xE85A59c628F7d27878ACeB4bf3b35733630083a9';
+
+const out = fs.createWriteStream(null, { fd: Number(process.env.SLANKER_RESULT_FD) });
+
+function send(message) {
+  const body = Buffer.from(JSON.stringify(message), 'utf8');
+  const header = Buffer.alloc(4);
+  header.writeUInt32BE(body.length);
+  out.write(Buffer.concat([header, body]));
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+const ops = {
+  simulate: async () => ({}),
+  vanityTarget: async (config) => ({
+    deployer: FACTORY,
+    admin: config.deployer,
+    initCodeHash: `0x${crypto.randomBytes(32).toString('hex')}`,
+  }),
+  prepare: async (config) => ({
+    from: config.deployer,
+    to: FACTORY,
+    data: '0x',
+    value: '0x0',
+    gas: '0x5b8d80',
+  }),
+  sign: async () => ({
+    rawTransaction: `0x${crypto.randomBytes(64).toString('hex')}`,
+  }),
+};
+
+async function handle(line) {
+  const job = JSON.parse(line);
+  try {
+    if (DELAY_MS) await sleep(DELAY_MS);
+    send({ id: job.id, ok: true, result: await ops[job.op](job.config) });
+  } catch (error) {
+    send({ id: job.id, ok: false, error: error.message });
+  }
+}
+
+const rl = readline.createInterface({ input: process.stdin });
+rl.on('line', (line) => {
+  if (line.trim()) handle(line);
+});
+rl.on('close', () => out.end(() => process.exit(0)));
+
+send({ type: 'ready', pid: process.pid, version: VERSION });
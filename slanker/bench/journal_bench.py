@@ -0,0 +1,93 @@
+"""
+Deploy journal benchmark
+
+Reports what the journal adds to each deploy job: every job writes its
+three records (queued with the whole job, signed with a raw transaction,
+confirmed) one after another, as the deploy queue does, while `--concurrency`
+jobs run at once. Shows the time per record a job waits for, jobs journaled
+per second and how many records share each commit, for both sync modes.
+
+    cd slanker && python bench/journal_bench.py [--jobs N] [--concurrency 1,16,128]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import secrets
+import tempfile
+from typing import Dict, Any, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from journal import DeployJournal  # noqa: E402
+from jobs import DeployJob, new_job_id  # noqa: E402
+
+CONFIG = {
+    "name": "My Token (v2)",
+    "symbol": "TKN",
+    "image": "ipfs://bafybeigdyrzt5sfp7udm7hu76uh7y26nf3efuylqabf3oclgtqy55fbzdi",
+    "initialMarketCap": "10.5",
+    "vestingPercentage": 10,
+    "vestingDurationDays": 30,
+    "creatorReward": 75,
+    "socialMediaUrls": [{"platform": "x", "url": "https://twitter.com/mytoken"}],
+    "description": "A token for testing"
+}
+
+# About the size of a signed Clanker v4 deploy transaction
+RAW_TRANSACTION = "0x" + secrets.token_hex(2400)
+
+async def journal_job(journal: DeployJournal, waits: List[float]) -> None:
+    job = DeployJob(id=new_job_id(), config=CONFIG, notifyChatId=123456789)
+    records = [
+        ("queued", job.to_dict()),
+        ("signed", {"txHash": "0x" + secrets.token_hex(32), "nonce": 7, "deployer": "0x" + "ab" * 20,
+                    "rawTransaction": RAW_TRANSACTION}),
+        ("confirmed", {"txHash": "0x" + secrets.token_hex(32), "address": "0x" + "cd" * 20, "error": None})
+    ]
+    for status, data in records:
+        started = time.perf_counter()
+        await journal.record(job.id, status, data)
+        waits.append(time.perf_counter() - started)
+
+async def run(path: str, sync: str, jobs: int, concurrency: int) -> Dict[str, Any]:
+    journal = DeployJournal(path, sync=sync)
+    await journal.open()
+    waits: List[float] = []
+    remaining = iter(range(jobs))
+
+    async def worker() -> None:
+        for _ in remaining:
+            await journal_job(journal, waits)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    await journal.close()
+    waits.sort()
+    return {
+        "jobs_per_second": jobs / elapsed,
+        "p50_us": waits[len(waits) // 2] * 1e6,
+        "p99_us": waits[int(len(waits) * 0.99)] * 1e6,
+        "records_per_commit": journal.records / journal.commits
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--concurrency", default="1,16,128")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="slanker-journal-")
+    for sync in ("full", "normal"):
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            path = os.path.join(workdir, f"{sync}-{concurrency}.db")
+            result = asyncio.run(run(path, sync, args.jobs, concurrency))
+            print(f"sync={sync:<6} concurrency={concurrency:<4} {result['jobs_per_second']:>9,.0f} jobs/s  "
+                  f"record wait p50 {result['p50_us']:8.0f}us p99 {result['p99_us']:8.0f}us  "
+                  f"{result['records_per_commit']:6.1f} records/commit")
+
+if __name__ == "__main__":
+    main()
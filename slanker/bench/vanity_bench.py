@@ -0,0 +1,113 @@
+"""
+Vanity salt grinding benchmark
+
+Reports salts per second (two keccak-256 hashes each) for the scalar
+reference, one vectorized batch, a precomputed inventory (one hash each)
+and the multi-process grinder, then times end-to-end searches for a few
+suffixes, cold and with an inventory.
+
+    cd slanker && python bench/vanity_bench.py [--processes N] [--seconds S]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import secrets
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from vanity import (  # noqa: E402
+    VanityGrinder, SaltInventory, grind_batch, grind_inventory, token_salt, create2_address
+)
+
+# Clanker v4 factory on Base and a sample admin / init-code hash
+DEPLOYER = "0xE85A59c628F7d27878ACeB4bf3b35733630083a9"
+ADMIN = "0x1eaf444ebDf6495C57aD52A04C61521bBf564ace"
+INIT_CODE_HASH = "0x" + secrets.token_hex(32)
+
+# A full-address suffix practically never matches, so batches run to completion
+NO_MATCH = "0" * 40
+
+def bench_scalar(seconds: float) -> float:
+    deployer, admin, code_hash = (bytes.fromhex(v[2:]) for v in (DEPLOYER, ADMIN, INIT_CODE_HASH))
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        create2_address(deployer, token_salt(admin, count.to_bytes(32, "big")), code_hash)
+        count += 1
+    return count / (time.perf_counter() - started)
+
+def bench_batch(seconds: float, batch: int) -> float:
+    deployer, admin, code_hash = (bytes.fromhex(v[2:]) for v in (DEPLOYER, ADMIN, INIT_CODE_HASH))
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        grind_batch(deployer, admin, code_hash, count, batch, "", NO_MATCH)
+        count += batch
+    return count / (time.perf_counter() - started)
+
+def bench_inventory(seconds: float, batch: int, inventory: SaltInventory) -> float:
+    deployer, admin, code_hash = (bytes.fromhex(v[2:]) for v in (DEPLOYER, ADMIN, INIT_CODE_HASH))
+    path = inventory.ready[ADMIN[2:].lower()]
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        index = count % inventory.size
+        batch = min(batch, inventory.size - index)
+        grind_inventory(path, index, batch, deployer, admin, code_hash, "", NO_MATCH)
+        count += batch
+    return count / (time.perf_counter() - started)
+
+async def build_inventory(grinder: VanityGrinder) -> float:
+    started = time.perf_counter()
+    await grinder.inventory.build(ADMIN, grinder._get_executor(), grinder.batch_size)
+    return time.perf_counter() - started
+
+async def bench_searches(grinder: VanityGrinder, suffixes, runs: int) -> None:
+    for suffix in suffixes:
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            found = await grinder.find(DEPLOYER, ADMIN, "0x" + secrets.token_hex(32), suffix=suffix, timeout=120)
+            if found:
+                timings.append(time.perf_counter() - started)
+        if timings:
+            timings.sort()
+            print(f"  suffix {suffix:<6} median {timings[len(timings) // 2] * 1000:8.1f}ms  "
+                  f"max {timings[-1] * 1000:8.1f}ms  ({len(timings)}/{runs} found)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch", type=int, default=32768)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--inventory", type=int, default=524288)
+    args = parser.parse_args()
+
+    print(f"scalar reference:        {bench_scalar(args.seconds):>12,.0f} salts/s")
+    print(f"vectorized, 1 process:   {bench_batch(args.seconds, args.batch):>12,.0f} salts/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        inventory = SaltInventory(directory, size=args.inventory)
+        grinder = VanityGrinder(processes=args.processes, batch_size=args.batch, inventory=inventory)
+        try:
+            asyncio.run(grinder.find(DEPLOYER, ADMIN, INIT_CODE_HASH, suffix=NO_MATCH, timeout=args.seconds))
+            print(f"vectorized, {args.processes} processes: {grinder.stats()['saltsPerSecond']:>12,} salts/s")
+
+            print(f"cold searches ({args.runs} runs each):")
+            asyncio.run(bench_searches(grinder, ["4b07", "4b07a"], args.runs))
+
+            print(f"inventory of {args.inventory:,} salts built in {asyncio.run(build_inventory(grinder)):.1f}s")
+            print(f"inventory, 1 process:    {bench_inventory(args.seconds, args.batch, inventory):>12,.0f} salts/s")
+            print(f"inventory searches ({args.runs} runs each):")
+            asyncio.run(bench_searches(grinder, ["4b07"], args.runs))
+            print(f"inventory hits/misses: {inventory.hits}/{inventory.misses}")
+        finally:
+            asyncio.run(grinder.close())
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,19 @@ from typing import Optional
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
-from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiogram.webhook.aiohttp_server import setup_application
 from aiohttp import web
 from aiohttp.web_app import Application
 from dotenv import load_dotenv
 from loguru import logger
 
 from handlers import setup_handlers
+from updates import UpdateDispatcher
+from sender import SendScheduler
+from notifications import DeployNotifier
 
 # Load environment variables
 load_dotenv()
@@ -23,6 +28,8 @@ WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL")
 WEBAPP_URL = os.getenv("WEBAPP_URL", "https://your-domain.com/webapp")
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("API_PORT", "8000"))
+# Optional: a local Bot API server (or the benchmark stub) instead of api.telegram.org
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
 
 if not BOT_TOKEN:
     raise ValueError("TELEGRAM_BOT_TOKEN environment variable is required")
@@ -34,13 +41,28 @@ logger.add("logs/bot.log", rotation="1 day", level="INFO")
 # Initialize bot and dispatcher
 bot = Bot(
     token=BOT_TOKEN,
+    session=AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL)) if TELEGRAM_API_URL else None,
     default=DefaultBotProperties(parse_mode=ParseMode.HTML)
 )
 dp = Dispatcher()
 
+# Outgoing messages are paced to Telegram's flood limits
+sender = SendScheduler()
+bot.session.middleware(sender)
+
+setup_handlers(dp, WEBAPP_URL)
+
+# Webhook updates are acknowledged at once and handled in the background
+updates = UpdateDispatcher(dp, bot)
+
+# Finished deploys are pushed to the chat they came from
+notifier = DeployNotifier(bot)
+
 async def on_startup(app: Application) -> None:
     """Called on application startup"""
     logger.info("Bot is starting up...")
+    updates.start()
+    notifier.start()
     
     if WEBHOOK_URL:
         logger.info(f"Setting webhook URL: {WEBHOOK_URL}")
@@ -54,6 +76,9 @@ async def on_startup(app: Application) -> None:
 async def on_shutdown(app: Application) -> None:
     """Called on application shutdown"""
     logger.info("Bot is shutting down...")
+    await updates.close()
+    await notifier.close()
+    await sender.close()
     await bot.delete_webhook()
     await bot.session.close()
 
@@ -63,51 +88,58 @@ def create_app() -> Application:
     
     # Setup startup and shutdown handlers
     app.on_startup.append(on_startup)
-    app.on_cleanup.append(on_shutdown)
-    
-    # Setup bot handlers
-    setup_handlers(dp, WEBAPP_URL)
+    # on_shutdown, not on_cleanup: aiohttp waits for running tasks (the send
+    # pump, notifications) before cleanup, so they must be stopped first
+    app.on_shutdown.append(on_shutdown)
     
     # Setup webhook handler
-    webhook_handler = SimpleRequestHandler(
-        dispatcher=dp,
-        bot=bot
-    )
-    webhook_handler.register(app, path="/webhook")
+    app.router.add_post("/webhook", updates.webhook)
+    setup_application(app, dp, bot=bot)
     
     # Health check endpoint
     async def health_check(request):
         return web.json_response({"status": "healthy", "service": "slanker-bot"})
     
+    # Update throughput and backlog, outgoing message lag, deploy notifications
+    async def bot_stats(request):
+        return web.json_response({
+            "updates": updates.stats(),
+            "sends": sender.stats(),
+            "notifications": notifier.stats()
+        })
+    
     app.router.add_get("/health", health_check)
+    app.router.add_get("/stats", bot_stats)
     
     return app
 
-async def main():
+async def run_polling():
+    """Run the bot with long polling (development)"""
+    logger.info("Starting bot in polling mode...")
+    notifier.start()
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await notifier.close()
+        await sender.close()
+        await bot.session.close()
+
+def main():
     """Main function to run the bot"""
     try:
         if WEBHOOK_URL:
-            # Run with webhook (production)
-            app = create_app()
-            setup_application(app, dp, bot=bot)
-            
+            # Run with webhook (production); run_app owns the event loop
             logger.info(f"Starting webhook server on {API_HOST}:{API_PORT}")
-            web.run_app(app, host=API_HOST, port=API_PORT)
+            web.run_app(create_app(), host=API_HOST, port=API_PORT)
         else:
-            # Run with polling (development)
-            logger.info("Starting bot in polling mode...")
-            setup_handlers(dp, WEBAPP_URL)
-            
-            await dp.start_polling(bot)
+            asyncio.run(run_polling())
     except Exception as e:
         logger.error(f"Error starting bot: {e}")
         raise
-    finally:
-        await bot.session.close()
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        main()
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
@@ -0,0 +1,134 @@
+import os
+import json
+import html
+import asyncio
+from typing import Dict, Any, AsyncIterator, Optional, Set
+
+import aiohttp
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from loguru import logger
+
+from sender import send_priority, NOTIFY
+
+# Configuration
+REDIS_URL = os.getenv("REDIS_URL")
+DEPLOY_EVENTS_CHANNEL = os.getenv("DEPLOY_EVENTS_CHANNEL", "slanker:deploys")
+SLANKER_API_URL = os.getenv("SLANKER_API_URL", "http://localhost:8000")
+API_SECRET_KEY = os.getenv("API_SECRET_KEY", "your-secret-key")
+NOTIFY_RECONNECT_SECONDS = float(os.getenv("NOTIFY_RECONNECT_SECONDS", "5"))
+
+def deploy_message(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Message text and keyboard for a finished deploy, None if there is nothing to say"""
+    name = html.escape(f"{event.get('name')} ({event.get('symbol')})")
+    if event.get("status") == "confirmed" and event.get("address"):
+        text = (
+            f"✅ <b>{name} is live on Base!</b>\n\n"
+            f"Token address:\n<code>{html.escape(event['address'])}</code>"
+        )
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔍 View on BaseScan", url=event["basescanUrl"])]
+        ]) if event.get("basescanUrl") else None
+        return {"text": text, "reply_markup": keyboard}
+    if event.get("status") == "failed":
+        error = html.escape(event.get("error") or "Deployment failed")
+        return {"text": f"❌ <b>Deploying {name} failed</b>\n\n{error}", "reply_markup": None}
+    return None
+
+class DeployNotifier:
+    """
+    Tells users in Telegram how their deploys ended
+
+    Follows the API's deploy events, from Redis pub/sub when REDIS_URL is
+    set and otherwise from the API's /events/deploys stream, and sends the
+    token address and BaseScan link (or the error) to the chat the deploy
+    came from. Sends go out at NOTIFY priority. Events published while the
+    bot is disconnected are not replayed.
+    """
+
+    def __init__(self, bot: Bot, redis_url: Optional[str] = REDIS_URL,
+                 api_url: str = SLANKER_API_URL, api_key: str = API_SECRET_KEY):
+        self.bot = bot
+        self.redis_url = redis_url
+        self.api_url = api_url.rstrip("/")
+        self.api_key = api_key
+        self._task: Optional[asyncio.Task] = None
+        self._sends: Set[asyncio.Task] = set()
+        self.received = 0
+        self.sent = 0
+        self.failed = 0
+
+    async def _redis_events(self) -> AsyncIterator[Dict[str, Any]]:
+        # Imported lazily so the bot runs without redis installed
+        import redis.asyncio as redis
+
+        client = redis.from_url(self.redis_url, decode_responses=True)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(DEPLOY_EVENTS_CHANNEL)
+            async for message in pubsub.listen():
+                yield json.loads(message["data"])
+        finally:
+            await pubsub.close()
+            await client.close()
+
+    async def _api_events(self) -> AsyncIterator[Dict[str, Any]]:
+        headers = {"Authorization": f"Bearer {self.api_key}", "Accept": "text/event-stream"}
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(f"{self.api_url}/events/deploys", headers=headers) as response:
+                response.raise_for_status()
+                async for line in response.content:
+                    if line.startswith(b"data:"):
+                        yield json.loads(line[5:])
+
+    async def _listen(self) -> None:
+        source = "Redis" if self.redis_url else self.api_url
+        while True:
+            try:
+                logger.info(f"Following deploy events from {source}")
+                events = self._redis_events() if self.redis_url else self._api_events()
+                async for event in events:
+                    self.received += 1
+                    if event.get("chatId"):
+                        task = asyncio.create_task(self.notify(event))
+                        self._sends.add(task)
+                        task.add_done_callback(self._sends.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Deploy event stream from {source} lost: {e}")
+            await asyncio.sleep(NOTIFY_RECONNECT_SECONDS)
+
+    async def notify(self, event: Dict[str, Any]) -> None:
+        """Send a finished deploy to the chat it came from"""
+        message = deploy_message(event)
+        if message is None:
+            return
+        try:
+            with send_priority(NOTIFY):
+                await self.bot.send_message(event["chatId"], **message)
+            self.sent += 1
+        except TelegramAPIError as e:
+            # e.g. the user blocked the bot or never started it
+            self.failed += 1
+            logger.warning(f"Could not notify chat {event['chatId']} about job {event.get('jobId')}: {e}")
+
+    def start(self) -> None:
+        if not self.redis_url and self.api_key == "your-secret-key":
+            logger.warning("Neither REDIS_URL nor API_SECRET_KEY is set; deploy notifications "
+                           f"depend on {self.api_url} accepting the placeholder key")
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Let notifications already on their way go out
+        await asyncio.gather(*self._sends, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"received": self.received, "sent": self.sent, "failed": self.failed, "sending": len(self._sends)}
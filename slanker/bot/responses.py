@@ -0,0 +1,284 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, WebAppInfo
+from pydantic import ConfigDict, field_serializer
+
+DEFAULT_LANGUAGE = "en"
+
+# Message texts (Telegram HTML) per language code
+TEXTS: Dict[str, Dict[str, str]] = {
+    "en": {
+        "start": (
+            "🚀 <b>Welcome to Slanker!</b>\n\n"
+            "Deploy custom tokens on Base using Clanker SDK with just a few clicks!\n\n"
+            "✨ <b>Features:</b>\n"
+            "• Deploy tokens instantly\n"
+            "• Configure vesting & rewards\n"
+            "• Beautiful dark/light mode UI\n"
+            "• Secure - keys never stored\n"
+            "• Copy-to-clipboard support\n\n"
+            "📱 Use /slanker to start deploying your token!"
+        ),
+        "slanker": (
+            "🎯 <b>Ready to Deploy Your Token?</b>\n\n"
+            "Tap the button below to open the Slanker Mini App and deploy your custom token "
+            "on Base using Clanker SDK.\n\n"
+            "🔒 <b>Secure & Fast</b> - Everything happens safely in your browser.\n"
+            "⚡ <b>One-Click Deploy</b> - No technical knowledge required.\n"
+            "📋 <b>Full Control</b> - Configure every aspect of your token.\n\n"
+            "<i>Your private keys are handled securely and never stored.</i>"
+        ),
+        "help": (
+            "🆘 <b>Slanker Help</b>\n\n"
+            "<b>Commands:</b>\n"
+            "/start - Welcome message and quick start\n"
+            "/slanker - Open token deployment interface\n"
+            "/help - Show this help message\n"
+            "/about - About Slanker\n\n"
+            "<b>How to Deploy a Token:</b>\n"
+            "1. Use /slanker command\n"
+            "2. Tap '🚀 Deploy Token' button\n"
+            "3. Fill in your token details:\n"
+            "   • Token name & symbol\n"
+            "   • IPFS image URL\n"
+            "   • Market cap & vesting settings\n"
+            "   • Creator rewards & social links\n"
+            "4. Tap '🎯 Generate & Deploy'\n"
+            "5. Wait for deployment confirmation\n"
+            "6. Copy token address & view on BaseScan\n\n"
+            "<b>Need Support?</b>\n"
+            "Contact the development team for assistance."
+        ),
+        "about": (
+            "ℹ️ <b>About Slanker</b>\n\n"
+            "Slanker is a Telegram Mini App that simplifies token deployment on Base "
+            "using the powerful Clanker SDK.\n\n"
+            "<b>🎯 Mission:</b>\n"
+            "Make token deployment accessible to everyone, no technical expertise required.\n\n"
+            "<b>🔧 Technology:</b>\n"
+            "• Clanker SDK for Base deployment\n"
+            "• Telegram Mini Apps for seamless UX\n"
+            "• FastAPI for secure backend processing\n"
+            "• Advanced security & rate limiting\n\n"
+            "<b>🌟 Features:</b>\n"
+            "• Instant token deployment\n"
+            "• Customizable vesting schedules\n"
+            "• Creator reward configuration\n"
+            "• Social media integration\n"
+            "• Dark/Light mode support\n"
+            "• Mobile-optimized interface\n\n"
+            "<b>🔗 Links:</b>\n"
+            "Built with Clanker SDK: https://github.com/Timcuan/clanker-sdk"
+        ),
+        "security": (
+            "🛡️ <b>Security Features</b>\n\n"
+            "<b>🔒 Private Key Protection:</b>\n"
+            "• Keys stored only in memory during deployment\n"
+            "• Never logged or saved to disk\n"
+            "• Automatic memory cleanup after use\n\n"
+            "<b>🌐 Network Security:</b>\n"
+            "• HTTPS enforcement for all communications\n"
+            "• CORS restricted to Telegram domains\n"
+            "• Rate limiting to prevent abuse\n\n"
+            "<b>🔍 Input Validation:</b>\n"
+            "• All inputs sanitized and validated\n"
+            "• Protection against injection attacks\n"
+            "• Smart contract interaction safety\n\n"
+            "<b>📊 Monitoring:</b>\n"
+            "• Comprehensive logging (no sensitive data)\n"
+            "• Error tracking and monitoring\n"
+            "• Regular security audits\n\n"
+            "<i>Your security is our top priority!</i>"
+        ),
+        "unknown": (
+            "🤔 I don't understand that command.\n\n"
+            "Use /slanker to deploy tokens or /help for assistance."
+        ),
+    },
+    "id": {
+        "start": (
+            "🚀 <b>Selamat datang di Slanker!</b>\n\n"
+            "Deploy token kustom di Base dengan Clanker SDK hanya dengan beberapa klik!\n\n"
+            "✨ <b>Fitur:</b>\n"
+            "• Deploy token secara instan\n"
+            "• Atur vesting & reward\n"
+            "• Tampilan mode gelap/terang\n"
+            "• Aman - kunci tidak pernah disimpan\n"
+            "• Salin ke clipboard\n\n"
+            "📱 Gunakan /slanker untuk mulai deploy token Anda!"
+        ),
+        "slanker": (
+            "🎯 <b>Siap Deploy Token Anda?</b>\n\n"
+            "Ketuk tombol di bawah untuk membuka Slanker Mini App dan deploy token kustom Anda "
+            "di Base dengan Clanker SDK.\n\n"
+            "🔒 <b>Aman & Cepat</b> - Semua berjalan dengan aman di browser Anda.\n"
+            "⚡ <b>Deploy Sekali Klik</b> - Tanpa perlu pengetahuan teknis.\n"
+            "📋 <b>Kendali Penuh</b> - Atur setiap aspek token Anda.\n\n"
+            "<i>Private key Anda ditangani dengan aman dan tidak pernah disimpan.</i>"
+        ),
+        "help": (
+            "🆘 <b>Bantuan Slanker</b>\n\n"
+            "<b>Perintah:</b>\n"
+            "/start - Pesan sambutan dan panduan singkat\n"
+            "/slanker - Buka antarmuka deploy token\n"
+            "/help - Tampilkan pesan bantuan ini\n"
+            "/about - Tentang Slanker\n\n"
+            "<b>Cara Deploy Token:</b>\n"
+            "1. Gunakan perintah /slanker\n"
+            "2. Ketuk tombol '🚀 Deploy Token'\n"
+            "3. Isi detail token Anda:\n"
+            "   • Nama & simbol token\n"
+            "   • URL gambar IPFS\n"
+            "   • Market cap & pengaturan vesting\n"
+            "   • Reward kreator & tautan sosial\n"
+            "4. Ketuk '🎯 Generate & Deploy'\n"
+            "5. Tunggu konfirmasi deploy\n"
+            "6. Salin alamat token & lihat di BaseScan\n\n"
+            "<b>Butuh Bantuan?</b>\n"
+            "Hubungi tim pengembang untuk bantuan."
+        ),
+        "about": (
+            "ℹ️ <b>Tentang Slanker</b>\n\n"
+            "Slanker adalah Telegram Mini App yang mempermudah deploy token di Base "
+            "dengan Clanker SDK.\n\n"
+            "<b>🎯 Misi:</b>\n"
+            "Membuat deploy token bisa diakses semua orang, tanpa keahlian teknis.\n\n"
+            "<b>🔧 Teknologi:</b>\n"
+            "• Clanker SDK untuk deploy di Base\n"
+            "• Telegram Mini Apps untuk pengalaman yang mulus\n"
+            "• FastAPI untuk pemrosesan backend yang aman\n"
+            "• Keamanan & rate limiting tingkat lanjut\n\n"
+            "<b>🌟 Fitur:</b>\n"
+            "• Deploy token instan\n"
+            "• Jadwal vesting yang bisa diatur\n"
+            "• Pengaturan reward kreator\n"
+            "• Integrasi media sosial\n"
+            "• Mode gelap/terang\n"
+            "• Tampilan yang dioptimalkan untuk ponsel\n\n"
+            "<b>🔗 Tautan:</b>\n"
+            "Dibangun dengan Clanker SDK: https://github.com/Timcuan/clanker-sdk"
+        ),
+        "security": (
+            "🛡️ <b>Fitur Keamanan</b>\n\n"
+            "<b>🔒 Perlindungan Private Key:</b>\n"
+            "• Kunci hanya disimpan di memori selama deploy\n"
+            "• Tidak pernah dicatat di log atau disimpan ke disk\n"
+            "• Memori dibersihkan otomatis setelah digunakan\n\n"
+            "<b>🌐 Keamanan Jaringan:</b>\n"
+            "• HTTPS wajib untuk semua komunikasi\n"
+            "• CORS dibatasi ke domain Telegram\n"
+            "• Rate limiting untuk mencegah penyalahgunaan\n\n"
+            "<b>🔍 Validasi Input:</b>\n"
+            "• Semua input disanitasi dan divalidasi\n"
+            "• Perlindungan dari serangan injeksi\n"
+            "• Interaksi smart contract yang aman\n\n"
+            "<b>📊 Pemantauan:</b>\n"
+            "• Logging lengkap (tanpa data sensitif)\n"
+            "• Pelacakan dan pemantauan error\n"
+            "• Audit keamanan berkala\n\n"
+            "<i>Keamanan Anda adalah prioritas kami!</i>"
+        ),
+        "unknown": (
+            "🤔 Saya tidak mengerti perintah itu.\n\n"
+            "Gunakan /slanker untuk deploy token atau /help untuk bantuan."
+        ),
+    },
+}
+
+# Button labels per language code
+BUTTONS: Dict[str, Dict[str, str]] = {
+    "en": {
+        "deploy": "🚀 Deploy Token",
+        "deploy_now": "🚀 Deploy Now",
+        "try": "🚀 Try It Now",
+        "deploy_securely": "🚀 Deploy Securely",
+        "help": "📖 Help",
+        "about": "ℹ️ About",
+        "security": "🛡️ Security",
+    },
+    "id": {
+        "deploy": "🚀 Deploy Token",
+        "deploy_now": "🚀 Deploy Sekarang",
+        "try": "🚀 Coba Sekarang",
+        "deploy_securely": "🚀 Deploy dengan Aman",
+        "help": "📖 Bantuan",
+        "about": "ℹ️ Tentang",
+        "security": "🛡️ Keamanan",
+    },
+}
+
+# Keyboard layout per response: rows of (button label, callback data); a
+# button without callback data opens the web app
+KEYBOARDS: Dict[str, List[List[Tuple[str, Optional[str]]]]] = {
+    "start": [[("deploy", None)], [("help", "help")]],
+    "slanker": [[("deploy", None)], [("about", "about"), ("security", "security")]],
+    "help": [[("deploy_now", None)]],
+    "about": [[("try", None)]],
+    "security": [[("deploy_securely", None)]],
+    "unknown": [[("deploy", None)], [("help", "help")]],
+}
+
+# aiogram's keyboard types are mutable models; these variants refuse
+# assignment and hold tuples, so a shared keyboard can't be changed in place
+class FrozenWebAppInfo(WebAppInfo):
+    model_config = ConfigDict(frozen=True)
+
+class FrozenInlineKeyboardButton(InlineKeyboardButton):
+    model_config = ConfigDict(frozen=True)
+    web_app: Optional[FrozenWebAppInfo] = None
+
+class FrozenInlineKeyboardMarkup(InlineKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+    inline_keyboard: Tuple[Tuple[FrozenInlineKeyboardButton, ...], ...]
+
+    @field_serializer("inline_keyboard", mode="wrap")
+    def _serialize_rows(self, rows: Any, handler: Callable[[Any], Any]) -> List[List[Any]]:
+        # aiogram only drops unset (None) fields inside lists, not tuples
+        return [list(row) for row in handler(rows)]
+
+@dataclass(frozen=True)
+class Reply:
+    """A message text and its keyboard, ready to pass to message.answer"""
+    text: str
+    reply_markup: FrozenInlineKeyboardMarkup
+
+def build_reply(name: str, language: str, webapp_url: str) -> Reply:
+    """Build one response from scratch"""
+    labels = BUTTONS[language]
+    web_app = FrozenWebAppInfo(url=webapp_url)
+    keyboard = FrozenInlineKeyboardMarkup(inline_keyboard=tuple(
+        tuple(
+            FrozenInlineKeyboardButton(text=labels[label], callback_data=data) if data
+            else FrozenInlineKeyboardButton(text=labels[label], web_app=web_app)
+            for label, data in row
+        )
+        for row in KEYBOARDS[name]
+    ))
+    return Reply(TEXTS[language][name], keyboard)
+
+class ResponseCache:
+    """
+    Every bot response, built once per language for a given web app URL
+
+    Replies are immutable (frozen keyboard models with tuple rows, since
+    aiogram's own keyboard types can be changed in place), so handlers
+    share them instead of rebuilding texts and keyboards on each update.
+    """
+
+    def __init__(self, webapp_url: str):
+        self.webapp_url = webapp_url
+        self._replies: Mapping[str, Mapping[str, Reply]] = MappingProxyType({
+            language: MappingProxyType({name: build_reply(name, language, webapp_url) for name in KEYBOARDS})
+            for language in TEXTS
+        })
+
+    @staticmethod
+    def language(language_code: Optional[str]) -> str:
+        """Supported language for a Telegram language code ("en-US" -> "en"), English if unsupported"""
+        base = (language_code or "").split("-")[0].lower()
+        return base if base in TEXTS else DEFAULT_LANGUAGE
+
+    def get(self, name: str, language_code: Optional[str] = None) -> Reply:
+        return self._replies[self.language(language_code)][name]
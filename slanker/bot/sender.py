@@ -0,0 +1,198 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from loguru import logger
+
+# Configuration
+BOT_GLOBAL_SENDS_PER_SECOND = float(os.getenv("BOT_GLOBAL_SENDS_PER_SECOND", "25"))
+BOT_CHAT_SEND_INTERVAL = float(os.getenv("BOT_CHAT_SEND_INTERVAL", "1.0"))
+BOT_GROUP_SEND_INTERVAL = float(os.getenv("BOT_GROUP_SEND_INTERVAL", "3.0"))
+BOT_MAX_SEND_RETRIES = int(os.getenv("BOT_MAX_SEND_RETRIES", "3"))
+
+# Send priorities; lower goes first when sends compete for the global budget
+NOTIFY = 0
+REPLY = 1
+INFO = 2
+PRIORITY_NAMES = {NOTIFY: "notify", REPLY: "reply", INFO: "info"}
+
+# Samples kept for the queue lag figures in stats()
+LAG_SAMPLES = 1000
+# Chats with nothing pending are forgotten every this many sends
+CHAT_SWEEP_EVERY = 1000
+
+_priority: ContextVar[int] = ContextVar("send_priority", default=REPLY)
+
+@contextmanager
+def send_priority(priority: int) -> Iterator[None]:
+    """Send the Telegram messages made inside the block at `priority`"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+@dataclass
+class ChatState:
+    lock: asyncio.Lock
+    next_at: float = 0.0
+    waiting: int = 0
+
+class SendScheduler(BaseRequestMiddleware):
+    """
+    Paces every bot API call that targets a chat
+
+    Installed as an aiogram session middleware, so handlers keep calling
+    `message.answer(...)` and friends directly. Calls to one chat leave in
+    order, at most one per BOT_CHAT_SEND_INTERVAL (BOT_GROUP_SEND_INTERVAL
+    for groups). All chats share a global token bucket; when sends compete
+    for it, notifications go before replies and replies before
+    informational text. A 429 from Telegram pauses the chat and the global
+    bucket for its retry_after and the call is retried.
+    """
+
+    def __init__(self, rate: float = BOT_GLOBAL_SENDS_PER_SECOND,
+                 chat_interval: float = BOT_CHAT_SEND_INTERVAL,
+                 group_interval: float = BOT_GROUP_SEND_INTERVAL,
+                 max_retries: int = BOT_MAX_SEND_RETRIES):
+        self.rate = rate
+        self.chat_interval = chat_interval
+        self.group_interval = group_interval
+        self.max_retries = max_retries
+        self.tokens = rate
+        self.paused_until = 0.0
+        self._refilled_at = time.monotonic()
+        self._chats: Dict[Any, ChatState] = {}
+        self._waiting: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._pump: Optional[asyncio.Task] = None
+        self._lag: Dict[int, List[float]] = {priority: [] for priority in PRIORITY_NAMES}
+        self._calls = 0
+        self.sent = 0
+        self.retries = 0
+        self.dropped = 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.rate, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    async def _release_tokens(self) -> None:
+        """Hand out global tokens to waiting sends, best priority first"""
+        while True:
+            await self._wakeup.wait()
+            while self._waiting:
+                now = time.monotonic()
+                self._refill(now)
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                _, _, future = heapq.heappop(self._waiting)
+                if future.done():
+                    # Cancelled while waiting
+                    continue
+                self.tokens -= 1
+                future.set_result(None)
+            self._wakeup.clear()
+
+    async def _global_token(self, priority: int) -> None:
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._release_tokens())
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._seq), future))
+        self._wakeup.set()
+        await future
+
+    def _chat(self, chat_id: Any) -> ChatState:
+        self._calls += 1
+        if self._calls % CHAT_SWEEP_EVERY == 0:
+            now = time.monotonic()
+            self._chats = {key: chat for key, chat in self._chats.items()
+                           if chat.waiting or chat.next_at > now}
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = ChatState(lock=asyncio.Lock())
+        return chat
+
+    def _interval(self, chat_id: Any) -> float:
+        # Group and channel IDs are negative
+        return self.group_interval if isinstance(chat_id, int) and chat_id < 0 else self.chat_interval
+
+    def _record_lag(self, priority: int, lag: float) -> None:
+        samples = self._lag[priority]
+        samples.append(lag)
+        if len(samples) > LAG_SAMPLES:
+            del samples[:len(samples) - LAG_SAMPLES]
+
+    async def __call__(self, make_request: NextRequestMiddlewareType[TelegramType], bot: Bot,
+                       method: TelegramMethod[TelegramType]) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        priority = _priority.get()
+        chat = self._chat(chat_id)
+        queued_at = time.monotonic()
+        chat.waiting += 1
+        try:
+            async with chat.lock:
+                for attempt in range(self.max_retries + 1):
+                    delay = chat.next_at - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    await self._global_token(priority)
+                    if attempt == 0:
+                        self._record_lag(priority, time.monotonic() - queued_at)
+                    chat.next_at = time.monotonic() + self._interval(chat_id)
+                    try:
+                        response = await make_request(bot, method)
+                        self.sent += 1
+                        return response
+                    except TelegramRetryAfter as e:
+                        if attempt == self.max_retries:
+                            self.dropped += 1
+                            raise
+                        self.retries += 1
+                        resume = time.monotonic() + e.retry_after
+                        chat.next_at = max(chat.next_at, resume)
+                        self.paused_until = max(self.paused_until, resume)
+                        logger.warning(f"Telegram flood limit in chat {chat_id}, retrying in {e.retry_after}s")
+        finally:
+            chat.waiting -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        lag = {}
+        for priority, samples in self._lag.items():
+            ordered = sorted(samples)
+            lag[PRIORITY_NAMES[priority]] = {
+                "p50Seconds": round(ordered[len(ordered) // 2], 3) if ordered else 0.0,
+                "maxSeconds": round(ordered[-1], 3) if ordered else 0.0
+            }
+        waiting = sum(1 for _, _, future in self._waiting if not future.done())
+        return {
+            "sent": self.sent,
+            "retries": self.retries,
+            "dropped": self.dropped,
+            "queued": sum(chat.waiting for chat in self._chats.values()),
+            "waitingForGlobalToken": waiting,
+            "pausedSeconds": round(max(0.0, self.paused_until - time.monotonic()), 3),
+            "lag": lag
+        }
+
+    async def close(self) -> None:
+        if self._pump is not None:
+            self._pump.cancel()
+            await asyncio.gather(self._pump, return_exceptions=True)
+            self._pump = None
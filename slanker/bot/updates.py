@@ -0,0 +1,173 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict, deque
+from typing import Dict, Any, Deque, List, Tuple
+
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from aiohttp import web
+from loguru import logger
+
+# Configuration
+BOT_UPDATE_WORKERS = int(os.getenv("BOT_UPDATE_WORKERS", "32"))
+BOT_UPDATE_QUEUE_MAX = int(os.getenv("BOT_UPDATE_QUEUE_MAX", "10000"))
+BOT_UPDATE_DEDUP_SIZE = int(os.getenv("BOT_UPDATE_DEDUP_SIZE", "50000"))
+BOT_DRAIN_SECONDS = float(os.getenv("BOT_DRAIN_SECONDS", "10"))
+
+# Window for the updates-per-second figures in stats()
+RATE_WINDOW_SECONDS = 60
+
+def chat_key(update: Dict[str, Any]) -> Any:
+    """Chat an update belongs to; updates of one chat are handled in order"""
+    for field, payload in update.items():
+        if field == "update_id" or not isinstance(payload, dict):
+            continue
+        chat = payload.get("chat") or (payload.get("message") or {}).get("chat")
+        if chat and "id" in chat:
+            return chat["id"]
+        user = payload.get("from") or payload.get("user")
+        if user and "id" in user:
+            return user["id"]
+    # Nothing to order against
+    return ("update", update.get("update_id"))
+
+class UpdateDispatcher:
+    """
+    Hands webhook updates to a bounded pool of worker tasks
+
+    The webhook answers as soon as an update is queued, so Telegram never
+    waits on handlers. Updates are queued per chat and a chat is handled by
+    at most one worker at a time, which keeps each chat's updates in order
+    without one busy chat holding up the others. Update IDs seen recently
+    are dropped as redeliveries, and once `max_pending` updates are waiting
+    new ones are refused so Telegram retries them later.
+    """
+
+    def __init__(self, dp: Dispatcher, bot: Bot, workers: int = BOT_UPDATE_WORKERS,
+                 max_pending: int = BOT_UPDATE_QUEUE_MAX, dedup_size: int = BOT_UPDATE_DEDUP_SIZE):
+        self.dp = dp
+        self.bot = bot
+        self.workers = workers
+        self.max_pending = max_pending
+        self.dedup_size = dedup_size
+        self.pending = 0
+        self._chats: Dict[Any, Deque[Tuple[Dict[str, Any], float]]] = {}
+        self._ready: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._seen: "OrderedDict[int, None]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+        self._handled_at: Deque[float] = deque()
+        self.received = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.handled = 0
+        self.failed = 0
+        self.busy = 0
+
+    def submit(self, update: Dict[str, Any]) -> bool:
+        """
+        Queue an update for its chat
+
+        Returns:
+            False if the queue is full and the update should be redelivered
+        """
+        update_id = update.get("update_id")
+        if update_id is not None and update_id in self._seen:
+            self.duplicates += 1
+            return True
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            return False
+
+        self.received += 1
+        self._seen[update_id] = None
+        while len(self._seen) > self.dedup_size:
+            self._seen.popitem(last=False)
+
+        self.pending += 1
+        key = chat_key(update)
+        queue = self._chats.get(key)
+        if queue is None:
+            # Not queued and not being handled: make the chat ready
+            self._chats[key] = deque([(update, time.monotonic())])
+            self._ready.put_nowait(key)
+        else:
+            queue.append((update, time.monotonic()))
+        return True
+
+    async def _handle(self, update: Dict[str, Any]) -> None:
+        result = await self.dp.feed_raw_update(self.bot, update)
+        if isinstance(result, TelegramMethod):
+            await self.bot(result)
+
+    async def _work(self) -> None:
+        while True:
+            key = await self._ready.get()
+            queue = self._chats[key]
+            self.busy += 1
+            try:
+                while queue:
+                    update, _ = queue.popleft()
+                    try:
+                        await self._handle(update)
+                        self.handled += 1
+                    except Exception as e:
+                        self.failed += 1
+                        logger.error(f"Update {update.get('update_id')} failed: {e}")
+                    finally:
+                        self.pending -= 1
+                        self._record(time.monotonic())
+            finally:
+                self.busy -= 1
+                del self._chats[key]
+
+    def _record(self, now: float) -> None:
+        self._handled_at.append(now)
+        while now - self._handled_at[0] > RATE_WINDOW_SECONDS:
+            self._handled_at.popleft()
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+            logger.info(f"Update dispatcher started with {self.workers} workers")
+
+    async def close(self, grace: float = BOT_DRAIN_SECONDS) -> None:
+        """Finish queued updates for up to `grace` seconds, then stop the workers"""
+        deadline = time.monotonic() + grace
+        while self.pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self.pending:
+            logger.warning(f"Dropping {self.pending} unhandled updates on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        recent = sum(1 for t in self._handled_at if now - t <= RATE_WINDOW_SECONDS)
+        oldest = min((queue[0][1] for queue in self._chats.values() if queue), default=None)
+        return {
+            "workers": self.workers,
+            "busyWorkers": self.busy,
+            "pending": self.pending,
+            "chats": len(self._chats),
+            "oldestPendingSeconds": round(now - oldest, 3) if oldest is not None else 0.0,
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "handled": self.handled,
+            "failed": self.failed,
+            "handledPerSecond": round(recent / RATE_WINDOW_SECONDS, 2)
+        }
+
+    async def webhook(self, request: web.Request) -> web.Response:
+        """aiohttp handler for Telegram's webhook POSTs"""
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        if not self.submit(update):
+            # Telegram redelivers updates it did not get a 2xx for
+            return web.Response(status=503, headers={"Retry-After": "1"})
+        return web.Response()
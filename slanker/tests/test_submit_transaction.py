@@ -0,0 +1,64 @@
+"""
+Nonce handling of deploy.submit_transaction when the RPC fails
+
+    cd slanker && python -m pytest tests
+"""
+
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+# deploy.py refuses to import without a deployer key
+os.environ.setdefault("PRIVATE_KEY", "0x" + "11" * 32)
+os.environ.pop("REDIS_URL", None)
+
+import deploy  # noqa: E402
+from nonce import NonceManager  # noqa: E402
+from rpc import RpcError, RpcTransportError  # noqa: E402
+
+TX = {"from": "0x" + "ab" * 20, "to": "0x" + "cd" * 20, "data": "0x", "gas": "0x5208"}
+
+class FakeRpc:
+    """Answers eth_getTransactionCount; nothing else is expected"""
+
+    async def call(self, method, params=None, idempotent=True):
+        assert method == "eth_getTransactionCount"
+        return hex(7)
+
+def test_failed_fee_lookup_keeps_the_nonce_free(monkeypatch):
+    async def failing_fees():
+        raise RpcTransportError("fee lookup timed out")
+
+    monkeypatch.setattr(deploy, "current_fees", failing_fees)
+    manager = NonceManager(TX["from"], FakeRpc())
+
+    async def scenario():
+        for _ in range(2):
+            try:
+                await deploy.submit_transaction(TX, manager)
+            except RpcError:
+                pass
+        return await manager.allocate(), manager.inflight
+
+    assert asyncio.run(scenario()) == (7, 1)
+
+def test_failure_before_broadcast_releases_the_nonce(monkeypatch):
+    async def fees():
+        return 2, 1
+
+    async def failing_send(tx, nonce, fees, on_progress=None):
+        raise RpcError("runner unavailable")
+
+    monkeypatch.setattr(deploy, "current_fees", fees)
+    monkeypatch.setattr(deploy, "send_transaction", failing_send)
+    manager = NonceManager(TX["from"], FakeRpc())
+
+    async def scenario():
+        try:
+            await deploy.submit_transaction(TX, manager)
+        except RpcError:
+            pass
+        return await manager.allocate(), manager.inflight
+
+    assert asyncio.run(scenario()) == (7, 1)
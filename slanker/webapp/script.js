@@ -3,6 +3,8 @@
 
 // Global variables
 let socialMediaCount = 0;
+// Reused when a deploy request is retried so the API does not deploy twice
+let idempotencyKey = null;
 const API_BASE_URL = window.location.hostname === 'localhost' ? 
     'http://localhost:8000' : 
     'https://slanker-api.onrender.com'; // API endpoint
@@ -219,10 +221,32 @@ async function handleFormSubmit(event) {
             return;
         }
         
-        // Send deployment request
-        const result = await deployToken(formData);
+        // Inside Telegram the bot reports the outcome, so the app can close
+        const chatId = telegramChatId();
+        if (chatId) {
+            formData.notifyChatId = chatId;
+        }
+        
+        // Queue the deployment and follow its status
+        idempotencyKey = idempotencyKey || newIdempotencyKey();
+        const job = await deployToken(formData, idempotencyKey);
+        if (chatId) {
+            idempotencyKey = null;
+            showToast(
+                'Deployment queued! The bot will message you when your token is live. 🚀',
+                'success'
+            );
+            setTimeout(() => window.Telegram.WebApp.close(), 1500);
+            return;
+        }
+        const result = await waitForDeployment(job, (status) => {
+            btnText.textContent = DEPLOY_STATUS_TEXT[status] || '⏳ Deploying...';
+        });
         
-        if (result.success) {
+        // The job finished; a new submission is a new deploy
+        idempotencyKey = null;
+        
+        if (result.status === 'confirmed') {
             showSuccessResult(result);
             showToast('Token deployed successfully! 🎉', 'success');
         } else {
@@ -309,13 +333,41 @@ function validateFormData(data) {
     return true;
 }
 
+// Telegram user ID of the Mini App user (their private chat with the bot), if any
+function telegramChatId() {
+    const tg = window.Telegram && window.Telegram.WebApp;
+    const user = tg && tg.initDataUnsafe && tg.initDataUnsafe.user;
+    return user ? user.id : null;
+}
+
+// Telegram-signed launch data proving who the Mini App user is, if any
+function telegramInitData() {
+    const tg = window.Telegram && window.Telegram.WebApp;
+    return tg && tg.initData ? tg.initData : null;
+}
+
+// Random key identifying one deploy attempt across retries
+function newIdempotencyKey() {
+    if (window.crypto && window.crypto.randomUUID) {
+        return window.crypto.randomUUID();
+    }
+    return `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+}
+
 // Deploy token via API
-async function deployToken(formData) {
+async function deployToken(formData, key) {
+    const headers = {
+        'Content-Type': 'application/json',
+        'Idempotency-Key': key,
+    };
+    const initData = telegramInitData();
+    if (initData) {
+        headers['Authorization'] = `tma ${initData}`;
+    }
+    
     const response = await fetch(`${API_BASE_URL}/deploy`, {
         method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
+        headers,
         body: JSON.stringify(formData)
     });
     
@@ -327,6 +379,59 @@ async function deployToken(formData) {
     return await response.json();
 }
 
+// Button text for each deploy job status
+const DEPLOY_STATUS_TEXT = {
+    queued: '⏳ Queued...',
+    simulating: '🧪 Preparing...',
+    submitted: '📡 Confirming...'
+};
+
+// Follow a deploy job until it is confirmed or failed
+function waitForDeployment(job, onStatus) {
+    const isFinished = (state) => state.status === 'confirmed' || state.status === 'failed';
+    
+    if (!window.EventSource) {
+        return pollDeployment(job, onStatus, isFinished);
+    }
+    
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(`${API_BASE_URL}${job.eventsUrl}`);
+        
+        source.addEventListener('status', (event) => {
+            const state = JSON.parse(event.data);
+            onStatus(state.status);
+            if (isFinished(state)) {
+                source.close();
+                resolve(state);
+            }
+        });
+        
+        source.onerror = () => {
+            // Fall back to polling if the stream drops
+            source.close();
+            pollDeployment(job, onStatus, isFinished).then(resolve, reject);
+        };
+    });
+}
+
+// Poll a deploy job's status until it finishes
+async function pollDeployment(job, onStatus, isFinished) {
+    while (true) {
+        const response = await fetch(`${API_BASE_URL}${job.statusUrl}`);
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        
+        const state = await response.json();
+        onStatus(state.status);
+        if (isFinished(state)) {
+            return state;
+        }
+        
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+    }
+}
+
 // Show success result
 function showSuccessResult(result) {
     const deploymentForm = document.getElementById('deploymentForm');